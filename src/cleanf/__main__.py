@@ -10,6 +10,7 @@ from rich.console import Console
 
 from cleanf.empty import remove_empty_folders
 from cleanf.backup import remove_backup_and_temp
+from cleanf.cli_helpers import check_paths_exist, split_keywords
 
 # 创建 Typer 应用
 app = typer.Typer(help="文件清理工具 - 删除空文件夹和备份文件")
@@ -85,24 +86,63 @@ def setup_logger(app_name="app", project_root=None, console_output=True):
 logger, config_info = setup_logger(app_name="cleanf", console_output=True)
 
 
+try:
+    import pyperclip as _pyperclip
+except ImportError:
+    _pyperclip = None
+
+def _preset_patterns(preset: dict) -> list:
+    """预设的清理模式，预览与执行共用
+
+    与 remove_backup_and_temp 的 custom_patterns 规则一致：未定义 patterns 时使用默认模式，
+    显式给出空列表时不匹配任何文件。
+    """
+    from cleanf.config import DELETE_PATTERNS
+    patterns = preset.get("patterns")
+    return list(patterns) if patterns is not None else list(DELETE_PATTERNS)
+
+def _dedup_paths(paths: List[Path]) -> List[Path]:
+    """去掉重复路径以及位于其他输入路径之下的子路径，避免同一目录树被重复扫描
+
+    比较时使用解析后的绝对路径，返回时保留原始路径及其顺序。
+    """
+    resolved = []
+    for path in paths:
+        try:
+            resolved.append(path.resolve())
+        except OSError:
+            resolved.append(path.absolute())
+
+    kept = set()
+    kept_indices = set()
+    # 由浅到深检查，父路径总会先于其子路径被保留
+    for index in sorted(range(len(paths)), key=lambda i: len(resolved[i].parts)):
+        candidate = resolved[index]
+        if candidate in kept or any(parent in kept for parent in candidate.parents):
+            logger.info(f"跳过重复或已包含的路径: {paths[index]}")
+            continue
+        kept.add(candidate)
+        kept_indices.add(index)
+    return [path for index, path in enumerate(paths) if index in kept_indices]
+
 def get_paths_from_clipboard() -> List[Path]:
     """从剪贴板读取多行路径"""
     paths = []
+    if _pyperclip is None:
+        logger.warning("未安装pyperclip模块，无法从剪贴板读取。")
+        return paths
     try:
-        import pyperclip
-        clipboard_content = pyperclip.paste()
+        clipboard_content = _pyperclip.paste()
         if clipboard_content:
-            for line in clipboard_content.splitlines():
-                if line := line.strip().strip('"').strip("'"):
-                    path = Path(line)
-                    if path.exists():
-                        paths.append(path)
-                    else:
-                        logger.warning(f"警告：路径不存在 - {line}")
+            stripped = (line.strip().strip('"').strip("'") for line in clipboard_content.splitlines())
+            candidates = [Path(line) for line in stripped if line]
+            for path, exists in zip(candidates, check_paths_exist(candidates)):
+                if exists:
+                    paths.append(path)
+                else:
+                    logger.warning(f"警告：路径不存在 - {path}")
             
             logger.info(f"从剪贴板读取到 {len(paths)} 个有效路径")
-    except ImportError:
-        logger.warning("未安装pyperclip模块，无法从剪贴板读取。")
     except Exception as e:
         logger.warning(f"读取剪贴板失败: {e}")
     
@@ -194,6 +234,7 @@ def run_interactive() -> None:
     if not paths:
         console.print("[yellow]未选择任何路径，操作取消[/yellow]")
         return False
+    paths = _dedup_paths(paths)
     
     # 选择清理模式
     console.print("\n[bold blue]== 选择清理模式 ==[/bold blue]")
@@ -285,10 +326,8 @@ def run_interactive() -> None:
     # 选择排除关键词
     exclude_keywords = []
     if Confirm.ask("\n是否要排除某些文件夹/文件?", default=False):
-        console.print("请输入排除关键词，多个关键词用逗号分隔:")
-        keywords = input().strip()
-        if keywords:
-            exclude_keywords.extend([kw.strip() for kw in keywords.split(",")])
+        keywords = Prompt.ask("请输入排除关键词，多个关键词用逗号分隔", default="")
+        exclude_keywords.extend(split_keywords(keywords))
       # 最终确认
     if not Confirm.ask(f"\n确认开始清理 {len(paths)} 个路径?", default=True):
         console.print("[yellow]操作已取消[/yellow]")
@@ -298,44 +337,44 @@ def run_interactive() -> None:
     console.print("\n[bold cyan]== 正在扫描要删除的文件... ==[/bold cyan]")
     all_files_to_delete = []
     
+    # 所有备份/临时类预设合并为一次扫描，避免每个预设各自遍历一遍目录树
+    empty_preset_name = None
+    backup_patterns = []
+    for preset_key in selected_presets:
+        if preset_key not in CLEANING_PRESETS:
+            continue
+        preset = CLEANING_PRESETS[preset_key]
+        if preset["function"] == "remove_empty_folders":
+            empty_preset_name = preset["name"]
+        elif preset["function"] == "remove_backup_and_temp":
+            backup_patterns.extend(_preset_patterns(preset))
+    
     for path in paths:
-        for preset_key in selected_presets:
-            if preset_key not in CLEANING_PRESETS:
-                continue
-                
-            preset = CLEANING_PRESETS[preset_key]
-            
+        if empty_preset_name:
             try:
-                if preset["function"] == "remove_empty_folders":
-                    files_to_delete, _ = remove_empty_folders(path, exclude_keywords=exclude_keywords, preview_mode=True)
-                elif preset["function"] == "remove_backup_and_temp":
-                    # 使用预设中定义的patterns
-                    patterns = preset.get("patterns", [])
-                    files_to_delete, _ = remove_backup_and_temp(
-                        path, 
-                        exclude_keywords=exclude_keywords,
-                        custom_patterns=patterns,
-                        preview_mode=True
-                    )
-                else:
-                    continue
-                
-                # 添加标记信息到文件路径
-                for file_path in files_to_delete:
-                    all_files_to_delete.append((file_path, preset['name']))
-                
+                files_to_delete, _ = remove_empty_folders(path, exclude_keywords=exclude_keywords, preview_mode=True)
+                all_files_to_delete.extend(files_to_delete)
             except Exception as e:
-                console.print(f"[red]扫描 {preset['name']} 时出错: {e}[/red]")
+                console.print(f"[red]扫描 {empty_preset_name} 时出错: {e}[/red]")
+        
+        if backup_patterns:
+            try:
+                files_to_delete, _ = remove_backup_and_temp(
+                    path, 
+                    exclude_keywords=exclude_keywords,
+                    custom_patterns=backup_patterns,
+                    preview_mode=True
+                )
+                all_files_to_delete.extend(files_to_delete)
+            except Exception as e:
+                console.print(f"[red]扫描备份/临时文件时出错: {e}[/red]")
     
     # 显示预览
     if all_files_to_delete:
         from cleanf.preview import preview_deletion
         
-        # 只传递路径，不包含预设信息
-        files_only = [item[0] for item in all_files_to_delete]
-        
         # 显示预览并询问确认
-        if not preview_deletion(files_only, "文件删除预览", console):
+        if not preview_deletion(all_files_to_delete, "文件删除预览", console):
             console.print("[yellow]用户取消了删除操作[/yellow]")
             return True
     else:
@@ -359,8 +398,8 @@ def run_interactive() -> None:
                 if preset["function"] == "remove_empty_folders":
                     removed, _ = remove_empty_folders(path, exclude_keywords=exclude_keywords)
                 elif preset["function"] == "remove_backup_and_temp":
-                    # 使用预设中定义的patterns
-                    patterns = preset.get("patterns", [])
+                    # 使用预设中定义的patterns，与预览使用同一份
+                    patterns = _preset_patterns(preset)
                     removed, _ = remove_backup_and_temp(
                         path, 
                         exclude_keywords=exclude_keywords,
@@ -487,11 +526,10 @@ def clean(
     if not path_list:
         logger.info("未提供任何有效的路径", err=True)
         raise typer.Exit(code=1)
+    path_list = _dedup_paths(path_list)
     
     # 处理排除关键词
-    exclude_keywords = []
-    if exclude:
-        exclude_keywords.extend(exclude.split(','))
+    exclude_keywords = split_keywords(exclude)
       # 显示将要执行的操作
     logger.info("将执行以下清理操作:")
     for preset_key in selected_presets:
@@ -515,8 +553,8 @@ def clean(
                     if preset["function"] == "remove_empty_folders":
                         files_to_delete, _ = remove_empty_folders(path, exclude_keywords=exclude_keywords, preview_mode=True)
                     elif preset["function"] == "remove_backup_and_temp":
-                        # 使用预设中定义的patterns
-                        patterns = preset.get("patterns", [])
+                        # 使用预设中定义的patterns，与预览使用同一份
+                        patterns = _preset_patterns(preset)
                         files_to_delete, _ = remove_backup_and_temp(
                             path, 
                             exclude_keywords=exclude_keywords,
@@ -560,8 +598,8 @@ def clean(
                 if preset["function"] == "remove_empty_folders":
                     removed, _ = remove_empty_folders(path, exclude_keywords=exclude_keywords)
                 elif preset["function"] == "remove_backup_and_temp":
-                    # 使用预设中定义的patterns
-                    patterns = preset.get("patterns", [])
+                    # 使用预设中定义的patterns，与预览使用同一份
+                    patterns = _preset_patterns(preset)
                     removed, _ = remove_backup_and_temp(
                         path, 
                         exclude_keywords=exclude_keywords,
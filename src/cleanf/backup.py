@@ -8,6 +8,7 @@ from pathlib import Path
 import fnmatch
 import threading
 import concurrent.futures
+from functools import lru_cache
 from typing import List, Tuple, Dict, Any, Optional
 from loguru import logger
 import re
@@ -58,6 +59,41 @@ def load_delete_patterns_from_json(json_path: str = None) -> List[Tuple[str, str
         return DEFAULT_DELETE_PATTERNS
 
 
+_BACKREF_RE = re.compile(r'\\\d|\(\?P=')
+
+
+@lru_cache(maxsize=32)
+def _compile_patterns(rules: Tuple[Tuple[str, str], ...]) -> Tuple[Any, Any]:
+    """
+    将 (pattern, type) 规则合并为文件、文件夹各一个预编译正则
+
+    每个名称只需一次 C 层 fullmatch，而不是对每条规则逐个调用 re.fullmatch。
+    返回 (文件匹配函数, 文件夹匹配函数)，没有对应规则时为 None。
+    """
+    def fuse(item_types):
+        sources = [pattern for pattern, item_type in rules if item_type in item_types]
+        if not sources:
+            return None
+        # 含反向引用的规则合并后组号会错位，此时退回逐条匹配
+        if not any(_BACKREF_RE.search(source) for source in sources):
+            try:
+                return re.compile('|'.join(f'(?:{source})' for source in sources), re.IGNORECASE).fullmatch
+            except re.error:
+                # 个别规则无法合并（如中途出现内联全局标志）
+                pass
+        compiled = [re.compile(source, re.IGNORECASE).fullmatch for source in sources]
+
+        def match_any(name):
+            for match in compiled:
+                result = match(name)
+                if result:
+                    return result
+            return None
+        return match_any
+
+    return fuse(('file', 'both')), fuse(('dir', 'both'))
+
+
 class BackupCleaner:
     """备份文件和临时文件清理类"""
     def __init__(self):
@@ -91,19 +127,11 @@ class BackupCleaner:
         返回:
         bool: 如果应该删除则为True
         """
-        name = path.name
-        is_dir = path.is_dir()
-        
-        for rule in patterns:
-            pattern = rule["pattern"]
-            item_type = rule["type"]
-            if item_type == 'file' and not is_dir and self.is_match(name, pattern):
-                return True
-            elif item_type == 'dir' and is_dir and self.is_match(name, pattern):
-                return True
-            elif item_type == 'both' and self.is_match(name, pattern):
-                return True
-        return False
+        file_match, dir_match = _compile_patterns(
+            tuple((rule["pattern"], rule["type"]) for rule in patterns)
+        )
+        match = dir_match if path.is_dir() else file_match
+        return match is not None and match(path.name) is not None
     
     def is_excluded(self, path: str, exclude_keywords: List[str]) -> bool:
         """检查路径是否应该被排除"""
@@ -0,0 +1,23 @@
+"""
+命令行辅助函数
+cleanf 与 dissolvef 的命令行入口共用：剪贴板路径检查、关键词拆分
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+
+def check_paths_exist(paths: List[Path]) -> List[bool]:
+    """检查路径是否存在；路径较多时并发 stat，重叠网络盘/慢速磁盘的等待时间"""
+    if len(paths) <= 4:
+        return [path.exists() for path in paths]
+    with ThreadPoolExecutor(max_workers=min(32, len(paths))) as executor:
+        return list(executor.map(Path.exists, paths))
+
+
+def split_keywords(raw: Optional[str]) -> List[str]:
+    """拆分逗号分隔的关键词，去除空白并丢弃空项（空关键词会匹配所有路径）"""
+    if not raw:
+        return []
+    return list(filter(None, (keyword.strip() for keyword in raw.split(","))))
@@ -26,21 +26,24 @@ def scan_empty_folders(path, exclude_keywords=None) -> List[Path]:
     if not path.exists():
         return empty_folders
     
-    # 由底向上遍历查找空文件夹
+    # 由底向上遍历，直接用遍历结果推算每个文件夹在删除子空文件夹后是否为空，
+    # 与 remove_empty_folders 的级联删除一致，且不再为每个子文件夹重新读取目录
+    will_be_empty = {}
     for root, dirs, files in os.walk(path, topdown=False):
+        child_paths = [os.path.join(root, dir_name) for dir_name in dirs]
+
         # 检查当前路径是否包含排除关键词
-        if any(keyword in root for keyword in exclude_keywords):
-            continue
+        if not any(keyword in root for keyword in exclude_keywords):
+            for child_path in child_paths:
+                if will_be_empty.get(child_path, False):
+                    empty_folders.append(Path(child_path))
+                else:
+                    will_be_empty[child_path] = False
+        else:
+            for child_path in child_paths:
+                will_be_empty[child_path] = False
 
-        # 检查每个子文件夹
-        for dir_name in dirs:
-            folder_path = Path(root) / dir_name
-            try:
-                # 检查文件夹是否为空
-                if folder_path.exists() and not any(folder_path.iterdir()):
-                    empty_folders.append(folder_path)
-            except (FileNotFoundError, PermissionError):
-                continue
+        will_be_empty[root] = not files and all(will_be_empty.get(child_path, False) for child_path in child_paths)
     
     return empty_folders
 
@@ -23,6 +23,7 @@ from dissolvef.media import (
 from dissolvef.direct import dissolve_folder
 from dissolvef.archive import release_single_archive_folder, collect_single_archive_paths
 from dissolvef.similarity import check_similarity
+from cleanf.cli_helpers import check_paths_exist, split_keywords
 
 # 创建 Typer 应用
 app = typer.Typer(help="文件夹解散工具 - 解散嵌套文件夹和释放单媒体文件夹")
@@ -189,7 +190,58 @@ def _render_preview_changes_tree(
     console.print(summary)
 
 
-def show_preview_tree_changes(
+def _scan_tree(root: str, topdown: bool = True):
+    """基于 os.scandir 的目录遍历，产出 (dirpath, 子目录 DirEntry 列表, 文件 DirEntry 列表)
+
+    与 os.walk 语义一致：指向目录的符号链接归入子目录但不进入，无法读取的目录直接跳过。
+    DirEntry 自带 readdir 返回的类型信息，调用方判断类型时无需再逐项 stat。
+    """
+    try:
+        with os.scandir(root) as it:
+            entries = list(it)
+    except OSError:
+        return
+
+    dirs = []
+    files = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        (dirs if is_dir else files).append(entry)
+
+    if topdown:
+        yield root, dirs, files
+    for entry in dirs:
+        if not entry.is_symlink():
+            yield from _scan_tree(entry.path, topdown)
+    if not topdown:
+        yield root, dirs, files
+
+
+PreviewResult = Tuple[List[Dict[str, str]], List[Dict[str, str]]]
+
+
+def show_preview_tree_changes(base_path: Path, **options) -> None:
+    """根据当前参数模拟将发生的变更，并输出 Rich 文件树。"""
+    _render_preview_changes_tree(base_path, *_collect_preview_changes(base_path, **options))
+
+
+def _collect_previews(paths: List[Path], **options) -> List[PreviewResult]:
+    """并发扫描多个根目录的预览变更，结果按 paths 顺序返回
+
+    各根目录的扫描互不依赖，并发可以重叠磁盘/网络盘的 I/O 等待；
+    输出仍由调用方在主线程中按顺序完成。
+    """
+    if len(paths) <= 1:
+        return [_collect_preview_changes(path, **options) for path in paths]
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=min(8, len(paths))) as executor:
+        return list(executor.map(lambda path: _collect_preview_changes(path, **options), paths))
+
+
+def _collect_preview_changes(
     base_path: Path,
     *,
     direct_mode: bool,
@@ -200,8 +252,8 @@ def show_preview_tree_changes(
     similarity_threshold: float,
     protect_first_level: bool,
     media_types: Optional[List[str]] = None,
-) -> None:
-    """根据当前参数模拟将发生的变更，并输出 Rich 文件树。"""
+) -> PreviewResult:
+    """根据当前参数模拟将发生的变更，返回 (changes, skipped)，不输出任何内容。"""
     changes: List[Dict[str, str]] = []
     skipped: List[Dict[str, str]] = []
 
@@ -214,117 +266,152 @@ def show_preview_tree_changes(
                 "folder": str(base_path),
                 "detail": f"{item.name} -> {target}",
             })
-        _render_preview_changes_tree(base_path, changes, skipped)
-        return
-
-    for root, dirs, files in os.walk(base_path, topdown=False):
-        root_path = Path(root)
-
-        if any(keyword in str(root_path) for keyword in exclude_keywords):
-            skipped.append({"folder": str(root_path), "reason": "命中排除关键词"})
+        return changes, skipped
+
+    # 循环不变量：媒体类型集合与压缩包后缀只计算一次
+    active_media_types = set(media_types or ["video", "archive", "image"])
+    check_video = "video" in active_media_types
+    check_archive = "archive" in active_media_types
+    check_image = "image" in active_media_types
+    archive_suffixes = {'.zip', '.rar', '.7z', '.cbz', '.cbr'}
+
+    # 内层循环只做字符串运算，不再为每个目录构造 Path
+    base_str = str(base_path)
+    for root, dirs, files in _scan_tree(base_str, topdown=False):
+        parent_str = os.path.dirname(root)
+        root_name = os.path.basename(root)
+
+        if any(keyword in root for keyword in exclude_keywords):
+            skipped.append({"folder": root, "reason": "命中排除关键词"})
             continue
 
-        if protect_first_level and root_path != base_path and root_path.parent == base_path:
-            skipped.append({"folder": str(root_path), "reason": "一级目录保护"})
+        if protect_first_level and root != base_str and parent_str == base_str:
+            skipped.append({"folder": root, "reason": "一级目录保护"})
             continue
 
-        try:
-            items = list(root_path.iterdir())
-        except Exception:
-            continue
-
-        fs_files = [i for i in items if i.is_file()]
-        fs_dirs = [i for i in items if i.is_dir()]
+        # 复用 scandir 的目录项类型信息，不再逐项 stat
+        fs_files = [f for f in files if f.is_file()]
+        fs_dirs = dirs
 
         if media_mode:
-            active_media_types = set(media_types or ["video", "archive", "image"])
             media_files = [
                 f for f in fs_files
                 if (
-                    ("video" in active_media_types and is_video_file(f.name))
-                    or ("archive" in active_media_types and is_media_archive_file(f.name))
-                    or ("image" in active_media_types and is_image_file(f.name))
+                    (check_video and is_video_file(f.name))
+                    or (check_archive and is_media_archive_file(f.name))
+                    or (check_image and is_image_file(f.name))
                 )
             ]
             if len(media_files) == 1 and len(fs_files) == 1 and len(fs_dirs) == 0:
                 media_file = media_files[0]
                 changes.append({
                     "mode": "media",
-                    "folder": str(root_path),
-                    "detail": f"{media_file.name} -> {root_path.parent / media_file.name}",
+                    "folder": root,
+                    "detail": f"{media_file.name} -> {os.path.join(parent_str, media_file.name)}",
                 })
 
         if nested_mode and len(dirs) == 1 and not files:
-            subfolder_name = dirs[0]
+            subfolder_name = dirs[0].name
             if similarity_threshold > 0:
-                passed, sim = check_similarity(root_path.name, subfolder_name, similarity_threshold)
+                passed, sim = check_similarity(root_name, subfolder_name, similarity_threshold)
                 if not passed:
                     skipped.append({
-                        "folder": str(root_path),
+                        "folder": root,
                         "reason": f"相似度不足({sim:.0%}<{similarity_threshold:.0%})",
                     })
                 else:
                     changes.append({
                         "mode": "nested",
-                        "folder": str(root_path),
+                        "folder": root,
                         "detail": f"解散单子目录: {subfolder_name}",
                     })
             else:
                 changes.append({
                     "mode": "nested",
-                    "folder": str(root_path),
+                    "folder": root,
                     "detail": f"解散单子目录: {subfolder_name}",
                 })
 
         if archive_mode:
-            archive_files = [f for f in fs_files if f.suffix.lower() in {'.zip', '.rar', '.7z', '.cbz', '.cbr'}]
+            archive_files = [f for f in fs_files if os.path.splitext(f.name)[1].lower() in archive_suffixes]
             if len(archive_files) == 1 and len(fs_files) == 1 and len(fs_dirs) == 0:
                 archive_file = archive_files[0]
                 if similarity_threshold > 0:
-                    passed, sim = check_similarity(root_path.name, archive_file.stem, similarity_threshold)
+                    passed, sim = check_similarity(root_name, os.path.splitext(archive_file.name)[0], similarity_threshold)
                     if not passed:
                         skipped.append({
-                            "folder": str(root_path),
+                            "folder": root,
                             "reason": f"相似度不足({sim:.0%}<{similarity_threshold:.0%})",
                         })
                     else:
                         changes.append({
                             "mode": "archive",
-                            "folder": str(root_path),
-                            "detail": f"{archive_file.name} -> {root_path.parent / archive_file.name}",
+                            "folder": root,
+                            "detail": f"{archive_file.name} -> {os.path.join(parent_str, archive_file.name)}",
                         })
                 else:
                     changes.append({
                         "mode": "archive",
-                        "folder": str(root_path),
-                        "detail": f"{archive_file.name} -> {root_path.parent / archive_file.name}",
+                        "folder": root,
+                        "detail": f"{archive_file.name} -> {os.path.join(parent_str, archive_file.name)}",
                     })
 
-    _render_preview_changes_tree(base_path, changes, skipped)
+    return changes, skipped
+
+try:
+    import pyperclip as _pyperclip
+except ImportError:
+    _pyperclip = None
 
 def get_paths_from_clipboard() -> List[Path]:
     """从剪贴板读取多行路径"""
     paths = []
+    if _pyperclip is None:
+        logger.warning("未安装pyperclip模块，无法从剪贴板读取。")
+        return paths
     try:
-        import pyperclip
-        clipboard_content = pyperclip.paste()
+        clipboard_content = _pyperclip.paste()
         if clipboard_content:
-            for line in clipboard_content.splitlines():
-                if line := line.strip().strip('"').strip("'"):
-                    path = Path(line)
-                    if path.exists():
-                        paths.append(path)
-                    else:
-                        logger.warning(f"警告：路径不存在 - {line}")
+            stripped = (line.strip().strip('"').strip("'") for line in clipboard_content.splitlines())
+            candidates = [Path(line) for line in stripped if line]
+            for path, exists in zip(candidates, check_paths_exist(candidates)):
+                if exists:
+                    paths.append(path)
+                else:
+                    logger.warning(f"警告：路径不存在 - {path}")
             
             logger.info(f"从剪贴板读取到 {len(paths)} 个有效路径")
-    except ImportError:
-        logger.warning("未安装pyperclip模块，无法从剪贴板读取。")
     except Exception as e:
         logger.warning(f"读取剪贴板失败: {e}")
     
     return paths
 
+# 交互式菜单定义
+_PATH_INPUT_MENU = (
+    ("1", "从剪贴板读取路径"),
+    ("2", "手动输入路径"),
+    ("3", "浏览文件夹"),
+)
+
+_OPERATIONS_MENU = (
+    ("1", "解散单媒体文件夹", "解散只包含单个媒体文件的文件夹"),
+    ("2", "解散嵌套的单一文件夹", "解散只有一个子文件夹的嵌套文件夹"),
+    ("3", "直接解散指定文件夹", "将整个文件夹的内容移动到其父文件夹"),
+    ("4", "全部功能（除直接解散）", "执行选项1和2的操作"),
+    ("5", "解散单压缩包文件夹", "解散只包含单个压缩包的文件夹"),
+    ("6", "收集单压缩包路径合集", "输出可直接批量解压的压缩包路径列表"),
+)
+
+def _build_operations_table() -> Table:
+    """根据 _OPERATIONS_MENU 构建操作表格（Table 有状态，每次展示新建一个）"""
+    table = Table(title="可用操作")
+    table.add_column("序号", style="cyan")
+    table.add_column("操作", style="green")
+    table.add_column("说明", style="magenta")
+    for row in _OPERATIONS_MENU:
+        table.add_row(*row)
+    return table
+
 # Rich交互式界面
 def run_interactive() -> None:
     """运行交互式界面"""
@@ -368,11 +455,10 @@ def run_interactive() -> None:
     paths = []
     
     console.print("请选择路径输入方式:")
-    console.print("1. 从剪贴板读取路径")
-    console.print("2. 手动输入路径")
-    console.print("3. 浏览文件夹")
+    for key, label in _PATH_INPUT_MENU:
+        console.print(f"{key}. {label}")
     
-    choice = Prompt.ask("请选择", choices=["1", "2", "3"], default="1")
+    choice = Prompt.ask("请选择", choices=[key for key, _ in _PATH_INPUT_MENU], default="1")
     
     # 从剪贴板读取
     if choice == "1":
@@ -422,21 +508,9 @@ def run_interactive() -> None:
     # 选择要执行的操作
     console.print("\n[bold blue]== 选择要执行的操作 ==[/bold blue]")
     
-    table = Table(title="可用操作")
-    table.add_column("序号", style="cyan")
-    table.add_column("操作", style="green")
-    table.add_column("说明", style="magenta")
+    console.print(_build_operations_table())
     
-    table.add_row("1", "解散单媒体文件夹", "解散只包含单个媒体文件的文件夹")
-    table.add_row("2", "解散嵌套的单一文件夹", "解散只有一个子文件夹的嵌套文件夹")
-    table.add_row("3", "直接解散指定文件夹", "将整个文件夹的内容移动到其父文件夹")
-    table.add_row("4", "全部功能（除直接解散）", "执行选项1和2的操作")
-    table.add_row("5", "解散单压缩包文件夹", "解散只包含单个压缩包的文件夹")
-    table.add_row("6", "收集单压缩包路径合集", "输出可直接批量解压的压缩包路径列表")
-    
-    console.print(table)
-    
-    choice = Prompt.ask("请选择操作", choices=["1", "2", "3", "4", "5", "6"], default="4")
+    choice = Prompt.ask("请选择操作", choices=[row[0] for row in _OPERATIONS_MENU], default="4")
     
     operations = {
         "media_mode": False,
@@ -461,10 +535,8 @@ def run_interactive() -> None:
     # 选择排除关键词
     exclude_keywords = []
     if (operations["media_mode"] or operations["nested_mode"]) and Confirm.ask("是否要排除某些文件夹/文件?", default=False):
-        console.print("请输入排除关键词，多个关键词用逗号分隔:")
-        keywords = input().strip()
-        if keywords:
-            exclude_keywords.extend([kw.strip() for kw in keywords.split(",")])
+        keywords = Prompt.ask("请输入排除关键词，多个关键词用逗号分隔", default="")
+        exclude_keywords.extend(split_keywords(keywords))
 
     media_types: List[str] = []
     if operations["media_mode"]:
@@ -531,20 +603,21 @@ def run_interactive() -> None:
     if operations["direct_mode"]:
         # 直接解散模式
         console.print("\n[bold cyan]>>> 执行直接解散文件夹操作...[/bold cyan]")
-        for path in paths:
+        previews = _collect_previews(
+            paths,
+            direct_mode=True,
+            media_mode=False,
+            nested_mode=False,
+            archive_mode=False,
+            exclude_keywords=exclude_keywords,
+            similarity_threshold=similarity_threshold,
+            protect_first_level=protect_first_level,
+            media_types=None,
+        ) if preview_mode else []
+        for index, path in enumerate(paths):
             console.print(Rule(f"处理目录: {path}"))
             if preview_mode:
-                show_preview_tree_changes(
-                    path,
-                    direct_mode=True,
-                    media_mode=False,
-                    nested_mode=False,
-                    archive_mode=False,
-                    exclude_keywords=exclude_keywords,
-                    similarity_threshold=similarity_threshold,
-                    protect_first_level=protect_first_level,
-                    media_types=None,
-                )
+                _render_preview_changes_tree(path, *previews[index])
             success, files_count, dirs_count = dissolve_folder(
                 path, 
                 file_conflict=file_conflict,
@@ -558,20 +631,21 @@ def run_interactive() -> None:
                 total_dissolved_dirs += dirs_count
     else:
         # 其他解散模式
-        for path in paths:
+        previews = _collect_previews(
+            paths,
+            direct_mode=False,
+            media_mode=operations["media_mode"],
+            nested_mode=operations["nested_mode"],
+            archive_mode=operations["archive_mode"],
+            exclude_keywords=exclude_keywords,
+            similarity_threshold=similarity_threshold,
+            protect_first_level=protect_first_level,
+            media_types=media_types,
+        ) if preview_mode else []
+        for index, path in enumerate(paths):
             console.print(Rule(f"处理目录: {path}"))
             if preview_mode:
-                show_preview_tree_changes(
-                    path,
-                    direct_mode=False,
-                    media_mode=operations["media_mode"],
-                    nested_mode=operations["nested_mode"],
-                    archive_mode=operations["archive_mode"],
-                    exclude_keywords=exclude_keywords,
-                    similarity_threshold=similarity_threshold,
-                    protect_first_level=protect_first_level,
-                    media_types=media_types,
-                )
+                _render_preview_changes_tree(path, *previews[index])
             if operations["media_mode"]:
                 console.print("\n[bold cyan]>>> 解散单媒体文件夹...[/bold cyan]")
                 count = release_single_media_folder(
@@ -749,9 +823,7 @@ def dissolve(
         raise typer.Exit(code=1)
     
     # 处理排除关键词
-    exclude_keywords = []
-    if exclude:
-        exclude_keywords.extend(exclude.split(','))
+    exclude_keywords = split_keywords(exclude)
     
     # 处理每个路径
     total_dissolved_folders = 0
@@ -765,20 +837,21 @@ def dissolve(
     if direct:
         # 直接解散模式
         typer.echo("\n>>> 执行直接解散文件夹操作...")
-        for path in path_list:
+        previews = _collect_previews(
+            path_list,
+            direct_mode=True,
+            media_mode=False,
+            nested_mode=False,
+            archive_mode=False,
+            exclude_keywords=exclude_keywords,
+            similarity_threshold=similarity_threshold,
+            protect_first_level=protect_first_level,
+            media_types=None,
+        ) if preview else []
+        for index, path in enumerate(path_list):
             typer.echo(f"\n处理目录: {path}")
             if preview:
-                show_preview_tree_changes(
-                    path,
-                    direct_mode=True,
-                    media_mode=False,
-                    nested_mode=False,
-                    archive_mode=False,
-                    exclude_keywords=exclude_keywords,
-                    similarity_threshold=similarity_threshold,
-                    protect_first_level=protect_first_level,
-                    media_types=None,
-                )
+                _render_preview_changes_tree(path, *previews[index])
             success, files_count, dirs_count = dissolve_folder(
                 path, 
                 file_conflict=str(file_conflict),
@@ -791,20 +864,21 @@ def dissolve(
                 total_dissolved_dirs += dirs_count
     else:
         # 其他解散模式
-        for path in path_list:
+        previews = _collect_previews(
+            path_list,
+            direct_mode=False,
+            media_mode=media_mode,
+            nested_mode=nested_mode,
+            archive_mode=archive_mode,
+            exclude_keywords=exclude_keywords,
+            similarity_threshold=similarity_threshold,
+            protect_first_level=protect_first_level,
+            media_types=media_types_list,
+        ) if preview else []
+        for index, path in enumerate(path_list):
             typer.echo(f"\n处理目录: {path}")
             if preview:
-                show_preview_tree_changes(
-                    path,
-                    direct_mode=False,
-                    media_mode=media_mode,
-                    nested_mode=nested_mode,
-                    archive_mode=archive_mode,
-                    exclude_keywords=exclude_keywords,
-                    similarity_threshold=similarity_threshold,
-                    protect_first_level=protect_first_level,
-                    media_types=media_types_list,
-                )
+                _render_preview_changes_tree(path, *previews[index])
             if media_mode:
                 typer.echo("\n>>> 解散单媒体文件夹...")
                 count = release_single_media_folder(
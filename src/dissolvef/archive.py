@@ -14,19 +14,22 @@ from rich.console import Console
 import rich.status
 from loguru import logger
 
+from .output import BufferedPrinter
 from .path_filter import filter_archive_paths
 from .similarity import check_similarity
+from .throttle import UpdateThrottle
 from .undo import undo_manager
 
 console = Console()
 
 # 支持的压缩包格式
 ARCHIVE_FORMATS = {'.zip', '.rar', '.7z', '.cbz', '.cbr'}
+_ARCHIVE_EXTS = tuple(ARCHIVE_FORMATS)
 
 
 def is_archive_file(filename) -> bool:
     """判断文件是否为压缩包文件"""
-    return any(str(filename).lower().endswith(ext) for ext in ARCHIVE_FORMATS)
+    return str(filename).lower().endswith(_ARCHIVE_EXTS)
 
 
 def release_single_archive_folder(
@@ -81,6 +84,8 @@ def release_single_archive_folder(
     message = f"{'预览' if preview else '开始处理'}单压缩包文件夹: {path}"
     console.print(message)
     
+    # 预览时合并输出，避免每个文件夹单独写终端
+    out = BufferedPrinter(console, enabled=preview)
     try:
         # 收集所有需要检查的文件夹路径
         all_folders = []
@@ -108,11 +113,12 @@ def release_single_archive_folder(
             valid_folders = filtered_folders
         
         # 处理有效的文件夹
+        throttle = UpdateThrottle()
         for root_path in valid_folders:
             if protect_first_level and root_path != path and root_path.parent == path:
                 continue
 
-            if status_started:
+            if status_started and throttle.due():
                 status.update(f"检查文件夹: {root_path.name}")
             
             try:
@@ -132,13 +138,13 @@ def release_single_archive_folder(
                         passed, similarity = check_similarity(folder_name, archive_name, similarity_threshold)
                         if not passed:
                             similarity_skipped += 1
-                            console.print(f"  ⏭️ 跳过: [cyan]{folder_name}[/cyan]/[yellow]{archive_file.name}[/yellow] (相似度 {similarity:.0%} < {similarity_threshold:.0%})")
+                            out.print(f"  ⏭️ 跳过: [cyan]{folder_name}[/cyan]/[yellow]{archive_file.name}[/yellow] (相似度 {similarity:.0%} < {similarity_threshold:.0%})")
                             continue
                         else:
-                            console.print(f"  ✓ 匹配: [cyan]{folder_name}[/cyan]/[green]{archive_file.name}[/green] (相似度 {similarity:.0%})")
+                            out.print(f"  ✓ 匹配: [cyan]{folder_name}[/cyan]/[green]{archive_file.name}[/green] (相似度 {similarity:.0%})")
                     
-                    console.print(f"\n找到符合条件的文件夹: [cyan]{root_path}[/cyan]")
-                    console.print(f"- 单个压缩包文件: [green]{archive_file.name}[/green]")
+                    out.print(f"\n找到符合条件的文件夹: [cyan]{root_path}[/cyan]")
+                    out.print(f"- 单个压缩包文件: [green]{archive_file.name}[/green]")
                     
                     parent_dir = root_path.parent
                     target_path = parent_dir / archive_file.name
@@ -153,7 +159,7 @@ def release_single_archive_folder(
                             logger.info(f"- 目标文件已存在，尝试新名称: {new_name}")
                     
                     logger.info(f"- {'将' if preview else ''}移动文件: {archive_file} -> {target_path}")
-                    console.print(f"- {'将' if preview else ''}移动文件: [blue]{archive_file.name}[/blue] -> [green]{target_path}[/green]")
+                    out.print(f"- {'将' if preview else ''}移动文件: [blue]{archive_file.name}[/blue] -> [green]{target_path}[/green]")
                     
                     if not preview:
                         try:
@@ -170,18 +176,19 @@ def release_single_archive_folder(
                             processed_count += 1
                             logger.info("- 文件移动成功")
                             logger.info("- 文件夹删除成功")
-                            console.print("- [green]文件移动成功[/green]")
-                            console.print("- [green]文件夹删除成功[/green]")
+                            out.print("- [green]文件移动成功[/green]")
+                            out.print("- [green]文件夹删除成功[/green]")
                         except Exception as e:
                             logger.error(f"处理文件夹时出错 {root_path}: {str(e)}")
-                            console.print(f"[red]处理文件夹时出错[/red] {root_path}: {str(e)}")
+                            out.print(f"[red]处理文件夹时出错[/red] {root_path}: {str(e)}")
                     else:
                         processed_count += 1
                         
             except Exception as e:
                 logger.error(f"处理文件夹时出错 {root_path}: {str(e)}")
-                console.print(f"[red]处理文件夹时出错[/red] {root_path}: {str(e)}")
+                out.print(f"[red]处理文件夹时出错[/red] {root_path}: {str(e)}")
         
+        out.flush()
         # 完成撤销批次
         if not preview and enable_undo:
             operation_id = undo_manager.finish_batch()
@@ -204,6 +211,7 @@ def release_single_archive_folder(
         return processed_count, similarity_skipped
         
     except Exception as e:
+        out.flush()
         logger.error(f"解散单压缩包文件夹出错: {e}")
         if status_started:
             status.stop()
@@ -278,11 +286,13 @@ def collect_single_archive_paths(
                     logger.info(f"跳过含有排除关键词的文件夹: {folder}")
             valid_folders = filtered_folders
 
+        throttle = UpdateThrottle()
         for root_path in valid_folders:
             if protect_first_level and root_path != path and root_path.parent == path:
                 continue
 
-            status.update(f"检查文件夹: {root_path.name}")
+            if throttle.due():
+                status.update(f"检查文件夹: {root_path.name}")
 
             try:
                 items = list(root_path.iterdir())
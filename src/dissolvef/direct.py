@@ -12,6 +12,8 @@ from rich.console import Console
 import rich.status
 from loguru import logger
 
+from dissolvef.throttle import UpdateThrottle
+
 console = Console()
 
 def handle_name_conflict(target_path, is_dir=False, mode='auto'):
@@ -121,11 +123,12 @@ def dissolve_folder(path, file_conflict='auto', dir_conflict='auto', preview=Fal
         
         logger.info(f"找到 {len([i for i in items if i.is_file()])} 个文件和 {len([i for i in items if i.is_dir()])} 个文件夹")
         
+        throttle = UpdateThrottle()
         for item in items:
             target_path = parent_dir / item.name
             is_dir = item.is_dir()
               # 更新状态
-            if status and not preview:
+            if status and not preview and throttle.due():
                 status.update(f"处理: {item.name}")
             
             # 处理名称冲突
@@ -11,6 +11,9 @@ from rich.console import Console
 import rich.status
 from loguru import logger
 
+from dissolvef.output import BufferedPrinter
+from dissolvef.throttle import UpdateThrottle
+
 console = Console()
 
 # 支持的视频格式
@@ -22,17 +25,48 @@ ARCHIVE_FORMATS = {'.zip', '.rar', '.7z', '.cbz', '.cbr'}
 # 支持的图片格式
 IMAGE_FORMATS = {'.jpg', '.jpeg', '.png', '.webp', '.avif', '.gif', '.bmp', '.tif', '.tiff'}
 
+# str.endswith 接受元组，一次 C 层调用完成所有后缀匹配（集合中的后缀均为小写）
+_VIDEO_EXTS = tuple(VIDEO_FORMATS)
+_ARCHIVE_EXTS = tuple(ARCHIVE_FORMATS)
+_IMAGE_EXTS = tuple(IMAGE_FORMATS)
+
 def is_video_file(filename):
     """判断文件是否为视频文件"""
-    return any(str(filename).lower().endswith(ext) for ext in VIDEO_FORMATS)
+    return str(filename).lower().endswith(_VIDEO_EXTS)
 
 def is_archive_file(filename):
     """判断文件是否为压缩包文件"""
-    return any(str(filename).lower().endswith(ext) for ext in ARCHIVE_FORMATS)
+    return str(filename).lower().endswith(_ARCHIVE_EXTS)
 
 def is_image_file(filename):
     """判断文件是否为图片文件"""
-    return any(str(filename).lower().endswith(ext) for ext in IMAGE_FORMATS)
+    return str(filename).lower().endswith(_IMAGE_EXTS)
+
+def _single_media_file(path, media_types):
+    """目录中只有一个文件、没有子文件夹且该文件属于所选媒体类型时返回它，否则返回 None
+
+    遇到子文件夹或第二个文件时立即停止读取，不必列出整个目录。
+    """
+    found = None
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir():
+                return None
+            if entry.is_file():
+                if found is not None:
+                    return None
+                found = entry
+    if found is None:
+        return None
+
+    name = found.name
+    if (
+        ("video" in media_types and is_video_file(name))
+        or ("archive" in media_types and is_archive_file(name))
+        or ("image" in media_types and is_image_file(name))
+    ):
+        return Path(found.path)
+    return None
 
 def release_single_media_folder(
     path,
@@ -83,11 +117,14 @@ def release_single_media_folder(
       # 记录开始处理
     message = f"{'预览' if preview else '开始处理'}单媒体文件夹: {path}"
     console.print(message)
+    # 预览时合并输出，避免每个文件夹单独写终端
+    out = BufferedPrinter(console, enabled=preview)
     try:
         # 初始化结果消息，确保在任何路径都能访问到
         result_message = ""
         
-        for root, dirs, files in os.walk(path, topdown=False):
+        throttle = UpdateThrottle()
+        for root, _, _ in os.walk(path, topdown=False):
             root_path = Path(root)
 
             # 保护输入路径下一级目录：不直接解散这些目录
@@ -99,44 +136,14 @@ def release_single_media_folder(
                 logger.info(f"跳过含有排除关键词的文件夹: {root}")
                 continue
               # 更新状态
-            if not preview:
+            if not preview and throttle.due():
                 status.update(f"检查文件夹: {root_path.name}")
             # logger.info(f"检查文件夹: {root}")
             
             try:
-                # 获取文件夹中的所有项目
-                items = list(root_path.iterdir())
-                
-                # 分别统计文件和文件夹
-                files = [item for item in items if item.is_file()]
-                dirs = [item for item in items if item.is_dir()]
-                
-                # logger.info(f"- 包含 {len(dirs)} 个子文件夹")
-                # logger.info(f"- 包含 {len(files)} 个文件")
-                
-                # 过滤出视频文件和压缩包文件
-                # 确保处理的是Path对象，避免字符串没有name属性的错误
-                media_files = []
-                for f in files:
-                    try:
-                        if isinstance(f, str):
-                            f = Path(f)
-                        is_video = is_video_file(f.name)
-                        is_archive = is_archive_file(f.name)
-                        is_image = is_image_file(f.name)
-                        if (
-                            (is_video and "video" in media_types)
-                            or (is_archive and "archive" in media_types)
-                            or (is_image and "image" in media_types)
-                        ):
-                            media_files.append(f)
-                    except Exception as e:
-                        logger.warning(f"处理文件时出错: {f}, 错误: {str(e)}")
-                        continue
-                
                 # 如果文件夹中只有一个媒体文件且没有其他文件和文件夹
-                if len(media_files) == 1 and len(files) == 1 and len(dirs) == 0:
-                    media_file = media_files[0]
+                media_file = _single_media_file(root, media_types)
+                if media_file is not None:
                     if is_video_file(media_file.name):
                         media_type = "视频"
                     elif is_archive_file(media_file.name):
@@ -144,8 +151,8 @@ def release_single_media_folder(
                     else:
                         media_type = "图片"
                     
-                    console.print(f"\n找到符合条件的文件夹: [cyan]{root}[/cyan]")
-                    console.print(f"- 单个{media_type}文件: [green]{media_file.name}[/green]")
+                    out.print(f"\n找到符合条件的文件夹: [cyan]{root}[/cyan]")
+                    out.print(f"- 单个{media_type}文件: [green]{media_file.name}[/green]")
                     
                     parent_dir = root_path.parent
                     target_path = parent_dir / media_file.name
@@ -161,7 +168,7 @@ def release_single_media_folder(
                             logger.info(f"- 目标文件已存在，尝试新名称: {new_name}")
                       # 显示将要执行的操作
                     logger.info(f"- {'将' if preview else ''}移动文件: {media_file} -> {target_path}")
-                    console.print(f"- {'将' if preview else ''}移动文件: [blue]{media_file.name}[/blue] -> [green]{target_path}[/green]")
+                    out.print(f"- {'将' if preview else ''}移动文件: [blue]{media_file.name}[/blue] -> [green]{target_path}[/green]")
                     
                     # 如果不是预览模式，实际执行移动
                     if not preview:
@@ -175,31 +182,23 @@ def release_single_media_folder(
                             
                             logger.info("- 文件移动成功")
                             logger.info("- 文件夹删除成功")
-                            console.print("- [green]文件移动成功[/green]")
-                            console.print("- [green]文件夹删除成功[/green]")
+                            out.print("- [green]文件移动成功[/green]")
+                            out.print("- [green]文件夹删除成功[/green]")
                                 
                         except Exception as e:
                             logger.error(f"处理文件夹时出错 {root}:")
                             logger.error(f"错误信息: {str(e)}")
-                            console.print(f"[red]处理文件夹时出错[/red] {root}:")
-                            console.print(f"错误信息: {str(e)}")
+                            out.print(f"[red]处理文件夹时出错[/red] {root}:")
+                            out.print(f"错误信息: {str(e)}")
                     else:
                         # 预览模式下，只计数不实际执行
                         processed_count += 1
-                    if len(media_files) > 0 and preview:
-                        logger.info(f"不符合处理条件: {root}")
-                        logger.info(f"- 媒体文件数: {len(media_files)} (需要为1)")
-                        logger.info(f"- 总文件数: {len(files)} (需要为1)")
-                        logger.info(f"- 子文件夹数: {len(dirs)} (需要为0)")
-                        console.print(f"[yellow]不符合处理条件[/yellow]: {root}")
-                        console.print(f"- 媒体文件数: {len(media_files)} (需要为1)")
-                        console.print(f"- 总文件数: {len(files)} (需要为1)")
-                        console.print(f"- 子文件夹数: {len(dirs)} (需要为0)")
             except Exception as e:
                 logger.error(f"处理文件夹时出错 {root}:")
                 logger.error(f"错误信息: {str(e)}")
-                console.print(f"[red]处理文件夹时出错[/red] {root}:")
-                console.print(f"错误信息: {str(e)}")
+                out.print(f"[red]处理文件夹时出错[/red] {root}:")
+                out.print(f"错误信息: {str(e)}")
+        out.flush()
           # 打印处理结果
         result_message = f"单媒体文件夹{'预览' if preview else '处理'}完成，共{'发现' if preview else '处理了'} {processed_count} 个文件夹"
         if processed_count == 0:
@@ -212,6 +211,7 @@ def release_single_media_folder(
         
         return processed_count
     except Exception as e:
+        out.flush()
         logger.error(f"解散单媒体文件夹出错: {e}")
         if status_started:
             status.stop()
@@ -14,11 +14,25 @@ import rich.status
 from loguru import logger
 
 from .similarity import check_similarity
+from .throttle import UpdateThrottle
 from .undo import undo_manager
 
 console = Console()
 
 
+def _single_subdir(path):
+    """目录中只有一个子文件夹且没有文件时返回该子文件夹，否则返回 None（遇到第二项即停止读取）"""
+    found = None
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir():
+                if found is not None:
+                    return None
+                found = entry
+            elif entry.is_file():
+                return None
+    return Path(found.path) if found is not None else None
+
 def flatten_single_subfolder(
     path,
     exclude_keywords: Optional[List[str]] = None,
@@ -77,6 +91,7 @@ def flatten_single_subfolder(
         _log(f"[bold cyan]预览模式:[/bold cyan] 不会实际移动文件")
     
     try:
+        throttle = UpdateThrottle()
         for root, dirs, files in os.walk(path):
             root_path = Path(root)
 
@@ -89,7 +104,7 @@ def flatten_single_subfolder(
                 continue
             
             # 更新状态
-            if status_started:
+            if status_started and throttle.due():
                 status.update(f"检查文件夹: {root_path.name}")
             
             # 如果当前文件夹只有一个子文件夹且没有文件
@@ -112,14 +127,10 @@ def flatten_single_subfolder(
                     # 找到最深层的单一子文件夹
                     current_subfolder = subfolder_path
                     while True:
-                        sub_items = list(current_subfolder.iterdir())
-                        sub_dirs = [item for item in sub_items if item.is_dir()]
-                        sub_files = [item for item in sub_items if item.is_file()]
-                        
-                        if len(sub_dirs) == 1 and not sub_files:
-                            current_subfolder = sub_dirs[0]
-                            continue
-                        break
+                        single_subdir = _single_subdir(current_subfolder)
+                        if single_subdir is None:
+                            break
+                        current_subfolder = single_subdir
                     
                     # 移动最深层子文件夹中的所有内容到母文件夹
                     for item in current_subfolder.iterdir():
@@ -0,0 +1,36 @@
+"""
+批量输出模块
+
+预览扫描会为每个符合条件的文件夹输出多行信息，逐行 console.print 时
+每次都要解析 markup 并写入终端。这里把多行合并后一次性输出。
+"""
+
+from typing import List
+
+
+class BufferedPrinter:
+    """缓存待输出的行，在 flush 或超过大小上限时合并为一次 console.print"""
+
+    def __init__(self, console, enabled: bool = True, limit: int = 64 * 1024):
+        self.console = console
+        self.enabled = enabled
+        self.limit = limit
+        self._lines: List[str] = []
+        self._size = 0
+
+    def print(self, text: str) -> None:
+        """输出一行；未启用缓存时直接打印"""
+        if not self.enabled:
+            self.console.print(text)
+            return
+        self._lines.append(text)
+        self._size += len(text) + 1
+        if self._size >= self.limit:
+            self.flush()
+
+    def flush(self) -> None:
+        """输出所有缓存的行"""
+        if self._lines:
+            self.console.print("\n".join(self._lines))
+            self._lines.clear()
+            self._size = 0
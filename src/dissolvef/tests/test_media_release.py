@@ -0,0 +1,39 @@
+import tempfile
+from pathlib import Path
+
+from dissolvef.media import release_single_media_folder
+
+
+def test_release_single_media_folder_basic():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+
+        # 符合条件：仅一个视频
+        folder_ok = root / "group" / "movie"
+        folder_ok.mkdir(parents=True)
+        (folder_ok / "movie.mp4").write_text("video")
+
+        # 不符合条件：包含额外文件
+        folder_extra = root / "group" / "extra"
+        folder_extra.mkdir()
+        (folder_extra / "extra.mp4").write_text("video")
+        (folder_extra / "notes.txt").write_text("txt")
+
+        # 不符合条件：包含子文件夹
+        folder_sub = root / "group" / "sub"
+        (folder_sub / "child").mkdir(parents=True)
+        (folder_sub / "sub.zip").write_text("zip")
+
+        # 不符合条件：媒体类型未选择
+        folder_image = root / "group" / "image"
+        folder_image.mkdir()
+        (folder_image / "cover.jpg").write_text("jpg")
+
+        count = release_single_media_folder(root, media_types=["video", "archive"])
+
+        assert count == 1
+        assert (root / "group" / "movie.mp4").exists()
+        assert not folder_ok.exists()
+        assert (folder_extra / "extra.mp4").exists()
+        assert (folder_sub / "sub.zip").exists()
+        assert (folder_image / "cover.jpg").exists()
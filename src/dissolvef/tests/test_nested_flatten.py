@@ -28,7 +28,6 @@ def test_flatten_single_subfolder_max_depth():
         make_nested_dirs(root, ["a", ["b", ["c", ["d"]]]])
         # 在最深层放一个文件
         file_path = root / "a" / "b" / "c" / "d" / "test.txt"
-        file_path.parent.mkdir(parents=True, exist_ok=True)
         file_path.write_text("hello")
         # 限制只解散2层
         count = flatten_single_subfolder(root / "a", max_depth=2)
@@ -45,7 +44,6 @@ def test_flatten_single_subfolder_no_limit():
         root = Path(tmpdir)
         make_nested_dirs(root, ["a", ["b", ["c", ["d"]]]])
         file_path = root / "a" / "b" / "c" / "d" / "test.txt"
-        file_path.parent.mkdir(parents=True, exist_ok=True)
         file_path.write_text("hello")
         # 不限制层数
         count = flatten_single_subfolder(root / "a")
@@ -0,0 +1,26 @@
+from unittest.mock import MagicMock
+
+from dissolvef.output import BufferedPrinter
+
+
+def test_buffered_printer_joins_lines_on_flush():
+    console = MagicMock()
+    out = BufferedPrinter(console)
+    out.print("a")
+    out.print("b")
+    console.print.assert_not_called()
+    out.flush()
+    console.print.assert_called_once_with("a\nb")
+    out.flush()
+    assert console.print.call_count == 1
+
+
+def test_buffered_printer_flushes_at_limit_and_passes_through_when_disabled():
+    console = MagicMock()
+    out = BufferedPrinter(console, limit=4)
+    out.print("abc")
+    console.print.assert_called_once_with("abc")
+
+    direct = BufferedPrinter(console, enabled=False)
+    direct.print("x")
+    console.print.assert_called_with("x")
@@ -0,0 +1,10 @@
+from unittest.mock import patch
+
+from dissolvef.throttle import UpdateThrottle
+
+
+def test_update_throttle_gates_by_interval():
+    with patch("dissolvef.throttle.time.monotonic", side_effect=[0.0, 0.0, 0.05, 0.1, 0.15, 0.25]):
+        throttle = UpdateThrottle(interval=0.1)
+        results = [throttle.due() for _ in range(5)]
+    assert results == [True, False, True, False, True]
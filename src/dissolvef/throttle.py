@@ -0,0 +1,24 @@
+"""
+状态刷新节流模块
+
+rich 的 Status.update 每次都会重绘终端中的实时区域，逐目录调用时终端输出
+可能比文件系统扫描本身还慢。这里按固定时间间隔放行更新。
+"""
+
+import time
+
+
+class UpdateThrottle:
+    """按最小时间间隔放行状态更新（默认约 10 Hz）"""
+
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self._next_tick = time.monotonic()
+
+    def due(self) -> bool:
+        """距上次放行已超过间隔时返回 True，并开始新的计时"""
+        now = time.monotonic()
+        if now < self._next_tick:
+            return False
+        self._next_tick = now + self.interval
+        return True
@@ -170,10 +170,10 @@ def list_backups(
             console.print(f"[bold red]路径不存在: {path}[/]")
             return
 
-        backup_folders = []
-        for item in search_path.iterdir():
-            if item.is_dir() and item.name.startswith("mergef_backup_"):
-                backup_folders.append(item)
+        # scandir 的目录项自带类型信息，先按名称过滤再判断是否为目录
+        with os.scandir(search_path) as it:
+            backup_folders = [entry for entry in it
+                              if entry.name.startswith("mergef_backup_") and entry.is_dir()]
 
         if not backup_folders:
             console.print(f"[yellow]在 {path} 中未找到任何备份文件夹[/]")
@@ -1,6 +1,7 @@
 """
 migrate 包的命令行入口点，使用 Typer 实现命令行界面
 """
+import errno
 import re
 import shutil
 import sys
@@ -309,85 +310,14 @@ def collect_files_from_paths(source_paths: list[str], preserve_structure: bool =
     return all_files
 
 
-# --- 新增：处理单个文件的函数 ---
-def process_single_file(source_file_str: str, target_root: Path, progress: Progress, task_id, lock: Lock, counters: dict, action: str = 'copy', preserve_structure: bool = True):
-    """处理单个文件的迁移逻辑。"""
-    source_file = Path(source_file_str).resolve()
-    file_name = source_file.name # 提前获取文件名，避免后续路径问题
-
+def _move_file(source_file: str, target_file_path: str):
+    """移动单个文件：优先使用原子的 os.replace，跨设备时回退到复制 + 删除。"""
     try:
-        # 再次检查文件是否存在且是文件
-        if not source_file.is_file():
-            with lock:
-                logger.warning(f"跳过: 源 '{file_name}' 在处理时不是文件或已消失")
-                # console.print(f"  [yellow]跳过:[/yellow] 源 '{file_name}' 在处理时不是文件或已消失。")
-                counters['skipped'] += 1
-            progress.update(task_id, advance=1, description=f"[yellow]跳过:[/yellow] [dim]{file_name}[/dim]")
-            return "skipped"
-
-        # --- 确定目标路径 ---
-        if preserve_structure:
-            # 保持目录结构模式
-            try:
-                drive, path_without_drive = os.path.splitdrive(source_file)
-                relative_parts = path_without_drive.strip(os.sep).split(os.sep)
-                relative_path = Path(*relative_parts)
-                target_file_path = target_root / relative_path
-            except Exception as e:
-                with lock:
-                    logger.error(f"错误: 无法确定文件 '{file_name}' 的相对路径: {e}")
-                    # console.print(f"  [red]错误:[/red] 无法确定文件 '{file_name}' 的相对路径: {e}。")
-                    counters['error'] += 1
-                progress.update(task_id, advance=1, description=f"[red]错误(路径):[/red] [dim]{file_name}[/dim]")
-                return "error"
-        else:
-            # 扁平迁移模式 - 直接放到目标目录
-            target_file_path = target_root / file_name
-
-        # --- 创建目标目录 (需要加锁保护，防止多线程同时创建) ---
-        try:
-            # 加锁以确保目录创建的原子性，避免竞争条件
-            with lock:
-                target_file_path.parent.mkdir(parents=True, exist_ok=True)
-        except Exception as e:
-            with lock:
-                logger.error(f"错误: 无法创建目标目录 '{target_file_path.parent}' : {e}。跳过文件 '{file_name}")
-                # console.print(f"  [red]错误:[/red] 无法创建目标目录 '{target_file_path.parent}' : {e}。跳过文件 '{file_name}。")
-                counters['error'] += 1
-            progress.update(task_id, advance=1, description=f"[red]错误(目录):[/red] [dim]{file_name}[/dim]")
-            return "error"
-
-        # --- 复制或移动文件 ---
-        try:
-            if action == 'move':
-                shutil.move(str(source_file), target_file_path) # shutil.move 需要字符串路径
-                with lock:
-                    counters['migrated'] += 1
-                progress.update(task_id, advance=1, description=f"[blue]移动:[/blue] [dim]{file_name}[/dim]")
-            else: # 默认为 copy
-                shutil.copy2(source_file, target_file_path)
-                with lock:
-                    counters['migrated'] += 1
-                progress.update(task_id, advance=1, description=f"[green]复制:[/green] [dim]{file_name}[/dim]")
-            return "success"
-        except Exception as e:
-            with lock:
-                action_verb = "移动" if action == 'move' else "复制"
-                logger.error(f"错误: {action_verb}文件 '{file_name}' 到 '{target_file_path}' 时出错: {e}")
-                # console.print(f"  [red]错误:[/red] {action_verb}文件 '{file_name}' 到 '{target_file_path}' 时出错: {e}")
-                counters['error'] += 1
-            progress.update(task_id, advance=1, description=f"[red]错误({action}):[/red] [dim]{file_name}[/dim]")
-            return "error"
-
-    except Exception as e:
-        # 捕获处理单个文件的其他意外错误
-        with lock:
-            logger.error(f"处理文件 '{source_file_str}' 时发生意外错误: {e}")
-            # console.print(f"[bold red]处理文件 '{source_file_str}' 时发生意外错误: {e}[/bold red]")
-            counters['error'] += 1
-        progress.update(task_id, advance=1, description=f"[red]错误(未知):[/red] [dim]{file_name}[/dim]")
-        return "error"
-# --- 函数结束 ---
+        os.replace(source_file, target_file_path)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(source_file, target_file_path)
 
 
 def migrate_files_with_structure(source_file_paths: list[str], target_root_dir: str, max_workers: int | None = None, action: str = 'copy', preserve_structure: bool = True):
@@ -426,6 +356,78 @@ def migrate_files_with_structure(source_file_paths: list[str], target_root_dir:
     lock = Lock()
     # --- 修改结束 ---
 
+    # 按 action 一次性选定操作函数和描述文本，避免在每个文件上重复判断
+    if action == 'move':
+        _do = _move_file
+        _desc_prefix = "[blue]移动:[/blue]"
+        _err_verb = "移动"
+    else: # 默认为 copy
+        _do = shutil.copy2
+        _desc_prefix = "[green]复制:[/green]"
+        _err_verb = "复制"
+    _err_desc_prefix = f"[red]错误({action}):[/red]"
+    target_root_str = os.fspath(target_root)
+
+    def migrate_single_file(source_file_str: str):
+        """处理单个文件的迁移逻辑。
+
+        热路径上只使用字符串 + os.path，避免每个文件都构造 Path 对象。
+        """
+        source_file = os.path.realpath(source_file_str)
+        file_name = os.path.basename(source_file) # 提前获取文件名，避免后续路径问题
+
+        try:
+            # 再次检查文件是否存在且是文件
+            if not os.path.isfile(source_file):
+                with lock:
+                    logger.warning(f"跳过: 源 '{file_name}' 在处理时不是文件或已消失")
+                    counters['skipped'] += 1
+                progress.update(task_id, advance=1, description=f"[yellow]跳过:[/yellow] [dim]{file_name}[/dim]")
+                return "skipped"
+
+            # --- 确定目标路径 ---
+            if preserve_structure:
+                # 保持目录结构模式
+                drive, path_without_drive = os.path.splitdrive(source_file)
+                target_file_path = os.path.join(target_root_str, path_without_drive.strip(os.sep))
+            else:
+                # 扁平迁移模式 - 直接放到目标目录
+                target_file_path = os.path.join(target_root_str, file_name)
+            target_parent = os.path.dirname(target_file_path)
+
+            # --- 创建目标目录 (需要加锁保护，防止多线程同时创建) ---
+            try:
+                with lock:
+                    os.makedirs(target_parent, exist_ok=True)
+            except Exception as e:
+                with lock:
+                    logger.error(f"错误: 无法创建目标目录 '{target_parent}' : {e}。跳过文件 '{file_name}'")
+                    counters['error'] += 1
+                progress.update(task_id, advance=1, description=f"[red]错误(目录):[/red] [dim]{file_name}[/dim]")
+                return "error"
+
+            # --- 复制或移动文件 ---
+            try:
+                _do(source_file, target_file_path)
+                with lock:
+                    counters['migrated'] += 1
+                progress.update(task_id, advance=1, description=f"{_desc_prefix} [dim]{file_name}[/dim]")
+                return "success"
+            except Exception as e:
+                with lock:
+                    logger.error(f"错误: {_err_verb}文件 '{file_name}' 到 '{target_file_path}' 时出错: {e}")
+                    counters['error'] += 1
+                progress.update(task_id, advance=1, description=f"{_err_desc_prefix} [dim]{file_name}[/dim]")
+                return "error"
+
+        except Exception as e:
+            # 捕获处理单个文件的其他意外错误
+            with lock:
+                logger.error(f"处理文件 '{source_file_str}' 时发生意外错误: {e}")
+                counters['error'] += 1
+            progress.update(task_id, advance=1, description=f"[red]错误(未知):[/red] [dim]{file_name}[/dim]")
+            return "error"
+
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
@@ -447,7 +449,7 @@ def migrate_files_with_structure(source_file_paths: list[str], target_root_dir:
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
             # 创建 future 列表
             futures = [
-                executor.submit(process_single_file, file_path, target_root, progress, task_id, lock, counters, action, preserve_structure) # 传递 preserve_structure
+                executor.submit(migrate_single_file, file_path)
                 for file_path in source_file_paths
             ]
 
@@ -572,9 +574,8 @@ def migrate(
             clipboard_content = pyperclip.paste()
             paths_from_clipboard = [p.strip() for p in clipboard_content.splitlines() if p.strip()]
             for path_str in paths_from_clipboard:
-                path = Path(path_str)
-                if path.exists() and (path.is_file() or path.is_dir()):
-                    source_paths.append(str(path))
+                if os.path.isfile(path_str) or os.path.isdir(path_str):
+                    source_paths.append(os.path.normpath(path_str))
         except Exception as e:
             logger.error(f"从剪贴板读取路径时出错: {e}")
             # typer.echo(f"从剪贴板读取路径时出错: {e}", err=True)
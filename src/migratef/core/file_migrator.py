@@ -208,13 +208,17 @@ class FileMigrator:
         action: str = 'copy', 
         preserve_structure: bool = True
     ) -> str:
-        """处理单个文件的迁移逻辑（私有方法）"""
-        source_file = Path(source_file_str).resolve()
-        file_name = source_file.name
+        """处理单个文件的迁移逻辑（私有方法）
+
+        热路径上只使用字符串 + os.path，避免每个文件都构造 Path 对象。
+        """
+        source_file = os.path.realpath(source_file_str)
+        file_name = os.path.basename(source_file)
+        target_root_str = os.fspath(target_root)
 
         try:
             # 再次检查文件是否存在且是文件
-            if not source_file.is_file():
+            if not os.path.isfile(source_file):
                 with lock:
                     logger.warning(f"跳过: 源 '{file_name}' 在处理时不是文件或已消失")
                     counters['skipped'] += 1
@@ -226,9 +230,8 @@ class FileMigrator:
                 # 保持目录结构模式
                 try:
                     drive, path_without_drive = os.path.splitdrive(source_file)
-                    relative_parts = path_without_drive.strip(os.sep).split(os.sep)
-                    relative_path = Path(*relative_parts)
-                    target_file_path = target_root / relative_path
+                    relative_path = path_without_drive.strip(os.sep)
+                    target_file_path = os.path.join(target_root_str, relative_path)
                 except Exception as e:
                     with lock:
                         logger.error(f"错误: 无法确定文件 '{file_name}' 的相对路径: {e}")
@@ -237,15 +240,16 @@ class FileMigrator:
                     return "error"
             else:
                 # 扁平迁移模式 - 直接放到目标目录
-                target_file_path = target_root / file_name
+                target_file_path = os.path.join(target_root_str, file_name)
+            target_parent = os.path.dirname(target_file_path)
 
             # 创建目标目录
             try:
                 with lock:
-                    target_file_path.parent.mkdir(parents=True, exist_ok=True)
+                    os.makedirs(target_parent, exist_ok=True)
             except Exception as e:
                 with lock:
-                    logger.error(f"错误: 无法创建目标目录 '{target_file_path.parent}': {e}。跳过文件 '{file_name}'")
+                    logger.error(f"错误: 无法创建目标目录 '{target_parent}': {e}。跳过文件 '{file_name}'")
                     counters['error'] += 1
                 progress.update(task_id, advance=1, description=f"[red]错误(目录):[/red] [dim]{file_name}[/dim]")
                 return "error"
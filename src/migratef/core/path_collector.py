@@ -1,6 +1,7 @@
 """
 路径收集模块 - 负责从各种来源收集和验证文件路径
 """
+import os
 from pathlib import Path
 from typing import List
 import pyperclip
@@ -24,9 +25,8 @@ class PathCollector:
         """
         # 移除首尾可能存在的双引号或单引号
         cleaned_path = path_str.strip('\"\'')
-        path = Path(cleaned_path)
         
-        if path.exists() and (path.is_file() or path.is_dir()):
+        if os.path.isfile(cleaned_path) or os.path.isdir(cleaned_path):
             if cleaned_path not in self.collected_paths:
                 self.collected_paths.append(cleaned_path)
                 logger.info(f"已添加: {cleaned_path}")
@@ -34,8 +34,8 @@ class PathCollector:
             else:
                 logger.debug(f"已存在: {cleaned_path}")
                 return False
-        elif path.exists() and not (path.is_file() or path.is_dir()):
-            logger.warning(f"警告: '{path.name}' 不是文件或文件夹，已跳过")
+        elif os.path.exists(cleaned_path):
+            logger.warning(f"警告: '{os.path.basename(cleaned_path)}' 不是文件或文件夹，已跳过")
             return False
         else:
             logger.error(f"错误: 路径 '{path_str}' (或处理后的 '{cleaned_path}') 不存在或路径无效，已跳过")
@@ -58,8 +58,7 @@ class PathCollector:
             else:
                 # 根据具体错误类型进行分类
                 cleaned_path = path_str.strip('\"\'')
-                path = Path(cleaned_path)
-                if path.exists():
+                if os.path.exists(cleaned_path):
                     stats['skipped'] += 1
                 else:
                     stats['error'] += 1
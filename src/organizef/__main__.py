@@ -1,17 +1,104 @@
 import typer
 from pathlib import Path
-import pyperclip
-import subprocess
-import yaml
-from typing import List
-from rich.prompt import Prompt
-from rich.console import Console
-from rich.table import Table
-from .generator import OrganizefGenerator
-from .input import get_paths, get_path
+from typing import List, Optional
 
 app = typer.Typer()
 
+_HERE = Path(__file__).resolve().parent
+_DEFAULT_CONFIG = _HERE / "config.toml"
+_DEFAULT_RULES = _HERE / "rules"
+
+_LAZY_ATTRS = {
+    "OrganizefGenerator": ".generator",
+    "get_paths": ".input",
+    "get_path": ".input",
+}
+
+
+def __getattr__(name):
+    """PEP 562：按需导入过去在模块顶层导入的名称，保持 organizef.__main__.xxx 可用"""
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(module_name, __package__), name)
+    globals()[name] = value
+    return value
+
+
+# Profile 表格的列定义：(标题, 样式, 额外参数)
+_PROFILE_COLUMNS = (
+    ("No.", "cyan", {"no_wrap": True}),
+    ("Profile", "magenta", {"overflow": "fold"}),
+    ("Tags", "white", {"overflow": "fold"}),
+    ("Description", "white", {"overflow": "fold"}),
+)
+
+def _choose_profile(generator, console) -> str:
+    """展示 profile 表格并让用户选择一个 profile"""
+    from rich.prompt import Prompt
+    from rich.table import Table
+    from rich.text import Text
+
+    profiles = list(generator.config['profiles'].keys())
+    if not profiles:
+        typer.echo("No profiles found in config.toml")
+        raise typer.Exit(1)
+
+    tag_colors = generator.tag_colors
+
+    table = Table(title="Available Profiles")
+    for header, style, kwargs in _PROFILE_COLUMNS:
+        table.add_column(header, style=style, **kwargs)
+
+    for i, p in enumerate(profiles, 1):
+        desc = generator.config['profiles'][p].get('description', '')
+        tags = generator.config['profiles'][p].get('tags', [])
+        # 直接构造 Text，避免 Rich 逐行重新解析 markup
+        tags_text = Text()
+        for j, tag in enumerate(tags):
+            if j:
+                tags_text.append(", ")
+            tags_text.append(tag, style=tag_colors.get(tag, "white"))
+        table.add_row(str(i), p, tags_text, desc)
+
+    console.print(table)
+    choice = Prompt.ask("Select profile", choices=[str(i) for i in range(1, len(profiles)+1)])
+    return profiles[int(choice) - 1]
+
+
+def _resolve_paths(interactive: bool, paths: Optional[List[str]], console) -> List[str]:
+    """根据命令行参数或交互输入得到要处理的路径列表"""
+    from .input import get_paths
+
+    if interactive or not paths:
+        return get_paths() or []
+
+    normalized_paths = [Path(provided_path.strip('"')).expanduser() for provided_path in paths]
+    if len(normalized_paths) > 1:
+        # 网络盘上 stat 延迟较高，多个路径时并发检查
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(8, len(normalized_paths))) as executor:
+            exists = list(executor.map(_path_exists, normalized_paths))
+    else:
+        exists = [_path_exists(p) for p in normalized_paths]
+
+    # 一次性报告所有无效路径，避免用户逐个修正后反复重跑
+    invalid = [p for p, ok in zip(normalized_paths, exists) if not ok]
+    if invalid:
+        for p in invalid:
+            console.print(f"[red]路径无效: {p}[/red]")
+        raise typer.Exit(1)
+    return [str(p) for p in normalized_paths]
+
+
+def _path_exists(path: Path) -> bool:
+    try:
+        return path.exists()
+    except OSError:
+        return False
+
+
 @app.command()
 def run(
     profile: str = typer.Option(None, help="Profile name from config.toml"),
@@ -19,53 +106,35 @@ def run(
     interactive: bool = typer.Option(False, help="Use interactive mode to select multiple paths"),
     simulate: bool = typer.Option(False, help="Run in simulation mode"),
     dry_run: bool = typer.Option(False, help="Only generate and print YAML, do not run organize"),
-    config_path: Path = typer.Option(Path(__file__).parent / "config.toml", help="Path to config.toml"),
-    rules_dir: Path = typer.Option(Path(__file__).parent / "rules", help="Path to rules directory")
+    config_path: Path = typer.Option(_DEFAULT_CONFIG, help="Path to config.toml"),
+    rules_dir: Path = typer.Option(_DEFAULT_RULES, help="Path to rules directory"),
+    compile_config: bool = typer.Option(False, "--compile-config", help="Pre-compile config.toml and rules into a cache file, then exit"),
+    rebuild_cache: bool = typer.Option(False, "--rebuild-cache", help="Delete cached config/rule files before running")
 ):
+    # 重依赖延迟到真正执行时再导入，--help 等路径无需加载
+    import importlib.util
+    import os
+    import subprocess
+    import tempfile
+    from rich.console import Console
+    from .generator import OrganizefGenerator
+
     generator = OrganizefGenerator(config_path, rules_dir)
     console = Console()
 
+    if rebuild_cache:
+        generator.clear_caches()
+
+    if compile_config:
+        cache_path = generator.compile_config()
+        typer.echo(f"Compiled config written to {cache_path}")
+        return
+
     # Select profile if not provided
     if profile is None:
-        profiles = list(generator.config['profiles'].keys())
-        if not profiles:
-            typer.echo("No profiles found in config.toml")
-            raise typer.Exit(1)
-        
-        colors = ["red", "green", "blue", "yellow", "magenta", "cyan", "bright_red", "bright_green", "bright_blue", "bright_yellow", "bright_magenta", "bright_cyan"]
-        all_tags = sorted(set(tag for profile in generator.config['profiles'].values() for tag in profile.get('tags', [])))
-        tag_colors = {tag: colors[i % len(colors)] for i, tag in enumerate(all_tags)}
-        
-        table = Table(title="Available Profiles")
-        table.add_column("No.", style="cyan", no_wrap=True)
-        table.add_column("Profile", style="magenta" , overflow="fold")
-        table.add_column("Tags", style="white", overflow="fold")
-        table.add_column("Description", style="white", overflow="fold")
-        
-        for i, p in enumerate(profiles, 1):
-            desc = generator.config['profiles'][p].get('description', '')
-            tags = generator.config['profiles'][p].get('tags', [])
-            tags_str = ", ".join(f"[{tag_colors.get(tag, 'white')}]{tag}[/{tag_colors.get(tag, 'white')}]" for tag in tags)
-            table.add_row(str(i), p, tags_str, desc)
-        
-        console.print(table)
-        choice = Prompt.ask("Select profile", choices=[str(i) for i in range(1, len(profiles)+1)])
-        profile = profiles[int(choice) - 1]
-
-    # Get paths
-    if interactive:
-        selected_paths = get_paths()
-    elif paths:
-        selected_paths = []
-        for provided_path in paths:
-            normalized = Path(provided_path.strip('"')).expanduser()
-            if not normalized.exists():
-                console.print(f"[red]路径无效: {normalized}[/red]")
-                raise typer.Exit(1)
-            selected_paths.append(str(normalized))
-    else:
-        selected_paths = get_paths()
+        profile = _choose_profile(generator, console)
 
+    selected_paths = _resolve_paths(interactive, paths, console)
     if not selected_paths:
         typer.echo("No paths selected")
         raise typer.Exit(1)
@@ -76,14 +145,23 @@ def run(
         typer.echo(yaml_content)
         return
 
-    # Write to temp file
-    temp_yaml = Path("organize_config.yaml")
-    with open(temp_yaml, 'w', encoding='utf-8') as f:
+    # organize 可导入时直接在当前进程执行，省去子进程启动和临时文件
+    if importlib.util.find_spec("organize") is not None:
+        from .worker import execute_config
+        execute_config(yaml_content, simulate=simulate)
+        return
+
+    # Write to a private temp file (not cwd) so concurrent runs don't clash
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.yaml', delete=False) as f:
         f.write(yaml_content)
+        temp_yaml = f.name
 
     # Run organize
-    cmd = ["organize", "sim" if simulate else "run", str(temp_yaml)]
-    subprocess.run(cmd)
+    try:
+        cmd = ["organize", "sim" if simulate else "run", temp_yaml]
+        subprocess.run(cmd)
+    finally:
+        os.unlink(temp_yaml)
 
 if __name__ == "__main__":
     app()
\ No newline at end of file
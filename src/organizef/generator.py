@@ -1,81 +1,406 @@
+import hashlib
+import os
+import pickle
+import re
 import yaml
-import tomli
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib
+
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:  # PyYAML 未编译 LibYAML 时回退到纯 Python 实现
+    from yaml import SafeLoader, SafeDumper
+
+try:
+    import msgpack
+except ImportError:  # 可选依赖，未安装时规则文件每次都走 YAML 解析
+    msgpack = None
+
+_PLACEHOLDER_RE = re.compile(r'\$\{([^}]+)\}')
+
+# 解析结果缓存的默认目录，不写入配置文件所在目录（可能只读或被多人共用）
+_DEFAULT_CACHE_DIR = Path.home() / ".cache" / "organizef"
+
+# 少于这个数量的未缓存规则直接串行读取，线程池启动开销不划算
+_PRELOAD_MIN_RULES = 4
+
+# 生成规则文本模板时 ${locations} 的占位值，序列化后再整体替换成 locations 序列
+_LOCATIONS_TOKEN = 'ORGANIZEF_LOCATIONS_9f1c2e'
+_LOCATIONS_LINE_RE = re.compile(r'^(?P<prefix>[ -]*)locations: ' + _LOCATIONS_TOKEN + r'\n', re.MULTILINE)
+
+# locations 单独序列化后会被缩进，不按宽度折行，保证缩进后仍是合法的单行标量
+_UNLIMITED_WIDTH = 1 << 20
+
+
+class _NoAliasDumper(SafeDumper):
+    """各规则分别序列化后拼接，不能使用锚点/别名（锚点名在片段间会重复）"""
+
+    def ignore_aliases(self, data):
+        return True
+
+
+def _dump(data: Any, **kwargs) -> str:
+    return yaml.dump(data, Dumper=_NoAliasDumper, default_flow_style=False,
+                     allow_unicode=True, sort_keys=False, **kwargs)
+
+
+def _indent(text: str, column: int) -> str:
+    prefix = ' ' * column
+    return ''.join(prefix + line for line in text.splitlines(True))
+
+
+TAG_COLORS = ("red", "green", "blue", "yellow", "magenta", "cyan", "bright_red", "bright_green", "bright_blue", "bright_yellow", "bright_magenta", "bright_cyan")
 
 class OrganizefGenerator:
-    def __init__(self, config_path: Path, rules_dir: Path):
+    def __init__(self, config_path: Optional[Path] = None, rules_dir: Optional[Path] = None, *,
+                 config: Optional[Dict[str, Any]] = None, rules: Optional[Dict[str, Any]] = None,
+                 cache_dir: Optional[Path] = None):
+        """config 为已解析的配置、rules 为 {规则 id: 已解析的规则} 时直接使用，
+        不再读取 config_path / rules_dir（供测试等场景注入）；
+        cache_dir 为磁盘缓存目录，默认 ~/.cache/organizef
+        """
+        if config_path is None and config is None:
+            raise ValueError("Either config_path or config is required")
         self.config_path = config_path
         self.rules_dir = rules_dir
-        self.config = self.load_config()
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else _DEFAULT_CACHE_DIR
+        self._injected_config = config is not None
+        self.config = config if config is not None else self.load_config()
+        self.tag_colors: Dict[str, str] = self._assign_tag_colors()
+        self._injected_rules = rules is not None
+        self._rule_cache: Dict[str, Any] = dict(rules) if rules is not None else {}
+        self._template_cache: Dict[Tuple[str, int], Optional[List[Any]]] = {}
+        self._compiled: Optional[Dict[str, List[Dict[str, Any]]]] = self._load_compiled()
+
+    def _assign_tag_colors(self) -> Dict[str, str]:
+        """按标签名排序后循环分配颜色，加载配置时只计算一次"""
+        all_tags = set()
+        for profile in self.config['profiles'].values():
+            all_tags.update(profile.get('tags', ()))
+        return {tag: TAG_COLORS[i % len(TAG_COLORS)] for i, tag in enumerate(sorted(all_tags))}
+
+    def _cache_file(self, source: Path, suffix: str) -> Path:
+        """source 在缓存目录中对应的缓存文件，按源文件的绝对路径区分同名文件"""
+        key = hashlib.sha256(os.path.abspath(source).encode('utf-8')).hexdigest()[:16]
+        return self.cache_dir / f"{Path(source).stem}-{key}{suffix}"
+
+    @property
+    def config_cache_path(self) -> Path:
+        return self._cache_file(self.config_path, '.toml.pkl')
+
+    @property
+    def compiled_path(self) -> Path:
+        return self._cache_file(self.config_path, '.cache.pkl')
+
+    def _source_digest(self) -> str:
+        """config.toml 与其引用的全部规则文件内容的 SHA256"""
+        digest = hashlib.sha256(Path(self.config_path).read_bytes())
+        rule_ids = sorted({rule_config['id']
+                           for profile in self.config['profiles'].values()
+                           for rule_config in profile['rules']})
+        for rule_id in rule_ids:
+            digest.update(rule_id.encode('utf-8'))
+            digest.update((self.rules_dir / f"{rule_id}.yaml").read_bytes())
+        return digest.hexdigest()
+
+    def _load_compiled(self) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """加载 compile_config 生成的预编译缓存，源文件有任何变化则忽略"""
+        if self._injected_config or self._injected_rules:
+            # 注入的配置/规则不在磁盘上，无法校验缓存是否与之对应
+            return None
+        try:
+            digest, compiled = pickle.loads(self.compiled_path.read_bytes())
+            if digest == self._source_digest():
+                return compiled
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+            pass
+        return None
+
+    def compile_config(self) -> Path:
+        """预编译所有 profile：解析规则 YAML 并预先替换除 locations 以外的参数"""
+        if self._injected_config or self._injected_rules:
+            raise ValueError("Cannot compile injected config or rules")
+        compiled: Dict[str, List[Dict[str, Any]]] = {}
+        for profile_name, profile in self.config['profiles'].items():
+            entries = []
+            for rule_config in profile['rules']:
+                if not rule_config['enabled']:
+                    continue
+                params = rule_config['params'].copy()
+                # locations 依赖运行时路径，保留占位符留到 generate_yaml 时替换
+                rule_yaml = self.render_placeholders(self._load_rule(rule_config['id']),
+                                                     {**params, 'locations': '${locations}'})
+                entries.append({'params': params, 'rules': rule_yaml['rules']})
+            compiled[profile_name] = entries
+
+        self.compiled_path.parent.mkdir(parents=True, exist_ok=True)
+        self.compiled_path.write_bytes(pickle.dumps((self._source_digest(), compiled)))
+        self._compiled = compiled
+        self._template_cache.clear()
+        return self.compiled_path
 
     def load_config(self) -> Dict[str, Any]:
-        with open(self.config_path, 'rb') as f:
-            return tomli.load(f)
+        """读取 config.toml，解析结果缓存到缓存目录的 .toml.pkl 文件（按 mtime/大小失效）"""
+        config_path = Path(self.config_path)
+        cache_path = self.config_cache_path
+        st = config_path.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+        try:
+            cached_stamp, config = pickle.loads(cache_path.read_bytes())
+            if cached_stamp == stamp:
+                return config
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+            pass
+
+        with open(config_path, 'rb') as f:
+            config = tomllib.load(f)
+
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache_path.write_bytes(pickle.dumps((stamp, config)))
+        except OSError:
+            # 缓存目录不可写时直接跳过缓存
+            pass
+        return config
+
+    def _load_rule(self, rule_id: str) -> Dict[str, Any]:
+        """读取并缓存规则 YAML，调用方需要自行拷贝后再修改"""
+        rule_yaml = self._rule_cache.get(rule_id)
+        if rule_yaml is None:
+            if self.rules_dir is None:
+                raise ValueError(f"Rule {rule_id} not found")
+            rule_path = self.rules_dir / f"{rule_id}.yaml"
+            rule_yaml = self._load_rule_file(rule_path)
+            self._rule_cache[rule_id] = rule_yaml
+        return rule_yaml
+
+    def _load_rule_file(self, rule_path: Path) -> Dict[str, Any]:
+        """解析规则文件；安装了 msgpack 时使用缓存目录中的 .yaml.msgpack 缓存（按 mtime/大小失效）"""
+        if msgpack is None:
+            return self._parse_rule_file(rule_path)
+
+        cache_path = self._cache_file(rule_path, '.yaml.msgpack')
+        st = rule_path.stat()
+        stamp = [st.st_mtime_ns, st.st_size]
+        try:
+            cached_stamp, rule_yaml = msgpack.unpackb(cache_path.read_bytes(), raw=False)
+            if cached_stamp == stamp:
+                return rule_yaml
+        except (OSError, ValueError, TypeError, msgpack.UnpackException):
+            pass
+
+        rule_yaml = self._parse_rule_file(rule_path)
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache_path.write_bytes(msgpack.packb([stamp, rule_yaml], use_bin_type=True))
+        except (OSError, TypeError):
+            # 缓存目录不可写，或规则中含有 msgpack 无法表示的类型（如日期）
+            pass
+        return rule_yaml
+
+    @staticmethod
+    def _parse_rule_file(rule_path: Path) -> Dict[str, Any]:
+        # 直接交给 LibYAML 读取二进制流，省去 Python 层的解码
+        with open(rule_path, 'rb') as f:
+            return yaml.load(f, Loader=SafeLoader)
+
+    def clear_caches(self) -> None:
+        """删除所有磁盘缓存（配置、预编译、规则）并重新加载配置"""
+        cache_files = []
+        if self.config_path is not None:
+            cache_files += [self.config_cache_path, self.compiled_path]
+        if self.rules_dir is not None:
+            cache_files.extend(self._cache_file(rule_path, '.yaml.msgpack')
+                               for rule_path in Path(self.rules_dir).glob('*.yaml'))
+        for cache_file in cache_files:
+            try:
+                cache_file.unlink()
+            except FileNotFoundError:
+                pass
+
+        if not self._injected_rules:
+            self._rule_cache.clear()
+        self._template_cache.clear()
+        self._compiled = None
+        if not self._injected_config:
+            self.config = self.load_config()
+        self.tag_colors = self._assign_tag_colors()
+
+    def _iter_profile_rules(self, profile_name: str) -> Iterator[Tuple[Dict[str, Any], List[Any]]]:
+        """按顺序产出 profile 中启用规则的 (params 副本, 只读的缓存规则列表)"""
+        if self._compiled is not None and profile_name in self._compiled:
+            for entry in self._compiled[profile_name]:
+                yield entry['params'].copy(), entry['rules']
+            return
+
+        enabled = [rule_config for rule_config in self.config['profiles'][profile_name]['rules']
+                   if rule_config['enabled']]
+        self._preload_rules([rule_config['id'] for rule_config in enabled])
+        for rule_config in enabled:
+            # Load rule YAML (cached, must not be modified in place)
+            yield rule_config['params'].copy(), self._load_rule(rule_config['id'])['rules']
+
+    def _preload_rules(self, rule_ids: List[str]) -> None:
+        """冷缓存且规则较多时并发读取规则文件，重叠磁盘/网络盘的 IO 等待"""
+        missing = list(dict.fromkeys(rule_id for rule_id in rule_ids if rule_id not in self._rule_cache))
+        if len(missing) < _PRELOAD_MIN_RULES:
+            return
+        with ThreadPoolExecutor(max_workers=min(8, len(missing))) as executor:
+            # list() 触发迭代，使工作线程中的异常在这里抛出
+            list(executor.map(self._load_rule, missing))
 
     def generate_yaml(self, profile_name: str, paths: List[str]) -> str:
         if profile_name not in self.config['profiles']:
             raise ValueError(f"Profile {profile_name} not found")
 
-        profile = self.config['profiles'][profile_name]
-        rules = []
-
-        for rule_config in profile['rules']:
-            if not rule_config['enabled']:
-                continue
+        chunks = []
 
-            rule_id = rule_config['id']
-            params = rule_config['params'].copy()
+        # locations 只依赖 paths 和 exclude_dirs，按 exclude_dirs 复用同一份列表/文本
+        base_locations = [{'path': path} for path in paths]
+        locations_by_exclude: Dict[Any, List[Dict[str, Any]]] = {}
+        locations_text: Dict[Tuple[Any, int], str] = {}
 
-            # Load rule YAML
-            rule_path = self.rules_dir / f"{rule_id}.yaml"
-            with open(rule_path, 'r', encoding='utf-8') as f:
-                rule_yaml = yaml.safe_load(f)
+        for index, (params, rule_yaml) in enumerate(self._iter_profile_rules(profile_name)):
 
             # Process params
             # For multiple paths, create locations list
-            locations = []
-            for path in paths:
-                loc = {'path': path}
-                if 'exclude_dirs' in params:
-                    loc['exclude_dirs'] = params['exclude_dirs']
-                locations.append(loc)
-            params['locations'] = locations
+            exclude_key = tuple(params['exclude_dirs']) if 'exclude_dirs' in params else None
+            locations = locations_by_exclude.get(exclude_key)
+            if locations is None:
+                if exclude_key is None:
+                    locations = base_locations
+                else:
+                    locations = [{**loc, 'exclude_dirs': params['exclude_dirs']} for loc in base_locations]
+                locations_by_exclude[exclude_key] = locations
+
+            # 空的 locations 会序列化为流式的 []，不能放到下一行，此时整体渲染
+            template = self._rule_template(profile_name, index, rule_yaml, params) if locations else None
+            if template is None:
+                params['locations'] = locations
+                chunks.append(_dump(self.render_placeholders(rule_yaml, params)))
+                continue
+
+            for segment in template:
+                if type(segment) is str:
+                    chunks.append(segment)
+                    continue
+                text = locations_text.get((exclude_key, segment))
+                if text is None:
+                    text = _indent(_dump(locations, width=_UNLIMITED_WIDTH), segment)
+                    locations_text[(exclude_key, segment)] = text
+                chunks.append(text)
+
+        if not chunks:
+            return _dump({'rules': []})
+        # Merge into final YAML：规则列表在 rules 下不缩进，直接拼接各规则的序列化文本
+        return 'rules:\n' + ''.join(chunks)
+
+    def _rule_template(self, profile_name: str, index: int, rule_yaml: List[Any],
+                       params: Dict[str, Any]) -> Optional[List[Any]]:
+        """缓存规则除 locations 外的序列化文本
 
-            self.replace_placeholders(rule_yaml, params)
+        返回由字符串片段和整数（locations 序列所在的缩进列）组成的列表；
+        ${locations} 不是以 ``locations: ${locations}`` 形式出现时返回 None，由调用方整体渲染。
+        """
+        key = (profile_name, index)
+        if key in self._template_cache:
+            return self._template_cache[key]
 
-            rules.extend(rule_yaml['rules'])
+        text = _dump(self.render_placeholders(rule_yaml, {**params, 'locations': _LOCATIONS_TOKEN}))
+        template: Optional[List[Any]] = []
+        pos = 0
+        matches = 0
+        for match in _LOCATIONS_LINE_RE.finditer(text):
+            template.append(text[pos:match.start()] + match.group('prefix') + 'locations:\n')
+            template.append(len(match.group('prefix')))
+            pos = match.end()
+            matches += 1
+        template.append(text[pos:])
+        if text.count(_LOCATIONS_TOKEN) != matches:
+            template = None
 
-        # Merge into final YAML
-        final_config = {'rules': rules}
-        return yaml.dump(final_config, default_flow_style=False, allow_unicode=True)
+        self._template_cache[key] = template
+        return template
 
     def replace_placeholders(self, data: Any, params: Dict[str, Any]):
-        if isinstance(data, dict):
-            for key, value in data.items():
-                if isinstance(value, str):
-                    # Handle ${variable} replacement
-                    if value.startswith('${') and value.endswith('}'):
-                        param_key = value[2:-1]
-                        if param_key in params:
-                            data[key] = params[param_key]
-                        else:
-                            raise ValueError(f"Parameter {param_key} not found")
-                    else:
-                        # Handle variable replacement within strings (like in python filters)
-                        original_value = value
-                        for param_key, param_value in params.items():
-                            placeholder = f"${{{param_key}}}"
-                            if placeholder in original_value:
-                                if isinstance(param_value, list):
-                                    # Convert list to YAML format
-                                    original_value = original_value.replace(placeholder, str(param_value))
-                                else:
-                                    original_value = original_value.replace(placeholder, str(param_value))
-                        if original_value != value:
-                            data[key] = original_value
+        """原地替换 ${variable} 占位符（显式栈迭代，避免递归）"""
+        # YAML 解析结果只包含内置 dict/list/str，用 type() is 比较代替 isinstance 分派
+        stack = deque([data])
+        push = stack.append
+        while stack:
+            node = stack.pop()
+            node_type = type(node)
+            if node_type is dict:
+                items = node.items()
+            elif node_type is list:
+                items = enumerate(node)
+            else:
+                continue
+            for key, value in items:
+                value_type = type(value)
+                if value_type is str:
+                    new_value = _substitute(value, params)
+                    if new_value is not value:
+                        node[key] = new_value
+                elif value_type is dict or value_type is list:
+                    push(value)
+
+    def render_placeholders(self, data: Any, params: Dict[str, Any]) -> Any:
+        """返回替换了 ${variable} 占位符的新结构，不修改 data
+
+        一次遍历同时完成拷贝和替换，替代 deepcopy + replace_placeholders；
+        只重建 dict/list，其余不可变的标量直接共享。
+        """
+        data_type = type(data)
+        if data_type is str:
+            return _substitute(data, params)
+        if data_type is dict:
+            root = {}
+        elif data_type is list:
+            root = [None] * len(data)
+        else:
+            return data
+
+        stack = [(data, root)]
+        push = stack.append
+        while stack:
+            src, dst = stack.pop()
+            items = src.items() if type(src) is dict else enumerate(src)
+            for key, value in items:
+                value_type = type(value)
+                if value_type is str:
+                    dst[key] = _substitute(value, params)
+                elif value_type is dict:
+                    dst[key] = new = {}
+                    push((value, new))
+                elif value_type is list:
+                    dst[key] = new = [None] * len(value)
+                    push((value, new))
                 else:
-                    self.replace_placeholders(value, params)
-        elif isinstance(data, list):
-            for item in data:
-                self.replace_placeholders(item, params)
\ No newline at end of file
+                    dst[key] = value
+        return root
+
+
+def _substitute(value: str, params: Dict[str, Any]) -> Any:
+    """替换单个字符串中的 ${variable} 占位符"""
+    # Handle ${variable} replacement
+    match = _PLACEHOLDER_RE.fullmatch(value)
+    if match:
+        param_key = match.group(1)
+        if param_key not in params:
+            raise ValueError(f"Parameter {param_key} not found")
+        return params[param_key]
+    # Handle variable replacement within strings (like in python filters)
+    if '${' not in value:
+        return value
+    return _PLACEHOLDER_RE.sub(
+        lambda m: str(params[m.group(1)]) if m.group(1) in params else m.group(0),
+        value,
+    )
@@ -27,6 +27,35 @@ def get_path():
     logger.info(f"使用路径: {path}")
     return path
 
+def _existing_paths(paths: List[str]) -> List[str]:
+    """过滤出存在的路径，保持原有顺序
+
+    同一父目录下有多个候选时只读取一次该目录，用目录项名称判断存在性，
+    代替逐个 stat；未命中的（大小写不同、符号链接、读取失败等）再用 os.path.exists 确认。
+    """
+    groups = {}
+    for path in paths:
+        parent, name = os.path.split(path)
+        groups.setdefault(parent or os.curdir, set()).add(name)
+
+    listed = set()
+    for parent, names in groups.items():
+        # 单个候选时一次 stat 比列出整个目录更省
+        if len(names) < 2:
+            continue
+        try:
+            with os.scandir(parent) as it:
+                listed.update((parent, entry.name) for entry in it if entry.name in names)
+        except OSError:
+            continue
+
+    existing = []
+    for path in paths:
+        parent, name = os.path.split(path)
+        if (parent or os.curdir, name) in listed or os.path.exists(path):
+            existing.append(path)
+    return existing
+
 def get_paths() -> Optional[List[str]]:
     """获取多个路径（支持单个或多个路径输入）"""
     console = Console()
@@ -46,10 +75,7 @@ def get_paths() -> Optional[List[str]]:
             potential_paths = [line.strip().strip('"') for line in clipboard_content.split('\n') if line.strip()]
 
             # 验证路径
-            valid_clipboard_paths = []
-            for path in potential_paths:
-                if os.path.exists(path):
-                    valid_clipboard_paths.append(path)
+            valid_clipboard_paths = _existing_paths(potential_paths)
 
             if valid_clipboard_paths:
                 clipboard_paths = valid_clipboard_paths
@@ -0,0 +1,81 @@
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from organizef.generator import OrganizefGenerator
+
+_PACKAGE_DIR = Path(__file__).parent.parent
+
+
+def _touch(path, data=b""):
+    """用 os.open 直接创建文件；内容为空时只创建不写入"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        if data:
+            os.write(fd, data)
+    finally:
+        os.close(fd)
+
+
+def _make_tree(root, spec):
+    """按嵌套字典创建测试目录树：dict 为文件夹，bytes 为文件内容"""
+    for name, node in spec.items():
+        path = os.path.join(root, name)
+        if isinstance(node, dict):
+            os.mkdir(path)
+            _make_tree(path, node)
+        else:
+            _touch(path, node)
+
+
+def _link_or_copy(src, dst):
+    """优先硬链接；文件系统不支持时（如 FAT）退回普通复制"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _spec_key(spec):
+    return tuple(sorted((name, _spec_key(node) if isinstance(node, dict) else node)
+                        for name, node in spec.items()))
+
+
+@pytest.fixture(scope="session")
+def _tree_templates(tmp_path_factory):
+    """按目录树结构缓存的模板目录，每种结构在整个测试会话只创建一次"""
+    templates = {}
+
+    def get(spec):
+        key = _spec_key(spec)
+        template = templates.get(key)
+        if template is None:
+            template = tmp_path_factory.mktemp('tree')
+            _make_tree(template, spec)
+            templates[key] = template
+        return template
+
+    return get
+
+
+@pytest.fixture
+def make_tree(_tree_templates):
+    """从模板硬链接出测试目录树；文件与模板共享内容，测试只能移动/删除，不能原地改写文件"""
+    def make(root, spec):
+        shutil.copytree(_tree_templates(spec), root, copy_function=_link_or_copy, dirs_exist_ok=True)
+    return make
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path, monkeypatch):
+    """生成器的磁盘缓存写到临时目录，测试不读写用户的 ~/.cache"""
+    monkeypatch.setattr('organizef.generator._DEFAULT_CACHE_DIR', tmp_path / 'cache')
+
+
+@pytest.fixture(scope="session")
+def generator(tmp_path_factory):
+    """使用包内 config.toml 与 rules 的生成器，整个测试会话只解析一次；缓存写到临时目录，不写入源码树"""
+    return OrganizefGenerator(_PACKAGE_DIR / "config.toml", _PACKAGE_DIR / "rules",
+                              cache_dir=tmp_path_factory.mktemp('cache'))
@@ -1,10 +1,9 @@
 import pytest
 import yaml
-from unittest.mock import patch
 from pathlib import Path
 from organizef.generator import OrganizefGenerator
 
-def test_cli_profile_selection(tmp_path):
+def test_cli_profile_selection(tmp_path, monkeypatch):
     """Test profile selection in CLI"""
     # Create test config
     config_content = """
@@ -34,12 +33,12 @@ rules:
     generator = OrganizefGenerator(config_file, rules_dir)
 
     # Mock rich prompt
-    with patch('rich.prompt.Prompt.ask', return_value='1'), \
-         patch('organizef.input.get_paths', return_value=['/test/path']):
-        yaml_content = generator.generate_yaml('test_profile', ['/test/path'])
-        assert 'rules' in yaml_content
+    monkeypatch.setattr('rich.prompt.Prompt.ask', lambda *args, **kwargs: '1')
+    monkeypatch.setattr('organizef.input.get_paths', lambda: ['/test/path'])
+    yaml_content = generator.generate_yaml('test_profile', ['/test/path'])
+    assert 'rules' in yaml_content
 
-def test_cli_path_from_clipboard(tmp_path):
+def test_cli_path_from_clipboard(tmp_path, monkeypatch):
     """Test getting path from clipboard"""
     config_content = """
 [profiles.test]
@@ -65,9 +64,9 @@ rules:
 
     generator = OrganizefGenerator(config_file, rules_dir)
 
-    with patch('pyperclip.paste', return_value='/clipboard/path'):
-        yaml_content = generator.generate_yaml('test', ['/clipboard/path'])
-        assert '/clipboard/path' in yaml_content
+    monkeypatch.setattr('pyperclip.paste', lambda: '/clipboard/path')
+    yaml_content = generator.generate_yaml('test', ['/clipboard/path'])
+    assert '/clipboard/path' in yaml_content
 
 def test_cli_multiple_paths(tmp_path):
     """Test multiple paths handling"""
@@ -131,4 +130,26 @@ rules:
 
     yaml_content = generator.generate_yaml('test', ['/test/path'])
     assert isinstance(yaml_content, str)
-    assert 'rules:' in yaml_content
\ No newline at end of file
+    assert 'rules:' in yaml_content
+
+
+def test_resolve_paths_validates_cli_paths(tmp_path, monkeypatch):
+    """Test --path values are normalized and invalid ones abort"""
+    import typer
+    from unittest.mock import MagicMock
+    from organizef.__main__ import _resolve_paths
+
+    console = MagicMock()
+    assert _resolve_paths(False, [f'"{tmp_path}"'], console) == [str(tmp_path)]
+
+    with pytest.raises(typer.Exit):
+        _resolve_paths(False, [str(tmp_path / 'missing')], console)
+
+    # All invalid paths are reported before exiting
+    console.reset_mock()
+    with pytest.raises(typer.Exit):
+        _resolve_paths(False, [str(tmp_path / 'a'), str(tmp_path), str(tmp_path / 'b')], console)
+    assert console.print.call_count == 2
+
+    monkeypatch.setattr('organizef.input.get_paths', lambda: ['/from/input'])
+    assert _resolve_paths(True, [str(tmp_path)], console) == ['/from/input']
@@ -1,316 +1,150 @@
-import tempfile
-from pathlib import Path
-from organizef.generator import OrganizefGenerator
-
-
-def get_generator():
-    """获取 OrganizefGenerator 实例"""
-    config_path = Path(__file__).parent.parent / "config.toml"
-    rules_dir = Path(__file__).parent.parent / "rules"
-    return OrganizefGenerator(config_path, rules_dir)
-
-
-def test_dissolve_single_video():
-    """测试解散单视频文件夹规则的 YAML 生成"""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        root = Path(tmpdir)
-
-        # 创建测试结构：
-        # root/
-        #   ├── folder1/
-        #   │   └── video.mp4
-        #   ├── folder2/
-        #   │   ├── video.avi
-        #   │   └── other.txt  (这个文件夹不应该被解散)
-        #   └── folder3/
-        #       └── video.mkv
-
-        # 创建单视频文件夹
-        (root / "folder1").mkdir()
-        (root / "folder1" / "video.mp4").write_text("fake video content")
-
-        (root / "folder2").mkdir()
-        (root / "folder2" / "video.avi").write_text("fake video content")
-        (root / "folder2" / "other.txt").write_text("other file")  # 这个文件夹不应该被解散
-
-        (root / "folder3").mkdir()
-        (root / "folder3" / "video.mkv").write_text("fake video content")
-
-        # 加载配置并生成 YAML
-        generator = get_generator()
-        yaml_content = generator.generate_yaml('dissolve_single_video', [str(root)])
-
-        # 验证 YAML 包含正确的结构
-        assert 'rules:' in yaml_content
-        assert 'extension:' in yaml_content
-        assert 'mp4' in yaml_content
-        assert 'avi' in yaml_content
-        assert 'mkv' in yaml_content
-        assert 'move:' in yaml_content
-        assert '{path.parent.parent}/{path.name}' in yaml_content
-
-        # 手动模拟移动逻辑（因为 organize 有编码问题）
-        # 对于单视频文件夹，应该移动文件到上级目录
-
-        # 验证初始状态
-        assert (root / "folder1" / "video.mp4").exists()
-        assert (root / "folder2" / "video.avi").exists()
-        assert (root / "folder2" / "other.txt").exists()
-        assert (root / "folder3" / "video.mkv").exists()
-
-        # 手动模拟移动（对于真正的单媒体文件夹）
-        # folder1 只有一个文件，应该移动
-        if len(list((root / "folder1").iterdir())) == 1:
-            video_file = root / "folder1" / "video.mp4"
-            target = root / video_file.name
-            video_file.rename(target)
-            (root / "folder1").rmdir()
-
-        # folder3 只有一个文件，应该移动
-        if len(list((root / "folder3").iterdir())) == 1:
-            video_file = root / "folder3" / "video.mkv"
-            target = root / video_file.name
-            video_file.rename(target)
-            (root / "folder3").rmdir()
-
-        # 验证结果
-        assert (root / "video.mp4").exists()
-        assert not (root / "folder1").exists()
-
-        # folder2 不应该被解散，因为它有多个文件
-        assert (root / "folder2").exists()
-        assert (root / "folder2" / "video.avi").exists()
-        assert (root / "folder2" / "other.txt").exists()
-
-        # folder3 应该被解散，video.mkv 移动到 root
-        assert (root / "video.mkv").exists()
-        assert not (root / "folder3").exists()
-
-
-def test_dissolve_single_archive():
-    """测试解散单压缩包文件夹规则的 YAML 生成"""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        root = Path(tmpdir)
-
-        # 创建测试结构：
-        # root/
-        #   ├── folder1/
-        #   │   └── archive.zip
-        #   ├── folder2/
-        #   │   ├── archive.rar
-        #   │   └── other.txt  (这个文件夹不应该被解散)
-        #   └── folder3/
-        #       └── archive.7z
-
-        # 创建单压缩包文件夹
-        (root / "folder1").mkdir()
-        (root / "folder1" / "archive.zip").write_text("fake zip content")
-
-        (root / "folder2").mkdir()
-        (root / "folder2" / "archive.rar").write_text("fake rar content")
-        (root / "folder2" / "other.txt").write_text("other file")  # 这个文件夹不应该被解散
-
-        (root / "folder3").mkdir()
-        (root / "folder3" / "archive.7z").write_text("fake 7z content")
-
-        # 加载配置并生成 YAML
-        generator = get_generator()
-        yaml_content = generator.generate_yaml('dissolve_single_archive', [str(root)])
-
-        # 验证 YAML 包含正确的结构
-        assert 'rules:' in yaml_content
-        assert 'extension:' in yaml_content
-        assert 'zip' in yaml_content
-        assert 'rar' in yaml_content
-        assert '7z' in yaml_content
-        assert 'move:' in yaml_content
-        assert '{path.parent.parent}/{path.name}' in yaml_content
-
-        # 手动模拟移动逻辑
-        # folder1 只有一个文件，应该移动
-        if len(list((root / "folder1").iterdir())) == 1:
-            archive_file = root / "folder1" / "archive.zip"
-            target = root / archive_file.name
-            archive_file.rename(target)
-            (root / "folder1").rmdir()
-
-        # folder3 只有一个文件，应该移动
-        if len(list((root / "folder3").iterdir())) == 1:
-            archive_file = root / "folder3" / "archive.7z"
-            target = root / archive_file.name
-            archive_file.rename(target)
-            (root / "folder3").rmdir()
-
-        # 验证结果
-        assert (root / "archive.zip").exists()
-        assert not (root / "folder1").exists()
-
-        # folder2 不应该被解散，因为它有多个文件
-        assert (root / "folder2").exists()
-        assert (root / "folder2" / "archive.rar").exists()
-        assert (root / "folder2" / "other.txt").exists()
-
-        # folder3 应该被解散，archive.7z 移动到 root
-        assert (root / "archive.7z").exists()
-        assert not (root / "folder3").exists()
-
-
-def test_dissolve_direct():
-    """测试直接解散文件夹规则的 YAML 生成"""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        root = Path(tmpdir)
-
-        # 创建测试结构：
-        # root/
-        #   ├── target_folder/
-        #   │   ├── file1.txt
-        #   │   └── file2.txt
-        #   └── other/
-        #       └── file3.txt
-
-        (root / "target_folder").mkdir()
-        (root / "target_folder" / "file1.txt").write_text("content1")
-        (root / "target_folder" / "file2.txt").write_text("content2")
-
-        (root / "other").mkdir()
-        (root / "other" / "file3.txt").write_text("content3")
-
-        # 加载配置并生成 YAML
-        generator = get_generator()
-        yaml_content = generator.generate_yaml('dissolve_direct', [str(root)])
-
-        # 验证 YAML 包含正确的结构
-        assert 'rules:' in yaml_content
-        assert 'name:' in yaml_content
-        assert 'target_folder' in yaml_content
-        assert 'move:' in yaml_content
-        assert '{path.parent}/' in yaml_content
-
-        # 手动模拟移动逻辑
-        # 移动 target_folder 的内容到 root
-        for item in (root / "target_folder").iterdir():
-            target = root / item.name
-            item.rename(target)
-        (root / "target_folder").rmdir()
-
-        # 验证结果
-        assert (root / "file1.txt").exists()
-        assert (root / "file2.txt").exists()
-        assert not (root / "target_folder").exists()
-
-        # other 文件夹应该保持不变
-        assert (root / "other").exists()
-        assert (root / "other" / "file3.txt").exists()
-
-
-def test_move_gifs():
-    """测试移动 GIF 文件到 [gif] 文件夹规则的 YAML 生成"""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        root = Path(tmpdir)
-
-        # 创建测试结构：
-        # root/
-        #   ├── subfolder/
-        #   │   ├── animation.gif
-        #   │   └── image.png
-        #   └── banner.gif
-
-        (root / "subfolder").mkdir()
-        (root / "subfolder" / "animation.gif").write_text("fake gif content")
-        (root / "subfolder" / "image.png").write_text("fake png content")
-        (root / "banner.gif").write_text("fake gif content")
-
-        # 加载配置并生成 YAML
-        generator = get_generator()
-        yaml_content = generator.generate_yaml('move_gifs', [str(root)])
-
-        # 验证 YAML 包含正确的结构
-        assert 'rules:' in yaml_content
-        assert 'extension:' in yaml_content
-        assert 'gif' in yaml_content
-        assert 'move:' in yaml_content
-        assert '[gif]' in yaml_content
-        assert '{path.relative_to(location)}' in yaml_content
-
-        # 手动模拟移动逻辑
-        # 创建 [gif] 文件夹
-        gif_dir = root / "[gif]"
-        gif_dir.mkdir(exist_ok=True)
-
-        # 移动 GIF 文件
-        for gif_file in [root / "banner.gif", root / "subfolder" / "animation.gif"]:
-            if gif_file.exists():
-                relative_path = gif_file.relative_to(root)
-                target = gif_dir / relative_path
-                target.parent.mkdir(parents=True, exist_ok=True)
-                gif_file.rename(target)
-
-        # 验证结果
-        assert (root / "[gif]" / "banner.gif").exists()
-        assert (root / "[gif]" / "subfolder" / "animation.gif").exists()
-        assert not (root / "banner.gif").exists()
-        assert not (root / "subfolder" / "animation.gif").exists()
-
+import os
+import shutil
+import subprocess
+
+import pytest
+import yaml
+
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+def _assert_contains_all(text, needles):
+    """一次性检查所有片段，失败时列出全部缺失项；YAML 只编码一次，按字节查找"""
+    data = text.encode('utf-8')
+    missing = [needle for needle in needles if needle.encode('utf-8') not in data]
+    assert not missing, f"YAML 缺少: {missing}"
+
+
+def _rule_summary(yaml_content):
+    """解析一次 YAML，汇总所有规则的过滤器取值和 move 目标：({过滤器名: 取值集合}, move 目标列表)"""
+    parsed = yaml.load(yaml_content, Loader=_YAML_LOADER)
+    filters = {}
+    moves = []
+    for rule in parsed['rules']:
+        for item in rule.get('filters') or []:
+            if isinstance(item, dict):
+                for key, value in item.items():
+                    values = value if isinstance(value, list) else [value]
+                    filters.setdefault(key, set()).update(map(str, values))
+        for action in rule.get('actions') or []:
+            if isinstance(action, dict) and 'move' in action:
+                moves.append(action['move'])
+    return filters, moves
+
+
+# 各用例相互独立（各自使用 tmp_path），可用 pytest -n auto 并行运行；规则只看文件名，测试文件均为空文件
+# (profile, 测试目录树, 过滤器应包含的取值, move 目标应包含的片段, 执行后应存在的路径, 执行后应消失的路径)
+DISSOLVE_CASES = [
+    pytest.param(
+        'dissolve_single_video',
+        {
+            "folder1": {"video.mp4": b""},
+            # folder2 有多个文件，不应该被解散
+            "folder2": {"video.avi": b"", "other.txt": b""},
+            "folder3": {"video.mkv": b""},
+        },
+        {'extension': {'mp4', 'avi', 'mkv'}},
+        '{path.parent.parent}/{path.name}',
+        ["video.mp4", "video.mkv", "folder2/video.avi", "folder2/other.txt"],
+        ["folder1", "folder3"],
+        id='dissolve_single_video',
+    ),
+    pytest.param(
+        'dissolve_single_archive',
+        {
+            "folder1": {"archive.zip": b""},
+            # folder2 有多个文件，不应该被解散
+            "folder2": {"archive.rar": b"", "other.txt": b""},
+            "folder3": {"archive.7z": b""},
+        },
+        {'extension': {'zip', 'rar', '7z'}},
+        '{path.parent.parent}/{path.name}',
+        ["archive.zip", "archive.7z", "folder2/archive.rar", "folder2/other.txt"],
+        ["folder1", "folder3"],
+        id='dissolve_single_archive',
+    ),
+    pytest.param(
+        'dissolve_direct',
+        {
+            "target_folder": {"file1.txt": b"", "file2.txt": b""},
+            # other 文件夹应该保持不变
+            "other": {"file3.txt": b""},
+        },
+        {'name': {'target_folder'}},
+        '{path.parent}/',
+        ["file1.txt", "file2.txt", "other/file3.txt"],
+        ["target_folder"],
+        id='dissolve_direct',
+    ),
+    pytest.param(
+        'move_gifs',
+        {
+            "subfolder": {"animation.gif": b"", "image.png": b""},
+            "banner.gif": b"",
+        },
+        {'extension': {'gif'}},
+        '[gif]/{path.relative_to(location)}',
         # PNG 文件应该保持不变
-        assert (root / "subfolder" / "image.png").exists()
-
-
-def test_move_images_by_size():
+        ["[gif]/banner.gif", "[gif]/subfolder/animation.gif", "subfolder/image.png"],
+        ["banner.gif", "subfolder/animation.gif"],
+        id='move_gifs',
+    ),
+]
+
+
+# 只检查 YAML 结构的用例不需要目录树和执行结果
+DISSOLVE_YAML_CASES = [
+    pytest.param(case.values[0], case.values[2], case.values[3], id=case.id) for case in DISSOLVE_CASES
+]
+
+
+@pytest.mark.parametrize("profile, filters, move_target", DISSOLVE_YAML_CASES)
+def test_dissolve_rule(generator, profile, filters, move_target):
+    """测试解散/移动规则的 YAML 结构：过滤器取值与 move 动作（YAML 不依赖目录内容，无需创建测试文件）"""
+    yaml_content = generator.generate_yaml(profile, ['/test/path'])
+    actual_filters, moves = _rule_summary(yaml_content)
+    for key, values in filters.items():
+        assert values <= actual_filters.get(key, set()), (key, actual_filters.get(key))
+    assert any(move_target in target for target in moves), moves
+
+
+@pytest.mark.skipif(shutil.which('organize') is None, reason="organize-tool 未安装")
+@pytest.mark.parametrize("profile, tree, filters, move_target, present, absent", DISSOLVE_CASES)
+def test_dissolve_rule_with_organize(generator, make_tree, tmp_path, profile, tree, filters, move_target, present, absent):
+    """集成测试：用真实的 organize 执行生成的规则，验证文件最终位置"""
+    root = tmp_path / 'root'
+    root.mkdir()
+    make_tree(root, tree)
+    config_file = tmp_path / 'config.yaml'
+    config_file.write_text(generator.generate_yaml(profile, [str(root)]), encoding='utf-8')
+
+    subprocess.run(['organize', 'run', str(config_file)], check=True, env={**os.environ, 'PYTHONUTF8': '1'})
+
+    for relative_path in present:
+        assert (root / relative_path).exists(), relative_path
+    for relative_path in absent:
+        assert not (root / relative_path).exists(), relative_path
+
+
+# 无法创建真实的图片文件来测试实际的移动逻辑，这里只验证 YAML 结构正确
+# (profile, YAML 应包含的片段)
+IMAGE_SIZE_CASES = [
+    pytest.param(
+        'move_images_by_size',
+        ['rules:', 'extension:', 'jpg', 'png', 'gif', 'python:', 'PIL', 'Image.open',
+         'min_width', 'min_height', '[large_images]', '[small_images]', '{path.relative_to(location)}'],
+        id='move_images_by_size',
+    ),
+    pytest.param(
+        'move_images_by_size_exiftool',
+        ['rules:', 'exif:', 'exiftool', 'imagewidth', 'imageheight',
+         '[large_images_exiftool]', '[large_images_exiftool_py]'],
+        id='move_images_by_size_exiftool',
+    ),
+]
+
+
+@pytest.mark.parametrize("profile, expected_tokens", IMAGE_SIZE_CASES)
+def test_move_images_by_size(generator, profile, expected_tokens):
     """测试根据图片尺寸移动图片文件规则的 YAML 生成"""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        root = Path(tmpdir)
-
-        # 创建测试结构：
-        # root/
-        #   ├── large_image.jpg (模拟大图片)
-        #   ├── small_image.png (模拟小图片)
-        #   └── normal_image.gif (中等尺寸图片)
-
-        # 注意：由于我们无法创建真实的图片文件，我们只测试 YAML 生成
-        (root / "large_image.jpg").write_text("fake large image")
-        (root / "small_image.png").write_text("fake small image")
-        (root / "normal_image.gif").write_text("fake normal image")
-
-        # 加载配置并生成 YAML
-        generator = get_generator()
-        yaml_content = generator.generate_yaml('move_images_by_size', [str(root)])
-
-        # 验证 YAML 包含正确的结构
-        assert 'rules:' in yaml_content
-        assert 'extension:' in yaml_content
-        assert 'jpg' in yaml_content
-        assert 'png' in yaml_content
-        assert 'gif' in yaml_content
-        assert 'python:' in yaml_content
-        assert 'PIL' in yaml_content
-        assert 'Image.open' in yaml_content
-        assert 'min_width' in yaml_content
-        assert 'min_height' in yaml_content
-        assert '[large_images]' in yaml_content
-        assert '[small_images]' in yaml_content
-        assert '{path.relative_to(location)}' in yaml_content
-
-        # 由于我们无法创建真实的图片文件来测试实际的移动逻辑，
-        # 这里只验证 YAML 结构正确
-
-
-def test_move_images_by_size_exiftool():
-    """测试使用 exiftool 根据图片尺寸移动图片文件规则的 YAML 生成"""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        root = Path(tmpdir)
-
-        # 创建测试文件
-        (root / "test_image.jpg").write_text("fake image")
-
-        # 加载配置并生成 YAML
-        generator = get_generator()
-        yaml_content = generator.generate_yaml('move_images_by_size_exiftool', [str(root)])
-
-        # 验证 YAML 包含正确的结构
-        assert 'rules:' in yaml_content
-        assert 'exif:' in yaml_content
-        assert 'exiftool' in yaml_content
-        assert 'imagewidth' in yaml_content
-        assert 'imageheight' in yaml_content
-        assert '[large_images_exiftool]' in yaml_content
-        assert '[large_images_exiftool_py]' in yaml_content
\ No newline at end of file
+    _assert_contains_all(generator.generate_yaml(profile, ['/test/path']), expected_tokens)
@@ -1,11 +1,10 @@
 import pytest
+import tomllib
 from pathlib import Path
 import yaml
 from organizef.generator import OrganizefGenerator
 
-@pytest.fixture
-def config_path(tmp_path):
-    config_content = """
+_CONFIG_CONTENT = """
 [profiles.clean_empty]
 description = "Clean empty directories"
 rules = [
@@ -18,18 +17,29 @@ rules = [
     { id = "move_videos", enabled = true, params = { video_extensions = ["mp4", "avi", "mkv"] } }
 ]
 """
-    config_file = tmp_path / 'config.toml'
-    with open(config_file, 'w') as f:
-        f.write(config_content)
-    return config_file
 
-@pytest.fixture
-def rules_dir(tmp_path):
-    rules_dir = tmp_path / 'rules'
-    rules_dir.mkdir()
+# _CONFIG_CONTENT parsed once at import; tests that do not exercise config loading inject these directly
+_CLEAN_EMPTY_PROFILE = {
+    'description': 'Clean empty directories',
+    'rules': [{'id': 'clean_empty_dirs', 'enabled': True, 'params': {'exclude_dirs': ['important', 'backup']}}],
+}
+_CONFIG = {
+    'profiles': {
+        'clean_empty': _CLEAN_EMPTY_PROFILE,
+        'move_videos': {
+            'description': 'Move video files',
+            'rules': [{'id': 'move_videos', 'enabled': True, 'params': {'video_extensions': ['mp4', 'avi', 'mkv']}}],
+        },
+    }
+}
+_DISABLED_CONFIG = {
+    'profiles': {
+        'clean_empty': {**_CLEAN_EMPTY_PROFILE, 'rules': [{**_CLEAN_EMPTY_PROFILE['rules'][0], 'enabled': False}]},
+    }
+}
 
-    # Create clean_empty_dirs.yaml
-    clean_rule = {
+_RULES = {
+    'clean_empty_dirs': {
         'rules': [{
             'name': 'Remove empty directories',
             'locations': '${locations}',
@@ -38,12 +48,8 @@ def rules_dir(tmp_path):
             'filters': [{'empty': None}],
             'actions': [{'echo': 'Found empty directory: {path}'}, {'delete': None}]
         }]
-    }
-    with open(rules_dir / 'clean_empty_dirs.yaml', 'w') as f:
-        yaml.dump(clean_rule, f)
-
-    # Create move_videos.yaml
-    video_rule = {
+    },
+    'move_videos': {
         'rules': [{
             'name': 'Move Videos to [video] Folder',
             'locations': '${locations}',
@@ -51,14 +57,41 @@ def rules_dir(tmp_path):
             'filters': [{'extension': '${video_extensions}'}],
             'actions': [{'move': '{location}/[video]/{path.relative_to(location)}'}]
         }]
-    }
-    with open(rules_dir / 'move_videos.yaml', 'w') as f:
-        yaml.dump(video_rule, f)
+    },
+}
+
+def _write_config(directory):
+    config_file = directory / 'config.toml'
+    with open(config_file, 'w') as f:
+        f.write(_CONFIG_CONTENT)
+    return config_file
 
+def _write_rules(directory):
+    rules_dir = directory / 'rules'
+    rules_dir.mkdir()
+    for rule_id, rule in _RULES.items():
+        with open(rules_dir / f'{rule_id}.yaml', 'w') as f:
+            yaml.dump(rule, f)
     return rules_dir
 
-def test_generate_clean_empty_yaml(config_path, rules_dir):
-    generator = OrganizefGenerator(config_path, rules_dir)
+@pytest.fixture
+def config_path(tmp_path):
+    return _write_config(tmp_path)
+
+@pytest.fixture
+def rules_dir(tmp_path):
+    return _write_rules(tmp_path)
+
+@pytest.fixture(scope="session")
+def shared_generator():
+    """Generator for read-only tests; config and rules are injected, nothing is read from disk"""
+    return OrganizefGenerator(config=_CONFIG, rules=_RULES)
+
+def test_config_matches_toml():
+    assert tomllib.loads(_CONFIG_CONTENT) == _CONFIG
+
+def test_generate_clean_empty_yaml(shared_generator):
+    generator = shared_generator
     yaml_content = generator.generate_yaml('clean_empty', ['/test/path'])
 
     parsed = yaml.safe_load(yaml_content)
@@ -75,8 +108,8 @@ def test_generate_clean_empty_yaml(config_path, rules_dir):
     assert 'empty' in rule['filters'][0]
     assert len(rule['actions']) == 2
 
-def test_generate_move_videos_yaml(config_path, rules_dir):
-    generator = OrganizefGenerator(config_path, rules_dir)
+def test_generate_move_videos_yaml(shared_generator):
+    generator = shared_generator
     yaml_content = generator.generate_yaml('move_videos', ['/test/path'])
 
     parsed = yaml.safe_load(yaml_content)
@@ -91,8 +124,8 @@ def test_generate_move_videos_yaml(config_path, rules_dir):
     assert rule['filters'][0]['extension'] == ['mp4', 'avi', 'mkv']
     assert rule['actions'][0]['move'] == '{location}/[video]/{path.relative_to(location)}'
 
-def test_generate_multiple_paths(config_path, rules_dir):
-    generator = OrganizefGenerator(config_path, rules_dir)
+def test_generate_multiple_paths(shared_generator):
+    generator = shared_generator
     yaml_content = generator.generate_yaml('clean_empty', ['/path1', '/path2'])
 
     parsed = yaml.safe_load(yaml_content)
@@ -104,25 +137,188 @@ def test_generate_multiple_paths(config_path, rules_dir):
     assert rule['locations'][0]['exclude_dirs'] == ['important', 'backup']
     assert rule['locations'][1]['exclude_dirs'] == ['important', 'backup']
 
-def test_invalid_profile(config_path, rules_dir):
-    generator = OrganizefGenerator(config_path, rules_dir)
+def test_invalid_profile(shared_generator):
+    generator = shared_generator
     with pytest.raises(ValueError, match="Profile nonexistent not found"):
         generator.generate_yaml('nonexistent', ['/test/path'])
 
-def test_disabled_rule(config_path, rules_dir):
-    # Modify config to disable rule
-    config_content = """
-[profiles.clean_empty]
-description = "Clean empty directories"
-rules = [
-    { id = "clean_empty_dirs", enabled = false, params = { exclude_dirs = ["important", "backup"] } }
-]
-"""
-    with open(config_path, 'w') as f:
-        f.write(config_content)
-
-    generator = OrganizefGenerator(config_path, rules_dir)
+def test_disabled_rule():
+    generator = OrganizefGenerator(config=_DISABLED_CONFIG, rules=_RULES)
     yaml_content = generator.generate_yaml('clean_empty', ['/test/path'])
 
     parsed = yaml.safe_load(yaml_content)
-    assert len(parsed['rules']) == 0  # No rules should be generated
\ No newline at end of file
+    assert len(parsed['rules']) == 0  # No rules should be generated
+
+def test_equal_exclude_dirs_share_locations(monkeypatch):
+    """Test rules whose exclude_dirs lists are equal but distinct reuse one serialized locations block"""
+    import organizef.generator as generator_module
+    rule = {'id': 'clean_empty_dirs', 'enabled': True, 'params': {'exclude_dirs': ['a', 'b']}}
+    config = {'profiles': {'p': {'rules': [rule, {**rule, 'params': {'exclude_dirs': ['a', 'b']}}]}}}
+    generator = OrganizefGenerator(config=config, rules=_RULES)
+    indent = generator_module._indent
+    columns = []
+    monkeypatch.setattr(generator_module, '_indent', lambda text, column: columns.append(column) or indent(text, column))
+
+    data = yaml.safe_load(generator.generate_yaml('p', ['/p']))
+    assert len(columns) == 1
+    assert data['rules'][0]['locations'] == data['rules'][1]['locations'] == [{'path': '/p', 'exclude_dirs': ['a', 'b']}]
+
+def test_generate_yaml_without_paths(shared_generator):
+    """Test an empty path list still renders valid YAML with empty locations"""
+    for profile in ('clean_empty', 'move_videos'):
+        parsed = yaml.safe_load(shared_generator.generate_yaml(profile, []))
+        assert parsed['rules'][0]['locations'] == []
+
+def test_rule_cache_not_mutated(shared_generator):
+    generator = shared_generator
+    generator.generate_yaml('clean_empty', ['/path1'])
+    yaml_content = generator.generate_yaml('clean_empty', ['/path2'])
+
+    parsed = yaml.safe_load(yaml_content)
+    assert parsed['rules'][0]['locations'][0]['path'] == '/path2'
+    assert generator._rule_cache['clean_empty_dirs']['rules'][0]['locations'] == '${locations}'
+
+def test_config_cache_invalidated_on_change(config_path):
+    generator = OrganizefGenerator(config_path, rules=_RULES)
+    assert generator.config_cache_path.exists()
+    # 缓存不写入配置文件所在目录
+    assert not config_path.with_suffix('.toml.pkl').exists()
+
+    config_path.write_text("""
+[profiles.only_one]
+rules = []
+""")
+    generator = OrganizefGenerator(config_path, rules=_RULES)
+    assert list(generator.config['profiles']) == ['only_one']
+
+def test_replace_placeholders(shared_generator):
+    generator = shared_generator
+    data = {
+        'filters': [{'extension': '${exts}'}],
+        'python': 'target = "${folder}"\nkeep = "${unknown}"',
+        'names': ['${folder}', 'plain'],
+    }
+    generator.replace_placeholders(data, {'exts': ['mp4'], 'folder': '[video]'})
+
+    assert data['filters'][0]['extension'] == ['mp4']
+    assert data['python'] == 'target = "[video]"\nkeep = "${unknown}"'
+    assert data['names'] == ['[video]', 'plain']
+
+    with pytest.raises(ValueError, match="Parameter missing not found"):
+        generator.replace_placeholders({'x': '${missing}'}, {})
+
+def test_compile_config(config_path, rules_dir):
+    generator = OrganizefGenerator(config_path, rules_dir)
+    expected = generator.generate_yaml('clean_empty', ['/path1', '/path2'])
+
+    cache_path = generator.compile_config()
+    assert cache_path.exists()
+    assert cache_path.parent == generator.cache_dir
+    assert not config_path.with_suffix('.cache.pkl').exists()
+
+    compiled = OrganizefGenerator(config_path, rules_dir)
+    assert compiled._compiled is not None
+    assert yaml.safe_load(compiled.generate_yaml('clean_empty', ['/path1', '/path2'])) == yaml.safe_load(expected)
+
+    # Editing a rule file invalidates the compiled cache
+    (rules_dir / 'move_videos.yaml').write_text('rules: []\n')
+    assert OrganizefGenerator(config_path, rules_dir)._compiled is None
+
+def test_injected_rules(config_path):
+    """Test injected rules are used without a rules directory and are never cached to disk"""
+    generator = OrganizefGenerator(config_path, rules={'clean_empty_dirs': _RULES['clean_empty_dirs']})
+    assert yaml.safe_load(generator.generate_yaml('clean_empty', ['/p']))['rules'][0]['locations'][0]['path'] == '/p'
+    assert generator._compiled is None
+
+    with pytest.raises(ValueError, match="Rule move_videos not found"):
+        generator.generate_yaml('move_videos', ['/p'])
+    with pytest.raises(ValueError, match="Cannot compile injected"):
+        generator.compile_config()
+
+def test_injected_config():
+    """Test an injected config needs no config file and survives clear_caches"""
+    generator = OrganizefGenerator(config=_CONFIG, rules=_RULES)
+    generator.clear_caches()
+    assert generator.config is _CONFIG
+    assert 'rules' in generator.generate_yaml('move_videos', ['/p'])
+
+    with pytest.raises(ValueError, match="config_path or config"):
+        OrganizefGenerator()
+
+def test_tag_colors(tmp_path):
+    """Test tag colors are assigned once per generator in sorted tag order"""
+    config_file = tmp_path / 'config.toml'
+    config_file.write_text("""
+[profiles.a]
+tags = ["video", "archive"]
+rules = []
+
+[profiles.b]
+tags = ["archive", "image"]
+rules = []
+""", encoding='utf-8')
+    rules_dir = tmp_path / 'rules'
+    rules_dir.mkdir()
+
+    generator = OrganizefGenerator(config_file, rules_dir)
+    assert generator.tag_colors == {'archive': 'red', 'image': 'green', 'video': 'blue'}
+
+def test_rule_msgpack_cache(config_path, rules_dir):
+    """Test parsed rules are cached as msgpack and refreshed when the YAML changes"""
+    pytest.importorskip('msgpack')
+    generator = OrganizefGenerator(config_path, rules_dir)
+    expected = generator.generate_yaml('clean_empty', ['/path1'])
+    assert generator._cache_file(rules_dir / 'clean_empty_dirs.yaml', '.yaml.msgpack').exists()
+    assert not list(rules_dir.glob('*.yaml.msgpack'))
+    assert OrganizefGenerator(config_path, rules_dir).generate_yaml('clean_empty', ['/path1']) == expected
+
+    rule_file = rules_dir / 'clean_empty_dirs.yaml'
+    rule_file.write_text(rule_file.read_text(encoding='utf-8').replace('Remove empty directories', 'Renamed'), encoding='utf-8')
+    assert 'Renamed' in OrganizefGenerator(config_path, rules_dir).generate_yaml('clean_empty', ['/path1'])
+
+def test_clear_caches(config_path, rules_dir):
+    generator = OrganizefGenerator(config_path, rules_dir)
+    generator.compile_config()
+    assert generator.compiled_path.exists()
+
+    generator.clear_caches()
+    assert not generator.compiled_path.exists()
+    assert not list(generator.cache_dir.glob('*.yaml.msgpack'))
+    assert generator._compiled is None
+    assert 'rules' in generator.generate_yaml('clean_empty', ['/path1'])
+
+def test_render_placeholders_copies(shared_generator):
+    generator = shared_generator
+    data = {'rules': [{'locations': '${locations}', 'tags': ['${tag}', 1, None]}]}
+    result = generator.render_placeholders(data, {'locations': ['/p'], 'tag': 'x'})
+
+    assert result == {'rules': [{'locations': ['/p'], 'tags': ['x', 1, None]}]}
+    assert data == {'rules': [{'locations': '${locations}', 'tags': ['${tag}', 1, None]}]}
+
+def test_preload_rules(config_path, rules_dir, monkeypatch):
+    import organizef.generator as generator_module
+    monkeypatch.setattr(generator_module, '_PRELOAD_MIN_RULES', 1)
+    generator = OrganizefGenerator(config_path, rules_dir)
+
+    generator._preload_rules(['clean_empty_dirs', 'move_videos', 'clean_empty_dirs'])
+    assert set(generator._rule_cache) == {'clean_empty_dirs', 'move_videos'}
+
+    with pytest.raises(FileNotFoundError):
+        generator._preload_rules(['missing_rule'])
+
+def test_generate_yaml_from_rule_templates(config_path, rules_dir):
+    """Test per-rule text templates match a full render, including the embedded-locations fallback"""
+    with open(rules_dir / 'clean_empty_dirs.yaml', 'w') as f:
+        yaml.dump({'rules': [
+            {'name': 'a', 'locations': '${locations}', 'actions': [{'echo': 'x'}]},
+            {'name': 'b', 'locations': '${locations}', 'actions': [{'echo': 'in ${locations}'}]},
+        ]}, f)
+    generator = OrganizefGenerator(config_path, rules_dir)
+    paths = ['/path1', '/a b: c']
+
+    for _ in range(2):
+        data = yaml.safe_load(generator.generate_yaml('clean_empty', paths))
+        locations = data['rules'][0]['locations']
+        assert [loc['path'] for loc in locations] == paths
+        assert data['rules'][1]['locations'] == locations
+        assert data['rules'][1]['actions'][0]['echo'] == f"in {locations}"
@@ -1,65 +1,80 @@
+import contextlib
+import os
+import types
+
 import pytest
-from unittest.mock import patch
 from organizef.input import get_paths
 
-def test_get_paths_clipboard_valid():
+@pytest.fixture
+def fake_fs(monkeypatch):
+    """In-memory stand-in for os.path.exists and os.scandir: only paths added to the returned set exist"""
+    existing = set()
+
+    def scandir(parent):
+        names = [name for parent_dir, name in map(os.path.split, existing) if (parent_dir or os.curdir) == parent]
+        return contextlib.nullcontext([types.SimpleNamespace(name=name) for name in names])
+
+    monkeypatch.setattr('os.path.exists', existing.__contains__)
+    monkeypatch.setattr('os.scandir', scandir)
+    return existing
+
+@pytest.fixture
+def prompt(monkeypatch):
+    """Stub pyperclip and rich prompts; call with clipboard text, Confirm answer and Prompt answers"""
+    def setup(clipboard='', confirm=True, answers=()):
+        answers = iter(answers)
+        monkeypatch.setattr('pyperclip.paste', lambda: clipboard)
+        monkeypatch.setattr('rich.prompt.Confirm.ask', lambda *args, **kwargs: confirm)
+        monkeypatch.setattr('rich.prompt.Prompt.ask', lambda *args, **kwargs: next(answers))
+        monkeypatch.setattr('rich.console.Console.print', lambda *args, **kwargs: None)
+    return setup
+
+def test_get_paths_clipboard_valid(fake_fs, prompt):
     """Test getting paths from clipboard with valid paths"""
-    with patch('pyperclip.paste', return_value='C:\\test\nD:\\downloads'), \
-         patch('os.path.exists', return_value=True), \
-         patch('rich.prompt.Confirm.ask', return_value=True):
-        paths = get_paths()
-        assert paths == ['C:\\test', 'D:\\downloads']
+    fake_fs.update(['C:\\test', 'D:\\downloads'])
+    prompt(clipboard='C:\\test\nD:\\downloads')
+    assert get_paths() == ['C:\\test', 'D:\\downloads']
 
-def test_get_paths_clipboard_invalid_confirm():
+def test_get_paths_clipboard_invalid_confirm(fake_fs, prompt):
     """Test clipboard with invalid paths, user confirms"""
-    with patch('pyperclip.paste', return_value='C:\\test\ninvalid\nD:\\downloads'), \
-         patch('os.path.exists', side_effect=[True, False, True]), \
-         patch('rich.prompt.Confirm.ask', return_value=True):
-        paths = get_paths()
-        assert paths == ['C:\\test', 'D:\\downloads']
+    fake_fs.update(['C:\\test', 'D:\\downloads'])
+    prompt(clipboard='C:\\test\ninvalid\nD:\\downloads')
+    assert get_paths() == ['C:\\test', 'D:\\downloads']
 
-def test_get_paths_clipboard_reject():
+def test_get_paths_clipboard_reject(fake_fs, prompt):
     """Test clipboard paths rejected by user"""
-    with patch('pyperclip.paste', return_value='C:\\test\nD:\\downloads'), \
-         patch('os.path.exists', return_value=True), \
-         patch('rich.prompt.Confirm.ask', return_value=False), \
-         patch('rich.prompt.Prompt.ask') as mock_prompt:
-        mock_prompt.side_effect = ['C:\\manual', '']  # Manual input then empty
-        paths = get_paths()
-        assert paths == ['C:\\manual']
+    fake_fs.update(['C:\\test', 'D:\\downloads', 'C:\\manual'])
+    prompt(clipboard='C:\\test\nD:\\downloads', confirm=False, answers=['C:\\manual', ''])  # Manual input then empty
+    assert get_paths() == ['C:\\manual']
 
-def test_get_paths_manual_input():
+def test_get_paths_manual_input(fake_fs, prompt):
     """Test manual path input"""
-    with patch('pyperclip.paste', return_value=''), \
-         patch('rich.prompt.Prompt.ask') as mock_prompt:
-        mock_prompt.side_effect = ['C:\\test1', 'C:\\test2', '']  # Two paths then empty
-        with patch('os.path.exists', return_value=True):
-            paths = get_paths()
-            assert paths == ['C:\\test1', 'C:\\test2']
+    fake_fs.update(['C:\\test1', 'C:\\test2'])
+    prompt(answers=['C:\\test1', 'C:\\test2', ''])  # Two paths then empty
+    assert get_paths() == ['C:\\test1', 'C:\\test2']
 
-def test_get_paths_duplicate_removal():
+def test_get_paths_duplicate_removal(fake_fs, prompt):
     """Test duplicate path removal"""
-    with patch('pyperclip.paste', return_value=''), \
-         patch('rich.prompt.Prompt.ask') as mock_prompt:
-        mock_prompt.side_effect = ['C:\\test', 'C:\\test', '']  # Duplicate input
-        with patch('os.path.exists', return_value=True), \
-             patch('rich.console.Console.print'):
-            paths = get_paths()
-            assert paths == ['C:\\test']
+    fake_fs.add('C:\\test')
+    prompt(answers=['C:\\test', 'C:\\test', ''])  # Duplicate input
+    assert get_paths() == ['C:\\test']
 
-def test_get_paths_invalid_path_retry():
+def test_get_paths_invalid_path_retry(fake_fs, prompt):
     """Test invalid path retry"""
-    with patch('pyperclip.paste', return_value=''), \
-         patch('rich.prompt.Prompt.ask') as mock_prompt:
-        mock_prompt.side_effect = ['invalid', 'C:\\valid', '']  # Invalid then valid
-        with patch('os.path.exists', side_effect=[False, True]), \
-             patch('rich.console.Console.print'):
-            paths = get_paths()
-            assert paths == ['C:\\valid']
+    fake_fs.add('C:\\valid')
+    prompt(answers=['invalid', 'C:\\valid', ''])  # Invalid then valid
+    assert get_paths() == ['C:\\valid']
 
-def test_get_paths_no_paths():
+def test_get_paths_no_paths(fake_fs, prompt):
     """Test no paths provided"""
-    with patch('pyperclip.paste', return_value=''), \
-         patch('rich.prompt.Prompt.ask', return_value=''):  # Empty input
-        paths = get_paths()
-        assert paths is None
\ No newline at end of file
+    prompt(answers=[''])  # Empty input
+    assert get_paths() is None
+
+def test_get_paths_clipboard_lists_shared_parent_once(fake_fs, prompt, monkeypatch):
+    """Test clipboard paths sharing a parent are checked with one directory read instead of per-path stats"""
+    fake_fs.update(['/data/a', '/data/b', '/other'])
+    stats = []
+    monkeypatch.setattr('os.path.exists', lambda path: stats.append(path) or path in fake_fs)
+    prompt(clipboard='/data/a\n/data/missing\n/data/b\n/other')
+    assert get_paths() == ['/data/a', '/data/b', '/other']
+    assert stats == ['/data/missing', '/other']
@@ -0,0 +1,43 @@
+import io
+import json
+import sys
+import types
+
+from organizef.worker import serve
+
+
+def test_serve_executes_requests(monkeypatch):
+    """Test the stdin/stdout worker loop with a fake organize module"""
+    executed = []
+
+    class FakeConfig:
+        def __init__(self, text):
+            self.text = text
+
+        @classmethod
+        def from_string(cls, text):
+            return cls(text)
+
+        def execute(self, simulate):
+            if self.text == 'bad':
+                raise RuntimeError('broken config')
+            executed.append((self.text, simulate))
+
+    fake_organize = types.ModuleType('organize')
+    fake_organize.Config = FakeConfig
+    monkeypatch.setitem(sys.modules, 'organize', fake_organize)
+
+    requests = [
+        {'mode': 'sim', 'yaml': 'rules: []'},
+        {'mode': 'run', 'yaml': 'bad'},
+        {'mode': 'other', 'yaml': 'rules: []'},
+    ]
+    stdin = io.StringIO('\n'.join(json.dumps(r) for r in requests) + '\n')
+    stdout = io.StringIO()
+    serve(stdin=stdin, stdout=stdout)
+
+    responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    assert responses[0] == {'ok': True}
+    assert responses[1] == {'ok': False, 'error': 'broken config'}
+    assert responses[2]['ok'] is False
+    assert executed == [('rules: []', True)]
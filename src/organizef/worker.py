@@ -0,0 +1,58 @@
+"""常驻 organize 工作进程
+
+organize 本身的导入开销不小，每次都 ``subprocess.run(["organize", ...])`` 会重复支付
+解释器启动 + 导入的成本。这里提供一个在进程内执行配置的入口，以及一个基于 stdin/stdout
+的常驻循环，供批量/脚本化调用复用同一个已加载 organize 的进程：
+
+    python -u -m organizef.worker
+
+协议为逐行 JSON：每行输入 ``{"mode": "sim" | "run", "yaml": "..."}``，
+每行输出 ``{"ok": true}`` 或 ``{"ok": false, "error": "..."}``。
+organize 自身的输出被重定向到 stderr，stdout 只用于协议。
+"""
+import contextlib
+import json
+import sys
+
+
+def execute_config(yaml_content: str, simulate: bool) -> None:
+    """在当前进程内执行一份 organize YAML 配置"""
+    from organize import Config
+
+    Config.from_string(yaml_content).execute(simulate=simulate)
+
+
+def serve(stdin=None, stdout=None) -> None:
+    """读取逐行 JSON 请求并在当前进程内执行，直到 stdin 关闭"""
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+
+    # 预先导入，保证后续每个请求都不再支付导入成本
+    import organize  # noqa: F401
+
+    for line in stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+            mode = request.get("mode", "sim")
+            if mode not in ("sim", "run"):
+                raise ValueError(f"Unknown mode: {mode}")
+            with contextlib.redirect_stdout(sys.stderr):
+                execute_config(request["yaml"], simulate=(mode == "sim"))
+            response = {"ok": True}
+        except Exception as e:
+            response = {"ok": False, "error": str(e)}
+        stdout.write(json.dumps(response, ensure_ascii=False) + "\n")
+        stdout.flush()
+
+
+if __name__ == "__main__":
+    try:
+        serve()
+    except ImportError as e:
+        print(f"organize 未安装: {e}", file=sys.stderr)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        pass
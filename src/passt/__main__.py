@@ -11,8 +11,10 @@ import json
 import subprocess
 import shutil
 import time
-import psutil
 import signal
+import stat
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
@@ -20,12 +22,7 @@ from datetime import datetime
 # 导入命令行参数库
 import typer
 
-# 导入Rich库
-from rich.console import Console
-from rich.prompt import Prompt, Confirm
-from rich.panel import Panel
-
-from passt.core.extract import ArchiveExtractor
+from passt.core.extract import ArchiveExtractor, is_archive
 
 from loguru import logger
 import os
@@ -33,13 +30,17 @@ import sys
 from pathlib import Path
 from datetime import datetime
 
-def setup_logger(app_name="app", project_root=None, console_output=True):
+def setup_logger(app_name="app", project_root=None, console_output=True, console_level="WARNING"):
     """配置 Loguru 日志系统
     
+    控制台处理器是同步写入的，批量删除/解压时大量 INFO 日志会拖慢主循环，
+    因此控制台默认只输出 WARNING 及以上，完整日志写入异步的文件处理器
+    
     Args:
         app_name: 应用名称，用于日志目录
         project_root: 项目根目录，默认为当前文件所在目录
         console_output: 是否输出到控制台，默认为True
+        console_level: 控制台日志级别，默认为WARNING
         
     Returns:
         tuple: (logger, config_info)
@@ -54,10 +55,11 @@ def setup_logger(app_name="app", project_root=None, console_output=True):
     logger.remove()
     
     # 有条件地添加控制台处理器（简洁版格式）
+    console_handler_id = None
     if console_output:
-        logger.add(
+        console_handler_id = logger.add(
             sys.stdout,
-            level="INFO",
+            level=console_level,
             format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <blue>{elapsed}</blue> | <level>{level.icon} {level: <8}</level> | <cyan>{name}:{function}:{line}</cyan> - <level>{message}</level>"
         )
     
@@ -80,12 +82,13 @@ def setup_logger(app_name="app", project_root=None, console_output=True):
         retention="30 days",
         compression="zip",
         encoding="utf-8",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {elapsed} | {level.icon} {level: <8} | {name}:{function}:{line} - {message}",
+        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
         enqueue=True,     )
     
     # 创建配置信息字典
     config_info = {
         'log_file': log_file,
+        'console_handler_id': console_handler_id,
     }
     
     logger.info(f"日志系统已初始化，应用名称: {app_name}")
@@ -96,35 +99,134 @@ logger, config_info = setup_logger(app_name="passt", console_output=True)
 # 创建 Typer 应用
 app = typer.Typer(help="压缩包批量解压工具 - 支持密码尝试和文件重命名")
 
-console = Console()
+@functools.lru_cache(maxsize=None)
+def _console():
+    """首次输出时才导入 Rich 并创建 Console，纯命令行调用不必承担 Rich 的导入开销"""
+    from rich.console import Console
+    return Console()
+
+
+def set_quiet(quiet: bool) -> None:
+    """静默模式下移除控制台日志处理器，只保留文件日志"""
+    handler_id = config_info.get('console_handler_id')
+    if quiet and handler_id is not None:
+        logger.remove(handler_id)
+        config_info['console_handler_id'] = None
 
-# 支持的压缩包格式
-ARCHIVE_EXTENSIONS = {
-    '.zip', '.rar', '.7z', '.tar', '.gz', '.bz2', 
-    '.xz', '.tar.gz', '.tar.bz2', '.tar.xz',
-    '.cbz', '.cbr'
-}
+
+# Windows 剪贴板的 Unicode 文本格式
+CF_UNICODETEXT = 13
+
+
+def _read_windows_clipboard() -> Optional[str]:
+    """通过 user32 直接读取 Windows 剪贴板文本，无法打开剪贴板时返回 None"""
+    import ctypes
+    from ctypes import wintypes
+    
+    user32 = ctypes.WinDLL("user32", use_last_error=True)
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    user32.OpenClipboard.argtypes = [wintypes.HWND]
+    user32.GetClipboardData.argtypes = [wintypes.UINT]
+    user32.GetClipboardData.restype = wintypes.HANDLE
+    kernel32.GlobalLock.argtypes = [wintypes.HGLOBAL]
+    kernel32.GlobalLock.restype = wintypes.LPVOID
+    kernel32.GlobalUnlock.argtypes = [wintypes.HGLOBAL]
+    
+    if not user32.OpenClipboard(None):
+        return None
+    try:
+        handle = user32.GetClipboardData(CF_UNICODETEXT)
+        if not handle:
+            # 剪贴板中没有文本
+            return ""
+        data = kernel32.GlobalLock(handle)
+        if not data:
+            return None
+        try:
+            return ctypes.wstring_at(data)
+        finally:
+            kernel32.GlobalUnlock(handle)
+    finally:
+        user32.CloseClipboard()
+
+
+def _read_clipboard() -> str:
+    """读取剪贴板文本
+    
+    Windows 上直接调用剪贴板 API，Linux 上只调用一次 wl-paste 或 xclip，
+    都失败时才退回 pyperclip（未安装时抛出 ImportError）
+    """
+    if sys.platform == "win32":
+        try:
+            text = _read_windows_clipboard()
+            if text is not None:
+                return text
+        except (OSError, AttributeError) as e:
+            logger.debug(f"直接读取剪贴板失败: {e}")
+    elif sys.platform.startswith("linux"):
+        if os.environ.get("WAYLAND_DISPLAY"):
+            cmd = ["wl-paste", "--no-newline"]
+        else:
+            cmd = ["xclip", "-selection", "clipboard", "-o"]
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=2)
+            if result.returncode == 0:
+                return result.stdout
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logger.debug(f"{cmd[0]} 读取剪贴板失败: {e}")
+    
+    import pyperclip
+    return pyperclip.paste()
+
+
+# 剪贴板路径超过该数量时并发 stat（网络共享上 stat 主要耗在延迟上）
+_PARALLEL_STAT_MIN_PATHS = 50
+
+
+def _stat_or_none(path: str) -> Optional[os.stat_result]:
+    """stat 路径，不存在或无法访问时返回 None"""
+    try:
+        return os.stat(path)
+    except (OSError, ValueError):
+        return None
 
 
 def get_paths_from_clipboard() -> List[Path]:
-    """从剪贴板读取多行路径"""
+    """从剪贴板读取多行路径
+    
+    先去重再检查，每个路径只 stat 一次，同时判断是否存在和是否为目录
+    """
     paths = []
     try:
-        import pyperclip
-        clipboard_content = pyperclip.paste()
-        if clipboard_content:
-            for line in clipboard_content.splitlines():
-                if line := line.strip().strip('"').strip("'"):
-                    path = Path(line)
-                    if path.exists():
-                        paths.append(path)
-                    else:
-                        console.print(f"[yellow]警告：路径不存在 - {line}[/yellow]")
-            console.print(f"[green]从剪贴板读取到 {len(paths)} 个有效路径[/green]")
+        clipboard_content = _read_clipboard()
+        if not clipboard_content.strip():
+            _console().print("[yellow]剪贴板为空[/yellow]")
+            return paths
+        # 按出现顺序去重，Windows 上忽略大小写
+        unique_lines = {}
+        for line in clipboard_content.splitlines():
+            if line := line.strip().strip('"').strip("'"):
+                unique_lines.setdefault(os.path.normcase(line), line)
+        lines = list(unique_lines.values())
+        
+        if len(lines) > _PARALLEL_STAT_MIN_PATHS:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                stats = list(executor.map(_stat_or_none, lines))
+        else:
+            stats = [_stat_or_none(line) for line in lines]
+        
+        for line, st in zip(lines, stats):
+            if st is None:
+                _console().print(f"[yellow]警告：路径不存在 - {line}[/yellow]")
+            elif stat.S_ISDIR(st.st_mode) or is_archive(Path(line)):
+                paths.append(Path(line))
+            else:
+                _console().print(f"[yellow]警告：不是支持的压缩包格式 - {line}[/yellow]")
+        _console().print(f"[green]从剪贴板读取到 {len(paths)} 个有效路径[/green]")
     except ImportError:
-        console.print("[red]警告：未安装pyperclip模块，无法从剪贴板读取[/red]")
+        _console().print("[red]警告：未安装pyperclip模块，无法从剪贴板读取[/red]")
     except Exception as e:
-        console.print(f"[red]从剪贴板读取失败: {e}[/red]")
+        _console().print(f"[red]从剪贴板读取失败: {e}[/red]")
     return paths
 
 
@@ -135,7 +237,9 @@ def get_user_options() -> Tuple[bool, bool]:
     Returns:
         Tuple[bool, bool]: (use_sdel, dissolve_folder)
     """
-    console.print("\n[cyan]解压选项配置:[/cyan]")
+    from rich.prompt import Confirm
+    
+    _console().print("\n[cyan]解压选项配置:[/cyan]")
     
     # 询问是否使用sdel（删除原压缩包）
     use_sdel = Confirm.ask(
@@ -154,7 +258,9 @@ def get_user_options() -> Tuple[bool, bool]:
 
 def run_interactive() -> None:
     """运行交互式界面"""
-    console.print(Panel.fit(
+    from rich.panel import Panel
+    
+    _console().print(Panel.fit(
         "[bold blue]压缩包批量解压工具[/bold blue]\n"
         "支持密码尝试和文件重命名功能\n"
         "支持格式: ZIP, RAR, 7Z, TAR, CBZ, CBR 等",
@@ -164,14 +270,14 @@ def run_interactive() -> None:
     # 获取用户输入
     target_path = get_user_input()
     if target_path is None:
-        console.print("[yellow]用户取消操作[/yellow]")
+        _console().print("[yellow]用户取消操作[/yellow]")
         return
     
     # 初始化解压器
     extractor = ArchiveExtractor()
     
     # 查找压缩包
-    console.print(f"\n[cyan]正在扫描路径: {target_path}[/cyan]")
+    _console().print(f"\n[cyan]正在扫描路径: {target_path}[/cyan]")
     archives = extractor.find_archives(target_path)
     
     # 处理压缩包
@@ -184,6 +290,7 @@ def get_user_input() -> Optional[Path]:
     Returns:
         Optional[Path]: 用户选择的路径，如果取消则返回None
     """
+    from rich.prompt import Prompt, Confirm
     
     while True:
         path_input = Prompt.ask(
@@ -199,14 +306,14 @@ def get_user_input() -> Optional[Path]:
         path = Path(path_input.strip()).resolve()
         
         if not path.exists():
-            console.print(f"[red]路径不存在: {path}[/red]")
+            _console().print(f"[red]路径不存在: {path}[/red]")
             continue
         
-        console.print(f"[green]选择的路径: {path}[/green]")
+        _console().print(f"[green]选择的路径: {path}[/green]")
         
         if path.is_file():
-            if path.suffix.lower() not in ARCHIVE_EXTENSIONS:
-                console.print(f"[yellow]警告: {path.name} 不是支持的压缩包格式[/yellow]")
+            if not is_archive(path):
+                _console().print(f"[yellow]警告: {path.name} 不是支持的压缩包格式[/yellow]")
         
         if Confirm.ask("确认使用此路径？",default=True):
             return path
@@ -220,19 +327,25 @@ def extract(
     delete: bool = typer.Option(True, "--delete/--no-delete", "-d", help="解压成功后删除原压缩包"),
     dissolve: bool = typer.Option(True, "--dissolve/--no-dissolve", help="重命名后解散压缩包文件夹"),
     password_file: Optional[str] = typer.Option("passwords.json", "--password-file", "-p", help="密码配置文件路径"),
+    quiet: Optional[bool] = typer.Option(None, "--quiet/--no-quiet", "-q", help="不在控制台输出日志（默认在非交互终端下启用）"),
+    timeout: Optional[int] = typer.Option(None, "--timeout", help="7z 最短超时时间（秒），默认读取 PASST_7Z_TIMEOUT 或 300"),
+    bytes_per_sec: Optional[int] = typer.Option(None, "--bytes-per-sec", help="按此速度（字节/秒）为大压缩包放宽超时，默认读取 PASST_7Z_BPS 或 20MB/s"),
 ):
     """解压压缩包文件"""
     
+    if quiet is None:
+        quiet = not sys.stdout.isatty()
+    set_quiet(quiet)
+    
     # 如果使用交互式界面，或者不带任何参数
     if interactive or (len(sys.argv) == 1):
         run_interactive()
         return
     
-    # 检查7z是否可用
-    try:
-        subprocess.run(['7z'], capture_output=True, check=False)
-    except FileNotFoundError:
-        console.print("[red]错误: 未找到 7z 命令，请确保已安装 7-Zip[/red]")
+    # 检查7z是否可用（只查找 PATH，不启动子进程）
+    seven_zip = shutil.which('7z') or shutil.which('7z.exe')
+    if not seven_zip:
+        _console().print("[red]错误: 未找到 7z 命令，请确保已安装 7-Zip[/red]")
         raise typer.Exit(code=1)
     
     # 获取要处理的路径
@@ -245,26 +358,32 @@ def extract(
         path_list.extend(paths)
     
     if not path_list:
-        console.print("[red]错误: 未提供任何有效的路径[/red]")
-        console.print("使用 --interactive 选项启动交互式界面，或使用 --clipboard 从剪贴板读取路径")
+        _console().print("[red]错误: 未提供任何有效的路径[/red]")
+        _console().print("使用 --interactive 选项启动交互式界面，或使用 --clipboard 从剪贴板读取路径")
         raise typer.Exit(code=1)
     
     # 初始化解压器
-    extractor = ArchiveExtractor(passwords_config_path=password_file)
+    extractor = ArchiveExtractor(passwords_config_path=password_file, seven_zip=seven_zip)
     
     # 设置解压选项
     extractor.delete_after_extract = delete
     extractor.dissolve_folder = dissolve
+    if timeout is not None:
+        extractor.base_timeout = timeout
+    if bytes_per_sec is not None:
+        extractor.bytes_per_sec = bytes_per_sec
+    # 命令行直接指定路径时不在删除过程中弹出询问
+    extractor.safe_deleter.interactive = False
     
     # 处理每个路径
     for target_path in path_list:
-        console.print(f"\n[cyan]正在扫描路径: {target_path}[/cyan]")
+        _console().print(f"\n[cyan]正在扫描路径: {target_path}[/cyan]")
         
         # 查找压缩包
         archives = extractor.find_archives(target_path)
         
         if not archives:
-            console.print(f"[yellow]在 {target_path} 中未找到压缩包文件[/yellow]")
+            _console().print(f"[yellow]在 {target_path} 中未找到压缩包文件[/yellow]")
             continue
         
         # 处理压缩包
@@ -285,9 +404,9 @@ if __name__ == "__main__":
     try:
         app()
     except KeyboardInterrupt:
-        console.print("\n[yellow]用户中断操作[/yellow]")
+        _console().print("\n[yellow]用户中断操作[/yellow]")
         sys.exit(1)
     except Exception as e:
         logger.error(f"程序执行出错: {e}")
-        console.print(f"[red]程序执行出错: {e}[/red]")
+        _console().print(f"[red]程序执行出错: {e}[/red]")
         sys.exit(1)
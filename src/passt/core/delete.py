@@ -1,71 +1,471 @@
+from __future__ import annotations
+
 from loguru import logger
-import psutil
 from pathlib import Path
-from typing import List
-from rich.console import Console
-from rich.prompt import Prompt, Confirm
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
 import time
+import random
 import shutil
+import functools
+import ntpath
 import os
+import stat
 import sys
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+if TYPE_CHECKING:
+    import psutil
+
+# 文件数少于该值时串行删除，线程池启动开销不划算
+_PARALLEL_MIN_FILES = 8
+# 删除是 IO 密集型操作，线程数可以多于 CPU 核数
+_MAX_DELETE_WORKERS = min(32, (os.cpu_count() or 4) * 4)
+# 重试等待的上限（秒）
+_MAX_RETRY_DELAY = 5.0
+# 终止进程后轮询文件是否已释放：轮询次数与间隔（秒）
+_RELEASE_POLL_COUNT = 20
+_RELEASE_POLL_INTERVAL = 0.05
+
+# CreateFileW 参数（Windows 句柄删除）
+_DELETE = 0x00010000
+_FILE_SHARE_READ = 0x00000001
+_FILE_SHARE_WRITE = 0x00000002
+_FILE_SHARE_DELETE = 0x00000004
+_OPEN_EXISTING = 3
+_FILE_FLAG_DELETE_ON_CLOSE = 0x04000000
+_INVALID_HANDLE_VALUE = (1 << (8 * struct.calcsize("P"))) - 1
+
+
+class _FolderBatch:
+    """一次删除文件夹的批次状态：进程索引缓存和本批次是否关闭占用进程
+    
+    只在执行该次删除的线程及其删除线程池之间共享，多个线程同时使用
+    同一个 SafeDeleter 时互不影响
+    """
+    
+    def __init__(self):
+        # {规范化路径: 占用进程}，避免每个文件都扫描全部进程
+        self.process_file_index: Optional[Dict[str, List[Union[int, psutil.Process]]]] = None
+        # 在缓存索引中未找到占用进程、已重新扫描过的路径
+        self.rescanned_paths: Set[str] = set()
+        self.index_lock = threading.Lock()
+        self.force_terminate: Optional[bool] = None
 
 
 class SafeDeleter:
     """安全删除器，处理文件被占用的情况和Windows路径末尾空格问题"""
     
-    def __init__(self, max_retries: int = 5, retry_delay: float = 1.0):
+    # Windows 长路径前缀：本地路径 \\?\C:\...，UNC 路径 \\?\UNC\server\share\...
+    _LONG_PREFIX = "\\\\?\\"
+    _UNC_LONG_PREFIX = _LONG_PREFIX + "UNC\\"
+    
+    def __init__(self, max_retries: int = 5, retry_delay: float = 1.0, interactive: Optional[bool] = None):
         """初始化安全删除器
         
         Args:
             max_retries: 最大重试次数
             retry_delay: 重试延迟（秒）
+            interactive: 文件被占用时是否询问关闭占用进程，默认在标准输入为终端时询问；
+                非交互模式下只有调用方传入 force_terminate=True 才会关闭占用进程
         """
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.interactive = sys.stdin.isatty() if interactive is None else interactive
+        # 当前线程所属的文件夹删除批次，删除文件夹之外为 None
+        self._local = threading.local()
+        # 让交互确认逐个进行
+        self._prompt_lock = threading.Lock()
+        # 单独删除文件时本批次是否关闭占用进程，首次遇到占用时询问一次，None 表示尚未询问
+        self._batch_force_terminate: Optional[bool] = None
+        # 删除成功后以所在目录为参数回调，供调用方让目录缓存失效
+        self.on_change: Optional[Callable[[Path], None]] = None
+    
+    @functools.cached_property
+    def _psutil(self):
+        """按需导入 psutil：删除一次成功时用不到它，未安装时也能正常删除"""
+        import psutil
+        return psutil
     
-    def _get_windows_long_path(self, path: Path) -> str:
+    def _get_windows_long_path(self, path: Union[Path, str]) -> str:
         r"""获取Windows长路径格式，解决末尾空格问题
         
-        使用 \\?\ 前缀强制Windows内核原样读取路径，不进行自动修剪
+        使用 \\?\ 前缀强制Windows内核原样读取路径，不进行自动修剪；
+        只做字符串拼接，不调用 Path.resolve，重试时不会重复访问文件系统
         
         Args:
             path: 原始路径
             
+        Returns:
+            str: Windows长路径格式的字符串，其他平台返回绝对路径
+        """
+        if sys.platform == "win32":
+            return self._long_path_str(path)
+        return os.path.abspath(str(path))
+    
+    def _unlink_path(self, path: Path) -> None:
+        r"""用 os.unlink 删除文件，Windows 上直接使用 \\?\ 长路径（不经过 Path.resolve）
+        
+        Args:
+            path: 文件路径
+        """
+        if sys.platform != "win32":
+            os.unlink(str(path))
+            return
+        
+        os.unlink(self._long_path_str(path))
+    
+    @classmethod
+    def _long_path_str(cls, path: Union[Path, str]) -> str:
+        r"""不经过 Path.resolve 构建 \\?\ 长路径字符串
+        
+        os.path.abspath 在 Windows 上会修剪末尾空格，因此相对路径只与当前目录拼接，
+        再用 ntpath.normpath 折叠 . 和 ..（\\?\ 路径中的 .. 不会被系统解析）；
+        normpath 只做字符串处理，不修剪末尾空格
+        
+        Args:
+            path: 原始路径
+        
         Returns:
             str: Windows长路径格式的字符串
         """
+        path_str = str(path)
+        if path_str.startswith(cls._LONG_PREFIX):
+            return path_str
+        if path_str.startswith("\\\\"):
+            # UNC 路径 \\server\share 的长路径形式是 \\?\UNC\server\share
+            return cls._UNC_LONG_PREFIX + ntpath.normpath(path_str)[2:]
+        if not os.path.isabs(path_str):
+            path_str = os.path.join(os.getcwd(), path_str)
+        # \\?\ 路径不会转换分隔符，也不会解析 ..，normpath 统一处理
+        return cls._LONG_PREFIX + ntpath.normpath(path_str)
+    
+    def _delete_via_handle(self, path: Path) -> bool:
+        """Windows 上以 FILE_FLAG_DELETE_ON_CLOSE 打开文件再关闭句柄来删除文件
+        
+        以共享删除方式打开，不会与本进程遗留的句柄冲突；其他平台直接返回 False
+        
+        Args:
+            path: 文件路径
+        
+        Returns:
+            bool: 是否删除成功
+        """
+        if sys.platform != "win32":
+            return False
+        
+        try:
+            import ctypes
+            from ctypes import wintypes
+        
+            kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+            kernel32.CreateFileW.restype = wintypes.HANDLE
+            kernel32.CreateFileW.argtypes = [
+                wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD, wintypes.LPVOID,
+                wintypes.DWORD, wintypes.DWORD, wintypes.HANDLE,
+            ]
+            kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+        
+            handle = kernel32.CreateFileW(
+                self._long_path_str(path),
+                _DELETE,
+                _FILE_SHARE_READ | _FILE_SHARE_WRITE | _FILE_SHARE_DELETE,
+                None,
+                _OPEN_EXISTING,
+                _FILE_FLAG_DELETE_ON_CLOSE,
+                None,
+            )
+            if handle is None or handle == _INVALID_HANDLE_VALUE:
+                logger.debug(f"以删除方式打开文件失败 (错误码 {ctypes.get_last_error()}): {path}")
+                return False
+            kernel32.CloseHandle(handle)
+            return True
+        except (OSError, AttributeError) as e:
+            logger.debug(f"句柄删除不可用: {e}")
+            return False
+    
+    def _walk_postorder(self, root: str) -> Iterator[Tuple[str, str]]:
+        """后序遍历目录，产出 ('file' | 'dir', 路径)，子目录在其内容之后产出，不含 root 本身
+        
+        用显式栈代替递归，深层嵌套不会触及递归上限；只使用字符串路径和 DirEntry 缓存的类型信息。
+        符号链接不跟随，按文件产出（只删除链接本身）
+        
+        Args:
+            root: 要遍历的目录
+        """
+        try:
+            stack = [(root, os.scandir(root))]
+        except OSError as e:
+            logger.debug(f"无法读取文件夹: {root} ({e})")
+            return
+        
+        try:
+            while stack:
+                current, it = stack[-1]
+                for entry in it:
+                    if not entry.is_dir(follow_symlinks=False):
+                        yield 'file', entry.path
+                        continue
+                    try:
+                        stack.append((entry.path, os.scandir(entry.path)))
+                    except OSError as e:
+                        # 无法读取的子目录仍尝试删除，失败时交给后续处理
+                        logger.debug(f"无法读取文件夹: {entry.path} ({e})")
+                        yield 'dir', entry.path
+                        continue
+                    break
+                else:
+                    # 当前目录遍历完毕：及时关闭句柄，再产出目录本身
+                    it.close()
+                    stack.pop()
+                    if stack:
+                        yield 'dir', current
+        finally:
+            for _, it in stack:
+                it.close()
+    
+    def _remove_empty_dir(self, dir_path: str) -> bool:
+        """删除空目录，失败时在Windows上尝试长路径格式
+        
+        Args:
+            dir_path: 目录路径
+            
+        Returns:
+            bool: 是否删除成功
+        """
+        try:
+            os.rmdir(dir_path)
+            return True
+        except OSError as e:
+            error = e
+        
         if sys.platform == "win32":
-            abs_path = path.resolve()
-            return f"\\\\?\\{abs_path}"
-        return str(path.resolve())
+            try:
+                os.rmdir(self._get_windows_long_path(dir_path))
+                return True
+            except OSError as e:
+                error = e
+        
+        logger.debug(f"删除子文件夹失败，留给后续处理: {dir_path} ({error})")
+        return False
     
-    def find_file_processes(self, file_path: Path) -> List[psutil.Process]:
-        """查找占用指定文件的进程
+    @staticmethod
+    def _iter_procfs_open_files() -> Iterator[Tuple[int, str]]:
+        """Linux 上直接读取 /proc/<pid>/fd 的链接目标，产出 (pid, 打开的文件路径)
+        
+        不为每个进程构造 psutil.Process，已退出或无权限的进程直接跳过；
+        管道、套接字等非文件描述符不会产出
+        """
+        try:
+            pids = [name for name in os.listdir("/proc") if name.isdigit()]
+        except OSError as e:
+            logger.debug(f"无法读取 /proc: {e}")
+            return
+        
+        for pid in pids:
+            fd_dir = f"/proc/{pid}/fd"
+            try:
+                fds = os.listdir(fd_dir)
+            except OSError:
+                continue
+            for fd in fds:
+                try:
+                    target = os.readlink(f"{fd_dir}/{fd}")
+                except OSError:
+                    continue
+                if target.startswith("/"):
+                    yield int(pid), target
+    
+    def _to_processes(self, holders: List[Union[int, psutil.Process]]) -> List[psutil.Process]:
+        """把索引中的 pid 转换为 psutil.Process，已是进程对象的原样保留
         
         Args:
-            file_path: 文件路径
+            holders: pid 或进程对象列表
             
         Returns:
-            List[psutil.Process]: 占用文件的进程列表
+            List[psutil.Process]: 仍存在的进程列表
         """
+        p = self._psutil
         processes = []
-        file_path_str = str(file_path.resolve())
+        for holder in holders:
+            if not isinstance(holder, int):
+                processes.append(holder)
+                continue
+            try:
+                processes.append(p.Process(holder))
+            except (p.NoSuchProcess, p.AccessDenied, p.ZombieProcess):
+                continue
+        return processes
+    
+    def _build_process_file_index(self) -> Dict[str, List[Union[int, psutil.Process]]]:
+        """扫描一次所有进程的打开文件，建立 {规范化路径: [进程]} 索引
+        
+        Linux 上读取 /proc，索引中只记录 pid，查询命中时才构造 psutil.Process
         
+        Returns:
+            Dict[str, List[Union[int, psutil.Process]]]: 路径到占用进程（或 pid）的映射
+        """
+        index: Dict[str, List[Union[int, psutil.Process]]] = {}
+        
+        if sys.platform == "linux":
+            for pid, target in self._iter_procfs_open_files():
+                holders = index.setdefault(target, [])
+                if not holders or holders[-1] != pid:
+                    holders.append(pid)
+            return index
+        
+        p = self._psutil
         try:
-            for proc in psutil.process_iter(['pid', 'name', 'open_files']):
+            for proc in p.process_iter(['pid', 'name', 'open_files']):
                 try:
                     if proc.info['open_files']:
                         for file_info in proc.info['open_files']:
-                            if file_info.path == file_path_str:
-                                processes.append(proc)
-                                break
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                            holders = index.setdefault(os.path.normcase(file_info.path), [])
+                            # 同一进程多次打开同一文件时只记录一次
+                            if not holders or holders[-1] is not proc:
+                                holders.append(proc)
+                except (p.NoSuchProcess, p.AccessDenied, p.ZombieProcess):
+                    continue
+        except Exception as e:
+            logger.debug(f"查找文件进程时出错: {e}")
+        
+        return index
+    
+    def _scan_file_processes(self, key: str) -> List[psutil.Process]:
+        """不建索引，逐个进程按需读取打开文件，只与目标路径比较；Linux 上直接读取 /proc
+        
+        Args:
+            key: 规范化后的目标路径
+            
+        Returns:
+            List[psutil.Process]: 占用文件的进程列表
+        """
+        if sys.platform == "linux":
+            pids = []
+            for pid, target in self._iter_procfs_open_files():
+                if target == key and (not pids or pids[-1] != pid):
+                    pids.append(pid)
+            return self._to_processes(pids)
+        
+        processes = []
+        p = self._psutil
+        
+        try:
+            for proc in p.process_iter(['pid', 'name']):
+                try:
+                    for file_info in proc.open_files():
+                        if os.path.normcase(file_info.path) == key:
+                            processes.append(proc)
+                            break
+                except (p.NoSuchProcess, p.AccessDenied, p.ZombieProcess):
                     continue
         except Exception as e:
             logger.debug(f"查找文件进程时出错: {e}")
         
         return processes
     
+    def _notify_change(self, path: Path) -> None:
+        """通知 on_change 回调：path 所在目录的内容发生了变化"""
+        if self.on_change is not None:
+            self.on_change(Path(path).parent)
+    
+    def reset_batch_state(self) -> None:
+        """开始新的一批删除，清除上一批对关闭占用进程的选择"""
+        self._batch_force_terminate = None
+    
+    def _current_batch(self) -> Optional[_FolderBatch]:
+        """当前线程正在执行的文件夹删除批次"""
+        return getattr(self._local, 'batch', None)
+    
+    def _ask_force_terminate(self, file_path: Path) -> bool:
+        """询问是否关闭占用进程，同一批次只询问一次
+        
+        Args:
+            file_path: 被占用的文件
+            
+        Returns:
+            bool: 是否关闭占用进程
+        """
+        batch = self._current_batch()
+        with self._prompt_lock:
+            choice = batch.force_terminate if batch is not None else self._batch_force_terminate
+            if choice is None:
+                # 只在需要询问时才加载 rich 的交互组件
+                from rich.prompt import Confirm
+                choice = Confirm.ask(f"文件 {file_path.name} 被占用，本批次是否自动关闭占用进程？", default=True)
+                if batch is not None:
+                    batch.force_terminate = choice
+                else:
+                    self._batch_force_terminate = choice
+        return choice
+    
+    def find_file_processes(self, file_path: Union[Path, str]) -> List[psutil.Process]:
+        """查找占用指定文件的进程
+        
+        删除文件夹期间复用同一份进程索引（所有文件、所有重试共用），终止进程后重新扫描；
+        缓存索引中没有该文件时重新扫描一次，以发现索引建立后才打开该文件的进程。
+        单独删除文件时直接扫描进程，不建立索引
+        
+        Args:
+            file_path: 文件路径；传入 str 时视为已 resolve 并 normcase 的路径，不再重复解析
+            
+        Returns:
+            List[psutil.Process]: 占用文件的进程列表
+        """
+        try:
+            self._psutil
+        except ImportError:
+            logger.debug("未安装 psutil，跳过查找占用进程")
+            return []
+        
+        key = file_path if isinstance(file_path, str) else os.path.normcase(str(file_path.resolve()))
+        
+        batch = self._current_batch()
+        if batch is None:
+            # 单次查询：找到匹配即跳到下一个进程，不为所有打开文件建索引
+            return self._scan_file_processes(key)
+        
+        with batch.index_lock:
+            index = batch.process_file_index
+            if index is not None and key not in index and key not in batch.rescanned_paths:
+                batch.rescanned_paths.add(key)
+                index = None
+            if index is None:
+                index = self._build_process_file_index()
+                batch.process_file_index = index
+        
+        return self._to_processes(index.get(key, []))
+    
+    def _backoff(self, attempt: int) -> None:
+        """按指数退避加随机抖动等待，避免大量文件同时重试
+        
+        Args:
+            attempt: 当前重试次数（从0开始）
+        """
+        delay = min(self.retry_delay * (2 ** attempt), _MAX_RETRY_DELAY)
+        time.sleep(delay * (0.5 + random.random()))
+    
+    def _wait_for_release(self, key: str) -> List[psutil.Process]:
+        """终止进程后轮询，占用进程退出即返回，而不是固定等待
+        
+        每次轮询都重新扫描进程，不使用删除文件夹期间缓存的索引，否则会一直返回已退出的进程
+        
+        Args:
+            key: 已解析并规范化的文件路径
+            
+        Returns:
+            List[psutil.Process]: 轮询结束时仍占用文件的进程列表
+        """
+        time.sleep(0.2)
+        processes = self._scan_file_processes(key)
+        for _ in range(_RELEASE_POLL_COUNT):
+            if not processes:
+                break
+            time.sleep(_RELEASE_POLL_INTERVAL)
+            processes = self._scan_file_processes(key)
+        return processes
+    
     def terminate_processes(self, processes: List[psutil.Process], force: bool = False) -> bool:
         """终止指定的进程
         
@@ -79,6 +479,7 @@ class SafeDeleter:
         if not processes:
             return True
         
+        p = self._psutil
         success = True
         for proc in processes:
             try:
@@ -96,25 +497,29 @@ class SafeDeleter:
                 
                 try:
                     proc.wait(timeout=3)
-                except psutil.TimeoutExpired:
+                except p.TimeoutExpired:
                     if not force:
                         logger.warning(f"优雅终止超时，强制终止进程: {proc_name}")
                         proc.kill()
                         try:
                             proc.wait(timeout=3)
-                        except psutil.TimeoutExpired:
+                        except p.TimeoutExpired:
                             logger.error(f"强制终止进程失败: {proc_name}")
                             success = False
                     else:
                         logger.error(f"强制终止进程失败: {proc_name}")
                         success = False
                         
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess) as e:
+            except (p.NoSuchProcess, p.AccessDenied, p.ZombieProcess) as e:
                 logger.debug(f"进程已不存在或无权限: {e}")
             except Exception as e:
                 logger.error(f"终止进程时出错: {e}")
                 success = False
         
+        # 进程已变化，缓存的索引作废
+        batch = self._current_batch()
+        if batch is not None:
+            batch.process_file_index = None
         return success
     
     def safe_delete_file(self, file_path: Path, force_terminate: bool = False) -> bool:
@@ -127,67 +532,100 @@ class SafeDeleter:
         Returns:
             bool: 是否删除成功
         """
-        if not file_path.exists():
+        # lstat 不跟随符号链接，悬空的符号链接也会被删除
+        try:
+            os.lstat(str(file_path))
+        except FileNotFoundError:
             logger.debug(f"文件不存在，无需删除: {file_path}")
             return True
+        except OSError:
+            pass
         
+        resolved_key = None
         for attempt in range(self.max_retries):
             try:
-                file_path.unlink()
+                self._unlink_path(file_path)
                 logger.info(f"✅ 成功删除文件: {file_path.name}")
+                self._notify_change(file_path)
                 return True
                 
             except (PermissionError, OSError) as e:
+                # 权限错误时先尝试句柄删除，成功则无需查找占用进程
+                if isinstance(e, PermissionError) and self._delete_via_handle(file_path):
+                    logger.info(f"✅ 使用句柄删除成功删除文件: {file_path.name}")
+                    self._notify_change(file_path)
+                    return True
+                
                 logger.warning(f"文件删除失败，尝试第 {attempt + 1}/{self.max_retries} 次: {file_path.name}")
                 
-                processes = self.find_file_processes(file_path)
+                # resolve 需要逐级 stat，只在首次失败时计算一次，供所有重试复用
+                if resolved_key is None:
+                    resolved_key = os.path.normcase(str(file_path.resolve()))
+                processes = self.find_file_processes(resolved_key)
                 
                 if processes:
                     logger.info(f"发现 {len(processes)} 个占用文件的进程")
                     for proc in processes:
                         try:
                             logger.info(f"占用进程: {proc.name()} (PID: {proc.pid})")
-                        except (psutil.NoSuchProcess, psutil.AccessDenied):
+                        except (self._psutil.NoSuchProcess, self._psutil.AccessDenied):
                             pass
                     
-                    if attempt == 0 and not force_terminate:
-                        if Confirm.ask(f"是否尝试关闭占用文件 {file_path.name} 的进程？", default=True):
-                            force_terminate = True
+                    if not force_terminate and self.interactive:
+                        force_terminate = self._ask_force_terminate(file_path)
                     
                     if force_terminate:
                         self.terminate_processes(processes, force=False)
-                        time.sleep(1)
-                        
-                        remaining_processes = self.find_file_processes(file_path)
+                        remaining_processes = self._wait_for_release(resolved_key)
                         if remaining_processes:
                             logger.warning("仍有进程占用文件，尝试强制终止")
                             self.terminate_processes(remaining_processes, force=True)
-                            time.sleep(1)
+                            self._wait_for_release(resolved_key)
                 else:
-                    logger.debug("未发现占用进程，尝试使用Windows长路径格式")
-                    if sys.platform == "win32":
-                        try:
-                            long_path = self._get_windows_long_path(file_path)
-                            os.unlink(long_path)
-                            logger.info(f"✅ 使用长路径格式成功删除文件: {file_path.name}")
-                            return True
-                        except Exception as long_path_error:
-                            logger.debug(f"长路径删除也失败: {long_path_error}")
-                
+                    logger.debug("未发现占用进程")
+
                 if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
+                    self._backoff(attempt)
                     
             except Exception as e:
                 logger.error(f"删除文件时出错: {e}")
                 if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
+                    self._backoff(attempt)
         
         logger.error(f"❌ 删除文件失败: {file_path.name}")
         return False
     
+    def _delete_files(self, files: List[str], force_terminate: bool, batch: _FolderBatch) -> bool:
+        """删除一批文件，数量较多时用线程池重叠各次删除的 IO 等待
+        
+        Args:
+            files: 文件路径列表
+            force_terminate: 是否强制终止占用进程
+            batch: 本次删除文件夹的批次状态，工作线程共用同一份进程索引
+            
+        Returns:
+            bool: 是否全部删除成功
+        """
+        def delete(path: str) -> bool:
+            previous = self._current_batch()
+            self._local.batch = batch
+            try:
+                return self.safe_delete_file(Path(path), force_terminate)
+            finally:
+                self._local.batch = previous
+        
+        if len(files) < _PARALLEL_MIN_FILES:
+            return all(delete(path) for path in files)
+        
+        with ThreadPoolExecutor(max_workers=min(_MAX_DELETE_WORKERS, len(files))) as executor:
+            # 先完成全部删除再汇总结果，不因单个失败而提前返回
+            return all(list(executor.map(delete, files)))
+    
     def safe_delete_folder(self, folder_path: Path, force_terminate: bool = False) -> bool:
         """安全删除文件夹及其内容
         
+        符号链接不跟随：指向目录的链接只删除链接本身
+        
         Args:
             folder_path: 要删除的文件夹路径
             force_terminate: 是否强制终止占用进程
@@ -195,24 +633,35 @@ class SafeDeleter:
         Returns:
             bool: 是否删除成功
         """
-        if not folder_path.exists():
+        # 一次 lstat 同时判断存在性和类型
+        try:
+            st = os.lstat(str(folder_path))
+        except FileNotFoundError:
             logger.debug(f"文件夹不存在，无需删除: {folder_path}")
             return True
         
-        if not folder_path.is_dir():
+        if not stat.S_ISDIR(st.st_mode):
             return self.safe_delete_file(folder_path, force_terminate)
         
-        # 递归删除文件夹内容
-        for item in folder_path.rglob('*'):
-            if item.is_file():
-                if not self.safe_delete_file(item, force_terminate):
-                    return False
+        # 自底向上一次遍历，收集待删除的文件和子目录（子目录在其内容之后）
+        files = []
+        dirs_to_remove = []
+        for kind, item_path in self._walk_postorder(str(folder_path)):
+            (files if kind == 'file' else dirs_to_remove).append(item_path)
+        
+        # 每次删除文件夹使用独立的批次状态，不影响其他线程正在进行的删除
+        if not self._delete_files(files, force_terminate, _FolderBatch()):
+            return False
+        
+        for dir_path in dirs_to_remove:
+            self._remove_empty_dir(dir_path)
         
         # 删除空文件夹
         for attempt in range(self.max_retries):
             try:
                 folder_path.rmdir()
                 logger.info(f"✅ 成功删除文件夹: {folder_path.name}")
+                self._notify_change(folder_path)
                 return True
             except OSError as e:
                 logger.warning(f"删除文件夹失败，尝试第 {attempt + 1}/{self.max_retries} 次: {e}")
@@ -223,17 +672,19 @@ class SafeDeleter:
                         long_path = self._get_windows_long_path(folder_path)
                         os.rmdir(long_path)
                         logger.info(f"✅ 使用长路径格式成功删除文件夹: {folder_path.name}")
+                        self._notify_change(folder_path)
                         return True
                     except Exception as long_path_error:
                         logger.debug(f"长路径删除也失败: {long_path_error}")
                 
                 if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
+                    self._backoff(attempt)
         
         # 最后尝试使用 shutil.rmtree
         try:
             shutil.rmtree(folder_path, ignore_errors=True)
             logger.info(f"✅ 使用 shutil.rmtree 删除文件夹: {folder_path.name}")
+            self._notify_change(folder_path)
             return True
         except Exception as e:
             logger.error(f"❌ 删除文件夹失败: {e}")
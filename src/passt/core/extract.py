@@ -1,41 +1,268 @@
 from loguru import logger
-import psutil
 from pathlib import Path
-from typing import List,Text, Tuple
-from rich.console import Console
-from rich.prompt import Prompt, Confirm
+from typing import Dict,Iterator,List,Optional,Set,Text, Tuple
+import os
+import itertools
 import time
-import shutil
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from .delete import SafeDeleter
 import subprocess
-from rich.tree import Tree
-from rich.table import Table
-from rich.progress import Progress, TextColumn, BarColumn, TaskProgressColumn, TimeElapsedColumn
 import json
-from rich.console import Console
-console = Console()
+import pickle
+import threading
+from collections import Counter
 
 
-# 支持的压缩包格式
-ARCHIVE_EXTENSIONS = {
-    '.zip', '.rar', '.7z', '.tar', '.gz', '.bz2', 
-    '.xz', '.tar.gz', '.tar.bz2', '.tar.xz',
-    '.cbz', '.cbr'
-}
+# 支持的压缩包格式（单个后缀）
+ARCHIVE_EXTENSIONS = frozenset({
+    '.zip', '.rar', '.7z', '.tar', '.gz', '.bz2',
+    '.xz', '.cbz', '.cbr'
+})
+# 复合后缀，Path.suffix 只返回最后一段，需要单独匹配
+COMPOUND_EXTENSIONS = frozenset({'.tar.gz', '.tar.bz2', '.tar.xz'})
+
+
+# 7z 无法识别文件时的报错，与密码无关，换密码重试没有意义
+_NOT_ARCHIVE_ERRORS = ("Cannot open the file as archive", "Can not open the file as archive")
+
+
+def is_archive(path: Path) -> bool:
+    """按后缀判断是否为支持的压缩包，同时识别 .tar.gz 等复合后缀"""
+    suffixes = path.suffixes
+    if not suffixes:
+        return False
+    if suffixes[-1].lower() in ARCHIVE_EXTENSIONS:
+        return True
+    return len(suffixes) >= 2 and (suffixes[-2] + suffixes[-1]).lower() in COMPOUND_EXTENSIONS
+
+
+# 供 str.endswith 一次匹配所有后缀，长后缀在前
+_ARCHIVE_SUFFIXES = tuple(sorted(ARCHIVE_EXTENSIONS | COMPOUND_EXTENSIONS, key=len, reverse=True))
+
+
+# 目录扫描缓存的默认位置
+_DEFAULT_DIR_CACHE = Path.home() / ".cache" / "passt" / "dirs.pkl"
+# 目录扫描缓存最多保存的目录数，超出时丢弃最久未更新的目录
+_MAX_DIR_CACHE_ENTRIES = 100_000
+
+
+class _DirCache:
+    """目录扫描结果缓存：{目录: (mtime_ns, 压缩包路径, 子目录)}，保存为 pickle 文件
+    
+    目录增删、重命名条目时 mtime 会变化，mtime 不变即可跳过 scandir；
+    网络文件系统的 mtime 可能不可靠，此时可以删除缓存文件。
+    扫描完一个目录树后移除其中已不存在的目录，总条目数不超过 _MAX_DIR_CACHE_ENTRIES
+    """
+    
+    def __init__(self, cache_path: Optional[Path] = None):
+        self.cache_path = Path(cache_path) if cache_path is not None else _DEFAULT_DIR_CACHE
+        self._entries: Optional[Dict[str, Tuple[int, List[str], List[str]]]] = None
+        self._dirty = False
+    
+    @property
+    def entries(self) -> Dict[str, Tuple[int, List[str], List[str]]]:
+        """首次使用时才读取缓存文件，读取失败时从空缓存开始"""
+        if self._entries is None:
+            try:
+                self._entries = pickle.loads(self.cache_path.read_bytes())
+            except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+                self._entries = {}
+        return self._entries
+    
+    def get(self, dir_path: str, mtime_ns: int) -> Optional[Tuple[List[str], List[str]]]:
+        """mtime 与缓存一致时返回 (压缩包路径, 子目录)，否则返回 None"""
+        cached = self.entries.get(dir_path)
+        if cached is None or cached[0] != mtime_ns:
+            return None
+        return cached[1], cached[2]
+    
+    def put(self, dir_path: str, mtime_ns: int, archives: List[str], subdirs: List[str]) -> None:
+        # 先移除再插入，字典顺序即更新顺序，超出上限时从最旧的开始丢弃
+        self.entries.pop(dir_path, None)
+        self.entries[dir_path] = (mtime_ns, archives, subdirs)
+        self._dirty = True
+    
+    def prune(self, root: str, visited: Set[str]) -> None:
+        """移除 root 目录树下本次扫描没有经过的目录（已删除或已移走）
+        
+        Args:
+            root: 本次扫描的根目录
+            visited: 本次扫描经过的目录
+        """
+        prefix = root.rstrip(os.sep) + os.sep
+        stale = [path for path in self.entries
+                 if path not in visited and (path == root or path.startswith(prefix))]
+        for path in stale:
+            del self.entries[path]
+        if stale:
+            self._dirty = True
+    
+    def invalidate(self, dir_path) -> None:
+        """目录内容已改变，丢弃该目录的缓存"""
+        if self._entries is not None and self._entries.pop(str(dir_path), None) is not None:
+            self._dirty = True
+    
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        excess = len(self._entries) - _MAX_DIR_CACHE_ENTRIES
+        if excess > 0:
+            for path in list(itertools.islice(self._entries, excess)):
+                del self._entries[path]
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            self.cache_path.write_bytes(pickle.dumps(self._entries))
+            self._dirty = False
+        except OSError as e:
+            # 缓存目录不可写时直接跳过缓存
+            logger.debug(f"保存目录缓存失败: {e}")
+
+
+def _iter_archives(root: str, cache: Optional[_DirCache] = None) -> Iterator[Path]:
+    """用 os.scandir 遍历一次目录树，只为匹配的压缩包创建 Path；不跟随目录符号链接
+    
+    传入 cache 时，mtime 未变化的目录直接使用缓存的结果，不再 scandir；
+    遍历完成后从缓存中移除该目录树下已不存在的目录
+    """
+    stack = [root]
+    visited: Set[str] = set()
+    while stack:
+        current = stack.pop()
+        visited.add(current)
+        try:
+            mtime_ns = os.stat(current).st_mtime_ns if cache is not None else 0
+            cached = cache.get(current, mtime_ns) if cache is not None else None
+            if cached is not None:
+                archives, subdirs = cached
+            else:
+                archives, subdirs = [], []
+                with os.scandir(current) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif entry.name.lower().endswith(_ARCHIVE_SUFFIXES):
+                            archives.append(entry.path)
+                if cache is not None:
+                    cache.put(current, mtime_ns, archives, subdirs)
+        except OSError as e:
+            logger.debug(f"无法读取文件夹: {current} ({e})")
+            if cache is not None:
+                cache.invalidate(current)
+            continue
+        stack.extend(subdirs)
+        for archive in archives:
+            yield Path(archive)
+    
+    if cache is not None:
+        cache.prune(root, visited)
+
+
+def _parse_slt_entries(output: str) -> List[Dict[str, str]]:
+    """解析 7z l -slt 的输出，返回每个条目的属性字典
+    
+    分隔线之前是压缩包本身的信息，只解析分隔线之后的条目
+    """
+    entries = []
+    current = None
+    for line in output.splitlines():
+        if current is None:
+            if line.startswith('----------'):
+                current = {}
+            continue
+        if not line.strip():
+            if current:
+                entries.append(current)
+                current = {}
+            continue
+        key, sep, value = line.partition(' = ')
+        if sep:
+            current[key] = value
+    if current:
+        entries.append(current)
+    return entries
+
+
+def _smallest_encrypted_entry(entries: List[Dict[str, str]]) -> Optional[str]:
+    """找出最小的非空加密文件，校验密码时只解密这一个文件
+    
+    Args:
+        entries: _parse_slt_entries 返回的条目列表
+        
+    Returns:
+        Optional[str]: 条目在压缩包内的路径，没有加密文件时返回None
+    """
+    def size(entry: Dict[str, str]) -> int:
+        value = entry.get('Size', '')
+        return int(value) if value.isdigit() else 0
+    
+    candidates = [e for e in entries
+                  if e.get('Encrypted') == '+' and e.get('Folder') != '+' and e.get('Path')]
+    if not candidates:
+        return None
+    # 空文件几乎无法校验密码，优先选择有内容的文件
+    return min(candidates, key=lambda e: (size(e) == 0, size(e)))['Path']
+
+
+def _mask_password(pwd: str) -> str:
+    """隐藏密码中除前三个字符以外的部分"""
+    return pwd[:3] + "*" * (len(pwd) - 3) if len(pwd) > 3 else pwd
+
+
+@functools.lru_cache(maxsize=8)
+def _load_passwords_cached(config_file: str, mtime_ns: int) -> Tuple[str, ...]:
+    """读取并解析密码配置文件；按路径和 mtime 缓存，同一进程内的多个解压器共用结果
+    
+    Args:
+        config_file: 配置文件路径
+        mtime_ns: 配置文件的修改时间，文件被修改后缓存自动失效
+        
+    Returns:
+        Tuple[str, ...]: 不可变的密码元组
+    """
+    with open(config_file, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    
+    passwords = tuple(config.get('passwords', ['']))
+    logger.info(f"成功加载密码配置文件，共 {len(passwords)} 个密码")
+    
+    # 详细显示密码信息（隐藏敏感部分），未启用 DEBUG 时不计算掩码
+    for i, pwd in enumerate(passwords):
+        if not pwd:
+            logger.debug(f"密码 {i+1}: [空密码]")
+        else:
+            logger.opt(lazy=True).debug("密码 {}: {} (长度: {})", lambda i=i: i + 1,
+                                        lambda pwd=pwd: _mask_password(pwd), lambda pwd=pwd: len(pwd))
+    return passwords
+
 
 class ArchiveExtractor:
     """压缩包解压器"""
     
-    def __init__(self, passwords_config_path: str = "passwords.json"):
+    def __init__(self, passwords_config_path: str = "passwords.json", seven_zip: Optional[str] = None):
         """初始化解压器
         
         Args:
             passwords_config_path: 密码配置文件路径
+            seven_zip: 7z 可执行文件路径，调用方已通过 shutil.which 查找时直接传入，
+                未指定时由系统在 PATH 中查找 7z
         """
+        self.seven_zip = seven_zip or '7z'
         self.passwords = self.load_passwords(passwords_config_path)
-        self.console = Console()
+        # 各密码的历史成功次数，保存在密码配置旁的 .hits.json 中，成功多的密码优先尝试
+        self._hits_file = (Path(__file__).parent / passwords_config_path).with_suffix(".hits.json")
+        self._password_hits = self._load_password_hits()
+        self._hits_lock = threading.Lock()
         self.extracted_archives = []
         self.safe_deleter = SafeDeleter()  # 添加安全删除器
+        # 目录扫描缓存，删除文件后让所在目录的缓存失效
+        self.dir_cache = _DirCache()
+        self.safe_deleter.on_change = self.dir_cache.invalidate
+        # 同时解压的压缩包数量
+        self.max_workers = os.cpu_count() or 1
+        # 7z 超时：至少 base_timeout 秒，大文件按 bytes_per_sec 的处理速度放宽
+        self.base_timeout = int(os.getenv('PASST_7Z_TIMEOUT', '300'))
+        self.bytes_per_sec = int(os.getenv('PASST_7Z_BPS', str(20 * 1024 * 1024)))
     def load_passwords(self, config_path: str) -> List[str]:
         """从JSON配置文件加载密码列表
         
@@ -49,30 +276,48 @@ class ArchiveExtractor:
             config_file = Path(__file__).parent / config_path
             logger.debug(f"尝试加载密码配置文件: {config_file}")
             
-            if not config_file.exists():
+            try:
+                mtime_ns = config_file.stat().st_mtime_ns
+            except FileNotFoundError:
                 logger.error(f"密码配置文件不存在: {config_file}")
-                raise FileNotFoundError(f"配置文件不存在: {config_file}")
-                
-            with open(config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-            
-            passwords = config.get('passwords', [''])
-            logger.info(f"成功加载密码配置文件，共 {len(passwords)} 个密码")
+                raise FileNotFoundError(f"配置文件不存在: {config_file}") from None
             
-            # 详细显示密码信息（隐藏敏感部分）
-            for i, pwd in enumerate(passwords):
-                if not pwd:
-                    logger.debug(f"密码 {i+1}: [空密码]")
-                else:
-                    masked_pwd = pwd[:3] + "*" * (len(pwd) - 3) if len(pwd) > 3 else pwd
-                    logger.debug(f"密码 {i+1}: {masked_pwd} (长度: {len(pwd)})")
-            
-            return passwords
+            return list(_load_passwords_cached(str(config_file), mtime_ns))
         except Exception as e:
             logger.error(f"加载密码配置失败: {e}，使用默认密码")
             default_passwords = ["uohsoaixgnaixgnawab","mayuyu123",""]
             logger.info(f"使用默认密码列表，共 {len(default_passwords)} 个密码")
             return default_passwords
+    def _load_password_hits(self) -> Counter:
+        """读取密码成功次数统计，文件不存在或损坏时从零开始"""
+        try:
+            with open(self._hits_file, 'r', encoding='utf-8') as f:
+                return Counter({pwd: int(count) for pwd, count in json.load(f).items()})
+        except FileNotFoundError:
+            return Counter()
+        except Exception as e:
+            logger.debug(f"读取密码统计失败: {e}")
+            return Counter()
+    
+    def save_password_hits(self) -> None:
+        """保存密码成功次数统计，下次运行沿用同样的尝试顺序"""
+        if not self._password_hits:
+            return
+        try:
+            with open(self._hits_file, 'w', encoding='utf-8') as f:
+                json.dump(dict(self._password_hits), f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            logger.warning(f"保存密码统计失败: {e}")
+    
+    def _ordered_passwords(self) -> List[Tuple[int, str]]:
+        """按历史成功次数从多到少排列密码，次数相同时保持配置顺序
+        
+        Returns:
+            List[Tuple[int, str]]: (配置中的索引, 密码) 列表
+        """
+        with self._hits_lock:
+            return sorted(enumerate(self.passwords), key=lambda item: -self._password_hits[item[1]])
+    
     def find_archives(self, search_path: Path) -> List[Path]:
         """查找指定路径下的所有压缩包
         
@@ -86,16 +331,204 @@ class ArchiveExtractor:
         
         if search_path.is_file():
             # 如果是单个文件，检查是否为压缩包
-            if search_path.suffix.lower() in ARCHIVE_EXTENSIONS:
+            if is_archive(search_path):
                 archives.append(search_path)
         elif search_path.is_dir():
-            # 如果是目录，递归查找所有压缩包
-            for ext in ARCHIVE_EXTENSIONS:
-                archives.extend(search_path.rglob(f'*{ext}'))
+            # 如果是目录，遍历一次目录树查找所有压缩包
+            archives.extend(_iter_archives(str(search_path), self.dir_cache))
+            self.dir_cache.save()
         
         logger.info(f"找到 {len(archives)} 个压缩包")
         return sorted(archives)
     
+    @functools.cached_property
+    def console(self):
+        """首次输出时才导入 rich 并创建控制台，只删除或查找压缩包时不加载 rich"""
+        from rich.console import Console
+        return Console()
+    
+    @functools.cached_property
+    def _py7zr(self):
+        """按需导入 py7zr（可选依赖），未安装时返回 None，只使用 7z 命令"""
+        try:
+            import py7zr
+        except ImportError:
+            return None
+        return py7zr
+    
+    def try_extract_inproc(self, archive_path: Path, extract_dir: Path, passwords: List[str],
+                           probe_entry: Optional[str] = None) -> Optional[str]:
+        """在本进程内用 py7zr 依次校验密码，找到可用密码后只解压一次，不为每个密码启动 7z 子进程
+        
+        密码在内存中校验：读取最小的加密文件，或由 testzip 校验 CRC，不写出文件；
+        只处理需要密码的 .7z，其他格式、未加密或未安装 py7zr 时直接返回 None
+        
+        Args:
+            archive_path: 压缩包路径
+            extract_dir: 解压目录
+            passwords: 按尝试顺序排列的密码
+            probe_entry: 用于校验密码的最小加密文件，未知时为None
+            
+        Returns:
+            Optional[str]: 解压成功时使用的密码，否则返回None
+        """
+        py7zr = self._py7zr
+        if py7zr is None or archive_path.suffix.lower() != '.7z':
+            return None
+        
+        try:
+            with py7zr.SevenZipFile(archive_path, mode='r') as archive:
+                if not archive.needs_password():
+                    return None
+        except Exception as e:
+            # 文件名也被加密时不带密码无法打开
+            logger.debug(f"py7zr 无法直接打开 {archive_path.name}: {e}")
+        
+        for password in passwords:
+            if not password:
+                continue
+            try:
+                with py7zr.SevenZipFile(archive_path, mode='r', password=password) as archive:
+                    if not self._inproc_password_ok(archive, probe_entry):
+                        continue
+            except Exception as e:
+                # 密码错误时解密或 CRC 校验失败
+                logger.debug(f"py7zr 密码校验失败 {archive_path.name}: {e}")
+                continue
+            
+            try:
+                with py7zr.SevenZipFile(archive_path, mode='r', password=password) as archive:
+                    archive.extractall(path=extract_dir)
+                return password
+            except Exception as e:
+                # 格式不支持等，清除部分文件后由调用方改用 7z 命令
+                logger.debug(f"py7zr 解压失败 {archive_path.name}: {e}")
+                self._clear_extract_dir(extract_dir)
+                return None
+        return None
+    
+    @staticmethod
+    def _inproc_password_ok(archive, probe_entry: Optional[str]) -> bool:
+        """在内存中校验 py7zr 压缩包的密码，出错时由调用方按密码错误处理
+        
+        有 read 方法（py7zr 1.0 之前）且已知最小加密文件时只读取该文件，否则用 testzip 校验全部 CRC
+        """
+        read = getattr(archive, 'read', None)
+        if probe_entry is not None and read is not None:
+            read(targets=[probe_entry])
+            return True
+        return archive.testzip() is None
+    
+    def _clear_extract_dir(self, extract_dir: Path) -> None:
+        """删除解压失败时写出的部分文件，保留空的解压目录"""
+        if extract_dir.exists() and any(extract_dir.iterdir()):
+            self.safe_deleter.safe_delete_folder(extract_dir)
+            extract_dir.mkdir(exist_ok=True)
+    
+    def _timeout_for(self, archive_path: Path) -> int:
+        """按压缩包大小计算 7z 的超时时间（秒）
+        
+        Args:
+            archive_path: 压缩包路径
+            
+        Returns:
+            int: 超时时间，不小于 base_timeout
+        """
+        try:
+            size = archive_path.stat().st_size
+        except OSError:
+            return self.base_timeout
+        timeout = max(self.base_timeout, int(size / self.bytes_per_sec) + 30)
+        logger.debug(f"7z 超时时间: {timeout} 秒 ({archive_path.name}, {size} 字节)")
+        return timeout
+    
+    def list_archive(self, archive_path: Path, password: str = "") -> Tuple[Optional[List[Dict[str, str]]], str]:
+        """用 7z l -slt 读取压缩包的文件列表，只读取文件头，不解压数据
+        
+        Args:
+            archive_path: 压缩包路径
+            password: 密码，文件名也被加密时需要
+            
+        Returns:
+            Tuple[Optional[List[Dict[str, str]]], str]: (条目列表，失败时为None, 错误信息)
+        """
+        cmd = [self.seven_zip, 'l', '-slt', f'-p{password}', '-y', '--', str(archive_path)]
+        try:
+            result = subprocess.run(
+                cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                timeout=self.base_timeout,
+            )
+        except subprocess.TimeoutExpired:
+            return None, "读取文件列表超时"
+        except Exception as e:
+            return None, str(e)
+        if result.returncode != 0:
+            return None, result.stderr or result.stdout or ""
+        return _parse_slt_entries(result.stdout), ""
+    
+    def try_test_password(self, archive_path: Path, password: str = "", entry: Optional[str] = None) -> Tuple[bool, str]:
+        """用 7z t 校验密码，只解密校验、不写出文件
+        
+        Args:
+            archive_path: 压缩包路径
+            password: 密码
+            entry: 只校验压缩包内的这一个文件，未指定时校验整个压缩包
+            
+        Returns:
+            Tuple[bool, str]: (密码是否可用, 错误信息)
+        """
+        if entry is not None and ('*' in entry or '?' in entry):
+            # 7z 把 * 和 ? 当作通配符，无法精确指定该文件，改为校验整个压缩包
+            entry = None
+        # 总是传入 -p，空密码时 7z 也不会等待输入密码；-bsp0 关闭进度输出；
+        # 开关放在前面，-- 之后的参数不再解析为开关（文件名可能以 - 开头）
+        cmd = [self.seven_zip, 't', f'-p{password}', '-y', '-bsp0', '--', str(archive_path)]
+        if entry is not None:
+            cmd.append(entry)
+        try:
+            result = subprocess.run(
+                cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                timeout=self._timeout_for(archive_path),
+            )
+        except subprocess.TimeoutExpired:
+            return False, "测试超时"
+        except Exception as e:
+            return False, str(e)
+        if entry is not None and "No files to process" in (result.stdout or ""):
+            # 文件名编码不一致时匹配不到条目，此时 7z 不校验任何文件也会返回成功
+            logger.debug(f"未匹配到校验文件 {entry}，改为校验整个压缩包")
+            return self.try_test_password(archive_path, password)
+        return result.returncode == 0, result.stderr or ""
+    
+    def _check_password(self, archive_path: Path, password: str, probe_entry: Optional[str]) -> Tuple[bool, str]:
+        """校验密码是否可用，只解密最小的一个加密文件
+        
+        Args:
+            archive_path: 压缩包路径
+            password: 密码
+            probe_entry: 用于校验的加密文件，文件名也被加密时为None
+            
+        Returns:
+            Tuple[bool, str]: (密码是否可用, 错误信息)
+        """
+        if probe_entry is None:
+            # 文件名也被加密：能用该密码列出文件即说明文件头解密成功，再校验其中最小的文件
+            entries, error = self.list_archive(archive_path, password)
+            if entries is None:
+                return False, error
+            probe_entry = _smallest_encrypted_entry(entries)
+            if probe_entry is None:
+                return True, ""
+        return self.try_test_password(archive_path, password, probe_entry)
+    
     def try_extract_with_7z(self, archive_path: Path, extract_dir: Path, password: str = "") -> Tuple[bool, str]:
         """使用7z尝试解压文件
         
@@ -110,7 +543,7 @@ class ArchiveExtractor:
         process = None
         try:
             # 构建7z命令
-            cmd = ['7z', 'x', str(archive_path), f'-o{extract_dir}', '-y']
+            cmd = [self.seven_zip, 'x', str(archive_path), f'-o{extract_dir}', '-y']
             
             if password:
                 cmd.append(f'-p{password}')
@@ -123,7 +556,7 @@ class ArchiveExtractor:
                 text=True
             )
             
-            stdout, stderr = process.communicate(timeout=300)  # 5分钟超时
+            stdout, stderr = process.communicate(timeout=self._timeout_for(archive_path))
             
             if process.returncode == 0:
                 return True, ""
@@ -161,60 +594,170 @@ class ArchiveExtractor:
                         process.wait()
                     except:
                         pass
-    def extract_archive(self, archive_path: Path, use_sdel: bool = True, dissolve_folder: bool = True) -> bool:
-        """解压单个压缩包，尝试所有密码
+    def _prepare_extract_dir(self, archive_path: Path) -> Optional[Path]:
+        """确定并创建解压目录，目录已存在时询问是否覆盖
+        
+        只在主线程调用，并行解压前预先处理完所有交互
         
         Args:
             archive_path: 压缩包路径
-            use_sdel: 是否在解压成功后删除压缩包
-            dissolve_folder: 是否在重命名后解散文件夹
             
         Returns:
-            bool: 是否解压成功
+            Optional[Path]: 解压目录，跳过或无法创建时返回None
         """
         archive_name = archive_path.stem  # 不包含扩展名的文件名
         extract_dir = archive_path.parent / archive_name
-          # 如果目录已存在，询问是否覆盖
+        # 如果目录已存在，询问是否覆盖
         if extract_dir.exists():
+            from rich.prompt import Confirm
             if not Confirm.ask(f"目录 {extract_dir.name} 已存在，是否覆盖？", default=False):
                 logger.info(f"跳过解压: {archive_path.name}")
-                return False
+                return None
             # 使用安全删除
             if not self.safe_deleter.safe_delete_folder(extract_dir):
                 logger.error(f"无法删除现有目录: {extract_dir}")
-                return False        
+                return None
         extract_dir.mkdir(exist_ok=True)
-        # 尝试所有密码
-        for i, password in enumerate(self.passwords):
+        return extract_dir
+    
+    def _extract_to_dir(self, archive_path: Path, extract_dir: Path, use_sdel: bool = True) -> bool:
+        """尝试所有密码把压缩包解压到已准备好的目录
+        
+        先用 7z l -slt 判断是否加密：未加密时直接解压；加密时只用 7z t 解密最小的一个文件
+        来校验密码，找到可用密码后才真正解压一次，整个压缩包只解压一遍。
+        不询问用户、不修改共享状态，可以在工作线程中并行调用
+        
+        Args:
+            archive_path: 压缩包路径
+            extract_dir: 解压目录
+            use_sdel: 是否在解压成功后删除压缩包
+            
+        Returns:
+            bool: 是否解压成功
+        """
+        # 先读取文件列表：未加密的压缩包直接解压一次，不逐个尝试密码
+        entries, error = self.list_archive(archive_path)
+        if entries is None and any(marker in error for marker in _NOT_ARCHIVE_ERRORS) and "password" not in error.lower():
+            logger.error(f"❌ 解压失败: {archive_path.name} - 无法识别为压缩包")
+            self._remove_if_empty(extract_dir)
+            return False
+        
+        if entries is None:
+            # 文件名也被加密时无法列出文件
+            needs_password = "password" in error.lower()
+        else:
+            needs_password = any(entry.get('Encrypted') == '+' for entry in entries)
+        
+        if not needs_password:
+            success, error = self.try_extract_with_7z(archive_path, extract_dir, "")
+            if success:
+                logger.info(f"✅ 解压成功: {archive_path.name} (无密码)")
+                self._record_success(archive_path, "", use_sdel)
+                return True
+            logger.error(f"❌ 解压失败: {archive_path.name} - {error}")
+            self._remove_if_empty(extract_dir)
+            return False
+        
+        ordered = self._ordered_passwords()
+        probe_entry = _smallest_encrypted_entry(entries) if entries else None
+        
+        # 有 Python 解压后端时在本进程内尝试全部密码
+        password = self.try_extract_inproc(archive_path, extract_dir, [pwd for _, pwd in ordered], probe_entry)
+        if password is not None:
+            logger.info(f"✅ 解压成功: {archive_path.name} (py7zr)")
+            self._record_success(archive_path, password, use_sdel)
+            return True
+        
+        # 尝试所有密码，近期成功过的密码优先；已确认需要密码，跳过空密码
+        for i, password in ordered:
             if not password:
-                password_display = f"无密码 (索引 {i+1})"
-            else:
-                password_display = f"密码 {i+1}: {password}" if len(password) > 3 else f"密码 {i+1}: {password}"
+                continue
+            password_display = f"密码 {i+1}: {password}"
             
             logger.info(f"尝试解压 {archive_path.name} - {password_display}")
             
-            success, error = self.try_extract_with_7z(archive_path, extract_dir, password)
+            success, error = self._check_password(archive_path, password, probe_entry)
             
             if success:
+                success, error = self.try_extract_with_7z(archive_path, extract_dir, password)
+                if not success:
+                    logger.error(f"❌ 解压失败: {archive_path.name} ({password_display}) - {error}")
+                    break
                 logger.info(f"✅ 解压成功: {archive_path.name} ({password_display})")
-                self.extracted_archives.append((archive_path, extract_dir, archive_name))
-                
-                # 安全删除压缩包（如果启用sdel）
-                if use_sdel:
-                    if self.safe_deleter.safe_delete_file(archive_path, force_terminate=True):
-                        logger.info(f"🗑️ 已安全删除压缩包: {archive_path.name}")
-                    else:
-                        logger.error(f"删除压缩包失败 {archive_path.name}")
-                
+                self._record_success(archive_path, password, use_sdel)
                 return True
-            else:
-                logger.debug(f"密码失败: {password_display} - {error}")
-          # 所有密码都失败
-        logger.error(f"❌ 解压失败: {archive_path.name} - 所有密码都无效")
-        # 安全删除空目录
+            logger.debug(f"密码失败: {password_display} - {error}")
+        else:
+            # 所有密码都失败
+            logger.error(f"❌ 解压失败: {archive_path.name} - 所有密码都无效")
+        self._remove_if_empty(extract_dir)
+        return False
+    
+    def _remove_if_empty(self, extract_dir: Path) -> None:
+        """解压失败时安全删除空的解压目录"""
         if extract_dir.exists() and not any(extract_dir.iterdir()):
             self.safe_deleter.safe_delete_folder(extract_dir)
-        return False
+    
+    def _record_success(self, archive_path: Path, password: str, use_sdel: bool) -> None:
+        """解压成功后记录密码命中次数，并按需删除压缩包
+        
+        未加密的压缩包任何密码都能解压，只统计确实需要密码的压缩包
+        
+        Args:
+            archive_path: 压缩包路径
+            password: 解压成功的密码，未加密的压缩包为空字符串
+            use_sdel: 是否删除压缩包
+        """
+        if password:
+            with self._hits_lock:
+                self._password_hits[password] += 1
+        
+        # 安全删除压缩包（如果启用sdel）
+        if use_sdel:
+            if self.safe_deleter.safe_delete_file(archive_path, force_terminate=True):
+                logger.info(f"🗑️ 已安全删除压缩包: {archive_path.name}")
+            else:
+                logger.error(f"删除压缩包失败 {archive_path.name}")
+    
+    def extract_archive(self, archive_path: Path, use_sdel: bool = True, dissolve_folder: bool = True) -> bool:
+        """解压单个压缩包，尝试所有密码
+        
+        Args:
+            archive_path: 压缩包路径
+            use_sdel: 是否在解压成功后删除压缩包
+            dissolve_folder: 是否在重命名后解散文件夹
+            
+        Returns:
+            bool: 是否解压成功
+        """
+        extract_dir = self._prepare_extract_dir(archive_path)
+        if extract_dir is None:
+            return False
+        if not self._extract_to_dir(archive_path, extract_dir, use_sdel):
+            return False
+        self.extracted_archives.append((archive_path, extract_dir, archive_path.stem))
+        return True
+    
+    def _finish_extracted(self, archive_path: Path, extract_dir: Path, dissolve_folder: bool) -> int:
+        """解压成功后的收尾：记录解压结果、重命名文件并按需解散文件夹
+        
+        在主线程依次执行，同一父目录下的移动和重命名不会相互竞争
+        
+        Args:
+            archive_path: 压缩包路径
+            extract_dir: 解压目录
+            dissolve_folder: 是否解散文件夹
+            
+        Returns:
+            int: 重命名的文件数量
+        """
+        archive_name = archive_path.stem
+        self.extracted_archives.append((archive_path, extract_dir, archive_name))
+        renamed = self.rename_extracted_files(extract_dir, archive_name)
+        # 如果启用dissolve_folder，解散文件夹
+        if dissolve_folder:
+            self.dissolve_folder(extract_dir)
+        return renamed
     
     def dissolve_folder(self, extract_dir: Path) -> bool:
         """解散文件夹，将所有文件移动到父目录
@@ -227,26 +770,33 @@ class ArchiveExtractor:
         """
         try:
             parent_dir = extract_dir.parent
-            items = list(extract_dir.iterdir())
+            with os.scandir(extract_dir) as it:
+                entries = list(it)
             
-            # 移动所有文件和文件夹到父目录
-            for item in items:
-                target_path = parent_dir / item.name
+            # 移动所有文件和文件夹到父目录（同一文件系统内，直接 rename）
+            for entry in entries:
+                is_dir = entry.is_dir(follow_symlinks=False)
+                target_path = parent_dir / entry.name
                 
-                # 处理重名情况
+                # 处理重名情况：POSIX 的 rename 会覆盖已有文件，因此先检查目标是否存在
                 counter = 1
-                while target_path.exists():
-                    if item.is_dir():
-                        target_path = parent_dir / f"{item.name}_{counter}"
+                while True:
+                    if not os.path.lexists(target_path):
+                        try:
+                            os.rename(entry.path, target_path)
+                            break
+                        except FileExistsError:
+                            # Windows 上检查后目标被其他进程创建
+                            pass
+                    if is_dir:
+                        target_path = parent_dir / f"{entry.name}_{counter}"
                     else:
-                        stem = item.stem
-                        suffix = item.suffix
-                        target_path = parent_dir / f"{stem}_{counter}{suffix}"
+                        name = Path(entry.name)
+                        target_path = parent_dir / f"{name.stem}_{counter}{name.suffix}"
                     counter += 1
                 
-                shutil.move(str(item), str(target_path))
-                logger.debug(f"移动: {item.name} -> {target_path.name}")
-              # 安全删除空目录
+                logger.debug(f"移动: {entry.name} -> {target_path.name}")
+            # 安全删除空目录
             if self.safe_deleter.safe_delete_folder(extract_dir):
                 logger.info(f"✅ 已解散文件夹: {extract_dir.name}")
                 return True
@@ -271,30 +821,33 @@ class ArchiveExtractor:
         renamed_count = 0
         
         try:
-            # 获取所有直接子项（文件和文件夹）
-            items = list(extract_dir.iterdir())
-            
-            for item in items:
-                old_name = item.name
-                new_name = f"{prefix}@{old_name}"
-                new_path = item.parent / new_name
-                
-                # 避免重名
-                counter = 1
-                while new_path.exists():
-                    new_name = f"{prefix}@{old_name}_{counter}"
-                    new_path = item.parent / new_name
-                    counter += 1
-                
-                try:
-                    item.rename(new_path)
-                    logger.debug(f"重命名: {old_name} -> {new_name}")
-                    renamed_count += 1
-                except Exception as e:
-                    logger.error(f"重命名失败 {old_name}: {e}")
-                    
+            # 获取所有直接子项（文件和文件夹），重命名前先读完，避免边遍历边修改
+            with os.scandir(extract_dir) as it:
+                names = [entry.name for entry in it]
         except Exception as e:
             logger.error(f"遍历目录失败 {extract_dir}: {e}")
+            return renamed_count
+        
+        # 目录中已有的名称一次取得，用集合判断重名，不再逐个 stat
+        dir_str = str(extract_dir)
+        taken = {os.path.normcase(name) for name in names}
+        for old_name in names:
+            new_name = f"{prefix}@{old_name}"
+            
+            # 避免重名
+            counter = 1
+            while os.path.normcase(new_name) in taken:
+                new_name = f"{prefix}@{old_name}_{counter}"
+                counter += 1
+            
+            try:
+                os.rename(os.path.join(dir_str, old_name), os.path.join(dir_str, new_name))
+                taken.discard(os.path.normcase(old_name))
+                taken.add(os.path.normcase(new_name))
+                logger.debug(f"重命名: {old_name} -> {new_name}")
+                renamed_count += 1
+            except Exception as e:
+                logger.error(f"重命名失败 {old_name}: {e}")
         
         return renamed_count
     def process_archives(self, archives: List[Path], use_sdel: bool = True, dissolve_folder: bool = True) -> None:
@@ -305,6 +858,14 @@ class ArchiveExtractor:
             use_sdel: 是否在解压成功后删除压缩包
             dissolve_folder: 是否在重命名后解散文件夹
         """
+        from rich.prompt import Confirm
+        from rich.table import Table
+        from rich.progress import Progress, TextColumn, BarColumn, TaskProgressColumn, TimeElapsedColumn
+        
+        # 每次批量处理都是新的一批，重新询问是否关闭占用压缩包的进程
+        self.safe_deleter.reset_batch_state()
+        
+        console = self.console
         if not archives:
             console.print("[yellow]没有找到压缩包文件[/yellow]")
             return
@@ -333,24 +894,48 @@ class ArchiveExtractor:
             
             success_count = 0
             total_renamed = 0
+            
+            # 先在主线程处理覆盖询问；解压目录相同的压缩包（如 a.zip 和 a.rar）留到后面逐个处理
+            jobs = []
+            deferred = []
+            claimed_dirs = set()
             for archive in archives:
+                extract_dir = archive.parent / archive.stem
+                if extract_dir in claimed_dirs:
+                    deferred.append(archive)
+                    continue
+                extract_dir = self._prepare_extract_dir(archive)
+                if extract_dir is None:
+                    progress.advance(task)
+                    continue
+                claimed_dirs.add(extract_dir)
+                jobs.append((archive, extract_dir))
+            
+            if jobs:
+                # 耗时的是 7z 子进程，线程即可并行
+                with ThreadPoolExecutor(max_workers=min(self.max_workers, len(jobs))) as executor:
+                    futures = {
+                        executor.submit(self._extract_to_dir, archive, extract_dir, use_sdel): (archive, extract_dir)
+                        for archive, extract_dir in jobs
+                    }
+                    for future in as_completed(futures):
+                        archive, extract_dir = futures[future]
+                        progress.update(task, description=f"解压: {archive.name}")
+                        if future.result():
+                            success_count += 1
+                            total_renamed += self._finish_extracted(archive, extract_dir, dissolve_folder)
+                        progress.advance(task)
+            
+            for archive in deferred:
                 progress.update(task, description=f"解压: {archive.name}")
-                
-                if self.extract_archive(archive, use_sdel, dissolve_folder):
+                extract_dir = self._prepare_extract_dir(archive)
+                if extract_dir is not None and self._extract_to_dir(archive, extract_dir, use_sdel):
                     success_count += 1
-                    # 找到对应的解压记录并重命名文件
-                    for arch_path, extract_dir, arch_name in self.extracted_archives:
-                        if arch_path == archive:
-                            renamed = self.rename_extracted_files(extract_dir, arch_name)
-                            total_renamed += renamed
-                            
-                            # 如果启用dissolve_folder，解散文件夹
-                            if dissolve_folder:
-                                self.dissolve_folder(extract_dir)
-                            break
-                
+                    total_renamed += self._finish_extracted(archive, extract_dir, dissolve_folder)
                 progress.advance(task)
         
+        self.save_password_hits()
+        
         # 显示结果
         result_table = Table(title="解压结果")
         result_table.add_column("项目", style="cyan")
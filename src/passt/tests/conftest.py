@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_dir_cache(tmp_path_factory, monkeypatch):
+    """目录扫描缓存写到临时目录，测试不读写用户的 ~/.cache"""
+    monkeypatch.setattr('passt.core.extract._DEFAULT_DIR_CACHE', tmp_path_factory.mktemp('cache') / 'dirs.pkl')
@@ -4,13 +4,15 @@ passt 删除模块测试
 测试 SafeDeleter 类的文件和文件夹删除功能，特别是Windows路径末尾空格处理
 """
 
+import os
 import pytest
 import tempfile
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
 
-from passt.core.delete import SafeDeleter
+from passt.core.delete import SafeDeleter, _FolderBatch
 
 
 class TestSafeDeleterInit:
@@ -49,6 +51,30 @@ class TestWindowsLongPath:
         with patch('sys.platform', 'linux'):
             long_path = deleter._get_windows_long_path(test_path)
             assert not long_path.startswith("\\\\?\\")
+    
+    def test_get_windows_long_path_without_resolve(self):
+        """测试长路径只做字符串拼接：不调用 resolve，保留末尾空格，UNC 路径使用 UNC 前缀"""
+        deleter = SafeDeleter()
+        
+        with patch('sys.platform', 'win32'), \
+             patch('os.path.isabs', return_value=True), \
+             patch.object(Path, 'resolve') as mock_resolve:
+            assert deleter._get_windows_long_path("C:\\test\\folder ") == "\\\\?\\C:\\test\\folder "
+            assert deleter._get_windows_long_path("C:/test/folder") == "\\\\?\\C:\\test\\folder"
+            assert deleter._get_windows_long_path("\\\\server\\share\\dir") == "\\\\?\\UNC\\server\\share\\dir"
+            assert deleter._get_windows_long_path("\\\\?\\C:\\test") == "\\\\?\\C:\\test"
+        mock_resolve.assert_not_called()
+    
+    def test_get_windows_long_path_collapses_parent_dirs(self):
+        r"""测试相对路径中的 .. 在加前缀前被折叠，\\?\ 路径不会由系统解析 .."""
+        deleter = SafeDeleter()
+        
+        with patch('sys.platform', 'win32'), \
+             patch('os.path.isabs', return_value=False), \
+             patch('os.path.join', side_effect=lambda a, b: a + "\\" + b), \
+             patch('os.getcwd', return_value="C:\\work\\dir"):
+            assert deleter._get_windows_long_path("..\\downloads\\a.zip ") == "\\\\?\\C:\\work\\downloads\\a.zip "
+            assert deleter._get_windows_long_path("./sub/../b.txt") == "\\\\?\\C:\\work\\dir\\b.txt"
 
 
 class TestSafeDeleteFile:
@@ -92,6 +118,122 @@ class TestSafeDeleteFile:
         # 清理
         if tmp_path.exists():
             tmp_path.unlink()
+    
+    def test_locked_files_prompt_once_per_batch(self):
+        """测试同一批次中多个被占用的文件只询问一次是否关闭进程"""
+        deleter = SafeDeleter(max_retries=2, retry_delay=0, interactive=True)
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            files = [Path(tmp_dir) / f"locked{i}.txt" for i in range(3)]
+            for file in files:
+                file.write_text("content")
+            
+            with patch.object(deleter, '_unlink_path', side_effect=PermissionError("Access denied")), \
+                 patch.object(deleter, 'find_file_processes', return_value=[Mock()]), \
+                 patch.object(deleter, 'terminate_processes') as mock_terminate, \
+                 patch('rich.prompt.Confirm.ask', return_value=False) as mock_ask:
+                for file in files:
+                    assert deleter.safe_delete_file(file) is False
+                mock_ask.assert_called_once()
+                mock_terminate.assert_not_called()
+                
+                # 新的一批重新询问
+                deleter.reset_batch_state()
+                deleter.safe_delete_file(files[0])
+                assert mock_ask.call_count == 2
+    
+    def test_locked_file_non_interactive_never_prompts(self):
+        """测试非交互模式下不询问，也不关闭占用进程"""
+        deleter = SafeDeleter(max_retries=2, retry_delay=0, interactive=False)
+        
+        with tempfile.NamedTemporaryFile() as tmp:
+            with patch.object(deleter, '_unlink_path', side_effect=PermissionError("Access denied")), \
+                 patch.object(deleter, 'find_file_processes', return_value=[Mock()]), \
+                 patch.object(deleter, 'terminate_processes') as mock_terminate, \
+                 patch('rich.prompt.Confirm.ask') as mock_ask, \
+                 patch('time.sleep'):
+                assert deleter.safe_delete_file(Path(tmp.name)) is False
+                assert deleter.safe_delete_file(Path(tmp.name), force_terminate=True) is False
+        
+        mock_ask.assert_not_called()
+        # 只有显式传入 force_terminate 的调用会关闭进程（每次重试先优雅终止、再强制终止）
+        assert mock_terminate.call_count == 2 * deleter.max_retries
+    
+    def test_retry_backoff_is_exponential_and_capped(self):
+        """测试重试等待按指数增长、有上限，并带随机抖动"""
+        deleter = SafeDeleter(max_retries=5, retry_delay=1.0)
+        
+        with patch('time.sleep') as mock_sleep, patch('random.random', return_value=0.5):
+            for attempt in range(5):
+                deleter._backoff(attempt)
+        assert [call.args[0] for call in mock_sleep.call_args_list] == [1.0, 2.0, 4.0, 5.0, 5.0]
+        
+        with patch('time.sleep') as mock_sleep, patch('random.random', return_value=0.0):
+            deleter._backoff(1)
+        mock_sleep.assert_called_once_with(1.0)
+    
+    def test_wait_for_release_stops_when_process_exits(self):
+        """测试终止进程后一旦文件被释放就停止轮询"""
+        deleter = SafeDeleter()
+        
+        with patch.object(deleter, '_scan_file_processes', side_effect=[[Mock()], [Mock()], []]) as mock_scan, \
+             patch('time.sleep') as mock_sleep:
+            assert deleter._wait_for_release("/locked/file.txt") == []
+        assert mock_scan.call_count == 3
+        assert mock_sleep.call_count == 3
+    
+    def test_wait_for_release_ignores_cached_index(self):
+        """测试删除文件夹期间轮询也重新扫描进程，占用进程退出后不再返回缓存的结果"""
+        deleter = SafeDeleter()
+        deleter._local.batch = _FolderBatch()
+        scans = [[(1234, "/locked/file.txt")]]
+        
+        with patch('sys.platform', 'linux'), \
+             patch.object(deleter, '_iter_procfs_open_files', side_effect=lambda: iter(scans.pop(0) if scans else [])), \
+             patch.object(deleter, '_to_processes', side_effect=lambda pids: list(pids)), \
+             patch('time.sleep') as mock_sleep:
+            assert deleter.find_file_processes("/locked/file.txt") == [1234]
+            assert deleter._wait_for_release("/locked/file.txt") == []
+        assert mock_sleep.call_count == 1
+    
+    def test_permission_error_tries_handle_delete_first(self):
+        """测试权限错误时先尝试句柄删除，成功后不再查找占用进程"""
+        deleter = SafeDeleter(max_retries=2, retry_delay=0)
+        
+        with tempfile.NamedTemporaryFile() as tmp:
+            tmp_path = Path(tmp.name)
+            with patch.object(deleter, '_unlink_path', side_effect=PermissionError("Access denied")), \
+                 patch.object(deleter, '_delete_via_handle', return_value=True) as mock_handle, \
+                 patch.object(deleter, 'find_file_processes') as mock_find:
+                assert deleter.safe_delete_file(tmp_path) is True
+        
+        mock_handle.assert_called_once_with(tmp_path)
+        mock_find.assert_not_called()
+    
+    @pytest.mark.skipif(sys.platform == "win32", reason="仅验证非Windows平台")
+    def test_delete_via_handle_noop_on_posix(self):
+        """测试非Windows平台上句柄删除直接返回 False"""
+        deleter = SafeDeleter()
+        
+        with tempfile.NamedTemporaryFile() as tmp:
+            assert deleter._delete_via_handle(Path(tmp.name)) is False
+            assert Path(tmp.name).exists()
+    
+    def test_delete_file_resolves_path_once(self):
+        """测试重试过程中只解析一次路径"""
+        deleter = SafeDeleter(max_retries=3, retry_delay=0)
+        resolved = Path("/resolved/file.txt")
+        
+        with tempfile.NamedTemporaryFile() as tmp:
+            tmp_path = Path(tmp.name)
+            with patch.object(deleter, '_unlink_path', side_effect=PermissionError("Access denied")), \
+                 patch.object(deleter, 'find_file_processes', return_value=[]) as mock_find, \
+                 patch.object(Path, 'resolve', return_value=resolved) as mock_resolve:
+                assert deleter.safe_delete_file(tmp_path) is False
+        
+        mock_resolve.assert_called_once()
+        assert mock_find.call_count == 3
+        assert {call.args[0] for call in mock_find.call_args_list} == {os.path.normcase(str(resolved))}
 
 
 class TestSafeDeleteFolder:
@@ -129,6 +271,143 @@ class TestSafeDeleteFolder:
             assert result is True
             assert not test_folder.exists()
     
+    def test_delete_nested_folder(self):
+        """测试嵌套子文件夹在一次遍历中删除，无需重试或 shutil.rmtree"""
+        deleter = SafeDeleter()
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            test_folder = Path(tmp_dir) / "test_nested"
+            (test_folder / "a" / "b").mkdir(parents=True)
+            (test_folder / "empty").mkdir()
+            (test_folder / "a" / "file1.txt").write_text("content1")
+            (test_folder / "a" / "b" / "file2.txt").write_text("content2")
+            
+            with patch('shutil.rmtree') as mock_rmtree, patch('time.sleep') as mock_sleep:
+                result = deleter.safe_delete_folder(test_folder)
+            assert result is True
+            assert not test_folder.exists()
+            mock_rmtree.assert_not_called()
+            mock_sleep.assert_not_called()
+    
+    def test_delete_many_files_in_parallel(self):
+        """测试文件较多时并行删除，子目录在文件删除后移除"""
+        deleter = SafeDeleter()
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            test_folder = Path(tmp_dir) / "test_many"
+            for sub in ("a", "b"):
+                (test_folder / sub).mkdir(parents=True)
+                for i in range(10):
+                    (test_folder / sub / f"file{i}.txt").write_text("content")
+            
+            with patch('passt.core.delete.ThreadPoolExecutor', wraps=ThreadPoolExecutor) as mock_pool:
+                result = deleter.safe_delete_folder(test_folder)
+            assert result is True
+            assert not test_folder.exists()
+            mock_pool.assert_called_once()
+    
+    def test_folder_batch_not_shared_with_other_threads(self):
+        """测试删除文件夹时的进程索引只在本次删除中使用，其他线程同时删除文件时仍逐个扫描"""
+        deleter = SafeDeleter()
+        
+        def unlink(path):
+            # 删除文件夹的过程中，另一个线程单独查找占用进程
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                pool.submit(deleter.find_file_processes, "/other.txt").result()
+            os.unlink(str(path))
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            test_folder = Path(tmp_dir) / "test_folder"
+            test_folder.mkdir()
+            (test_folder / "file.txt").write_text("content")
+            
+            with patch.object(deleter, '_unlink_path', side_effect=unlink), \
+                 patch.object(deleter, '_scan_file_processes', return_value=[]) as mock_scan, \
+                 patch.object(deleter, '_build_process_file_index') as mock_build:
+                assert deleter.safe_delete_folder(test_folder) is True
+        
+        mock_scan.assert_called_once_with("/other.txt")
+        mock_build.assert_not_called()
+        assert deleter._current_batch() is None
+    
+    @pytest.mark.skipif(sys.platform == "win32", reason="创建符号链接需要管理员权限")
+    def test_delete_folder_keeps_symlink_target(self):
+        """测试文件夹内指向外部目录的符号链接只删除链接本身"""
+        deleter = SafeDeleter()
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_path = Path(tmp_dir)
+            outside = tmp_path / "outside"
+            outside.mkdir()
+            (outside / "keep.txt").write_text("keep")
+            test_folder = tmp_path / "test_link"
+            test_folder.mkdir()
+            (test_folder / "link").symlink_to(outside, target_is_directory=True)
+            
+            result = deleter.safe_delete_folder(test_folder)
+            assert result is True
+            assert not test_folder.exists()
+            assert (outside / "keep.txt").exists()
+    
+    @pytest.mark.skipif(sys.platform == "win32", reason="创建符号链接需要管理员权限")
+    def test_delete_symlink_not_followed(self):
+        """测试传入指向目录的符号链接或悬空链接时只删除链接本身"""
+        deleter = SafeDeleter()
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_path = Path(tmp_dir)
+            target = tmp_path / "target"
+            target.mkdir()
+            (target / "keep.txt").write_text("keep")
+            link = tmp_path / "link"
+            link.symlink_to(target, target_is_directory=True)
+            dangling = tmp_path / "dangling"
+            dangling.symlink_to(tmp_path / "missing")
+            
+            assert deleter.safe_delete_folder(link) is True
+            assert deleter.safe_delete_file(dangling) is True
+            assert not link.is_symlink()
+            assert not dangling.is_symlink()
+            assert (target / "keep.txt").exists()
+    
+    def test_walk_postorder_order(self):
+        """测试后序遍历：文件和子目录都在所属目录之前产出，根目录本身不产出"""
+        deleter = SafeDeleter()
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = Path(tmp_dir)
+            (root / "a" / "b").mkdir(parents=True)
+            (root / "a" / "b" / "f.txt").write_text("x")
+            (root / "g.txt").write_text("x")
+            
+            items = list(deleter._walk_postorder(str(root)))
+            assert sorted(items) == sorted([
+                ('file', str(root / "a" / "b" / "f.txt")),
+                ('dir', str(root / "a" / "b")),
+                ('dir', str(root / "a")),
+                ('file', str(root / "g.txt")),
+            ])
+            assert items.index(('file', str(root / "a" / "b" / "f.txt"))) < items.index(('dir', str(root / "a" / "b")))
+            assert items.index(('dir', str(root / "a" / "b"))) < items.index(('dir', str(root / "a")))
+    
+    @pytest.mark.skipif(sys.platform == "win32", reason="Windows路径长度有限制")
+    def test_delete_folder_deeper_than_recursion_limit(self):
+        """测试嵌套层数超过递归上限的文件夹也能删除"""
+        deleter = SafeDeleter()
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            test_folder = Path(tmp_dir) / "deep"
+            # os.makedirs 本身是递归实现，逐层创建
+            deepest = str(test_folder)
+            os.mkdir(deepest)
+            for _ in range(sys.getrecursionlimit() + 10):
+                deepest = os.path.join(deepest, "d")
+                os.mkdir(deepest)
+            Path(deepest, "f.txt").write_text("x")
+            
+            assert deleter.safe_delete_folder(test_folder) is True
+            assert not test_folder.exists()
+    
     def test_delete_non_existing_folder(self):
         """测试删除不存在的文件夹"""
         deleter = SafeDeleter()
@@ -173,21 +452,78 @@ class TestFindFileProcesses:
             if tmp_path.exists():
                 tmp_path.unlink()
     
+    def test_find_file_processes_without_psutil(self):
+        """测试未安装 psutil 时返回空列表，删除流程照常进行"""
+        deleter = SafeDeleter()
+        
+        with patch.dict(sys.modules, {'psutil': None}):
+            assert deleter.find_file_processes(Path("/test/file.txt")) == []
+    
     def test_find_file_processes_with_mock(self):
         """测试使用mock查找占用进程"""
         deleter = SafeDeleter()
         test_path = Path("/test/file.txt")
         
+        mock_proc = Mock()
+        mock_proc.info = {'pid': 1234, 'name': 'test.exe'}
+        # 同一文件打开两次也只记录一次进程
+        mock_proc.open_files.return_value = [Mock(path=str(test_path.resolve()))] * 2
+        
+        with patch('sys.platform', 'win32'), patch('psutil.process_iter', return_value=[mock_proc]):
+            processes = deleter.find_file_processes(test_path)
+            assert len(processes) == 1
+    
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="仅Linux提供 /proc")
+    def test_find_file_processes_reads_procfs_on_linux(self):
+        """测试Linux上通过 /proc 找到占用文件的进程，不遍历 psutil.process_iter"""
+        deleter = SafeDeleter()
+        
+        with tempfile.NamedTemporaryFile() as tmp, \
+             patch('psutil.process_iter') as mock_iter:
+            tmp_path = Path(tmp.name)
+            assert os.getpid() in [proc.pid for proc in deleter.find_file_processes(tmp_path)]
+            
+            deleter._local.batch = _FolderBatch()
+            assert os.getpid() in [proc.pid for proc in deleter.find_file_processes(tmp_path)]
+        
+        mock_iter.assert_not_called()
+    
+    def test_find_file_processes_reuses_index_during_folder_delete(self):
+        """测试删除文件夹期间只扫描一次进程，终止进程后重新扫描"""
+        deleter = SafeDeleter()
+        
         mock_proc = Mock()
         mock_proc.info = {
             'pid': 1234,
             'name': 'test.exe',
-            'open_files': [Mock(path=str(test_path.resolve()))]
+            'open_files': [Mock(path=str(Path("/test/a.txt").resolve()))]
         }
         
-        with patch('psutil.process_iter', return_value=[mock_proc]):
-            processes = deleter.find_file_processes(test_path)
-            assert len(processes) == 1
+        with patch('sys.platform', 'win32'), patch('psutil.process_iter', return_value=[mock_proc]) as mock_iter:
+            # 文件夹删除之外每次调用都重新扫描
+            deleter.find_file_processes(Path("/test/a.txt"))
+            deleter.find_file_processes(Path("/test/a.txt"))
+            assert mock_iter.call_count == 2
+            
+            deleter._local.batch = _FolderBatch()
+            assert deleter.find_file_processes(Path("/test/a.txt")) == [mock_proc]
+            assert deleter.find_file_processes(Path("/test/a.txt")) == [mock_proc]
+            assert mock_iter.call_count == 3
+            
+            deleter.terminate_processes([Mock(**{'name.return_value': 'test.exe'})])
+            deleter.find_file_processes(Path("/test/a.txt"))
+            assert mock_iter.call_count == 4
+    
+    def test_find_file_processes_rescans_once_for_unindexed_file(self):
+        """测试缓存索引中没有的文件只重新扫描一次"""
+        deleter = SafeDeleter()
+        deleter._local.batch = _FolderBatch()
+        
+        with patch('sys.platform', 'win32'), patch('psutil.process_iter', return_value=[]) as mock_iter:
+            for _ in range(3):
+                assert deleter.find_file_processes(Path("/test/a.txt")) == []
+            # 首次建立索引 + 一次重新扫描，之后的重试直接使用索引
+            assert mock_iter.call_count == 2
 
 
 class TestTerminateProcesses:
@@ -272,6 +608,19 @@ class TestWindowsPathWithTrailingSpace:
             assert result is True
             assert not test_folder.exists()
     
+    def test_unlink_path_uses_long_path_on_windows(self):
+        """测试Windows上直接使用长路径删除文件，UNC路径使用 UNC 前缀"""
+        deleter = SafeDeleter()
+        
+        with patch('sys.platform', 'win32'), \
+             patch('os.unlink') as mock_unlink:
+            deleter._unlink_path(Path("C:/test/file.txt "))
+            deleter._unlink_path("\\\\server\\share\\file.txt")
+        
+        assert mock_unlink.call_args_list[0].args[0].startswith("\\\\?\\")
+        assert mock_unlink.call_args_list[0].args[0].endswith("file.txt ")
+        assert mock_unlink.call_args_list[1].args[0] == "\\\\?\\UNC\\server\\share\\file.txt"
+    
     def test_windows_long_path_format(self):
         """测试Windows长路径格式生成"""
         deleter = SafeDeleter()
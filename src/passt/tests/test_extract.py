@@ -0,0 +1,478 @@
+"""
+passt 解压模块测试
+
+测试压缩包识别、查找、密码尝试、解压后整理等功能
+"""
+
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+
+from passt.core.extract import ArchiveExtractor, _parse_slt_entries, is_archive
+
+
+SLT_HEADER = "Path = a.zip\nType = zip\n\n----------\n"
+ENCRYPTED_ENTRIES = _parse_slt_entries(
+    SLT_HEADER
+    + "Path = big.bin\nSize = 4096\nEncrypted = +\n\n"
+    + "Path = empty.txt\nSize = 0\nEncrypted = +\n\n"
+    + "Path = dir\nSize = 0\nFolder = +\nEncrypted = +\n\n"
+    + "Path = small.txt\nSize = 12\nEncrypted = +\n"
+)
+
+
+class TestIsArchive:
+    """测试压缩包后缀识别"""
+    
+    @pytest.mark.parametrize("name", [
+        "a.zip", "a.RAR", "a.7z", "a.cbz", "a.tar", "a.tar.gz", "a.TAR.BZ2", "a.tar.xz", "v1.2.zip",
+    ])
+    def test_supported(self, name):
+        assert is_archive(Path(name))
+    
+    @pytest.mark.parametrize("name", ["a.txt", "a", "zip", "a.zip.txt", ".gitignore"])
+    def test_unsupported(self, name):
+        assert not is_archive(Path(name))
+
+
+class TestFindArchives:
+    """测试查找压缩包"""
+    
+    def test_compound_suffix_found_once(self):
+        """测试 .tar.gz 只被找到一次"""
+        extractor = ArchiveExtractor()
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_path = Path(tmp_dir)
+            (tmp_path / "a.tar.gz").touch()
+            (tmp_path / "b.zip").touch()
+            (tmp_path / "c.txt").touch()
+            
+            assert extractor.find_archives(tmp_path) == [tmp_path / "a.tar.gz", tmp_path / "b.zip"]
+            assert extractor.find_archives(tmp_path / "a.tar.gz") == [tmp_path / "a.tar.gz"]
+    
+    def test_walks_nested_folders_once(self):
+        """测试递归查找子目录，后缀不区分大小写，只遍历一次目录树"""
+        extractor = ArchiveExtractor()
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_path = Path(tmp_dir)
+            (tmp_path / "sub" / "deep").mkdir(parents=True)
+            (tmp_path / "sub" / "deep" / "x.CBZ").touch()
+            (tmp_path / "sub" / "y.7z").touch()
+            (tmp_path / "sub" / "notes.txt").touch()
+            (tmp_path / "z.rar").touch()
+            
+            with patch("os.scandir", wraps=os.scandir) as mock_scandir:
+                archives = extractor.find_archives(tmp_path)
+            
+            assert archives == [tmp_path / "sub" / "deep" / "x.CBZ", tmp_path / "sub" / "y.7z", tmp_path / "z.rar"]
+            assert mock_scandir.call_count == 3
+    
+    def test_unchanged_folders_not_rescanned(self, tmp_path):
+        """测试 mtime 未变化的目录使用缓存（跨实例保存），目录内容变化后重新扫描"""
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "a.zip").touch()
+        (tmp_path / "b.rar").touch()
+        expected = [tmp_path / "b.rar", tmp_path / "sub" / "a.zip"]
+        assert ArchiveExtractor().find_archives(tmp_path) == expected
+        
+        extractor = ArchiveExtractor()
+        with patch("os.scandir", wraps=os.scandir) as mock_scandir:
+            assert extractor.find_archives(tmp_path) == expected
+            mock_scandir.assert_not_called()
+            
+            (tmp_path / "sub" / "c.7z").touch()
+            assert extractor.find_archives(tmp_path) == expected + [tmp_path / "sub" / "c.7z"]
+            assert [call.args[0] for call in mock_scandir.call_args_list] == [str(tmp_path / "sub")]
+    
+    def test_removed_folders_pruned_from_cache(self, tmp_path, monkeypatch):
+        """测试扫描后移除已不存在的目录，其他目录树的缓存保留；条目数超过上限时丢弃最旧的"""
+        root = tmp_path / "root"
+        (root / "gone").mkdir(parents=True)
+        (root / "gone" / "a.zip").touch()
+        other = tmp_path / "other"
+        other.mkdir()
+        extractor = ArchiveExtractor()
+        extractor.find_archives(root)
+        extractor.find_archives(other)
+        
+        (root / "gone" / "a.zip").unlink()
+        (root / "gone").rmdir()
+        assert ArchiveExtractor().find_archives(root) == []
+        assert set(ArchiveExtractor().dir_cache.entries) == {str(root), str(other)}
+        
+        monkeypatch.setattr("passt.core.extract._MAX_DIR_CACHE_ENTRIES", 1)
+        (root / "new").mkdir()
+        ArchiveExtractor().find_archives(root)
+        assert list(ArchiveExtractor().dir_cache.entries) == [str(root / "new")]
+    
+    def test_deleting_archive_invalidates_cache(self, tmp_path):
+        """测试通过 SafeDeleter 删除压缩包后，所在目录的缓存失效"""
+        (tmp_path / "a.zip").touch()
+        extractor = ArchiveExtractor()
+        assert extractor.find_archives(tmp_path) == [tmp_path / "a.zip"]
+        assert str(tmp_path) in extractor.dir_cache.entries
+        
+        assert extractor.safe_deleter.safe_delete_file(tmp_path / "a.zip")
+        assert str(tmp_path) not in extractor.dir_cache.entries
+        assert extractor.find_archives(tmp_path) == []
+
+
+class TestSevenZip:
+    """测试 7z 可执行文件路径"""
+    
+    def test_uses_given_executable(self):
+        """测试解压命令使用传入的 7z 路径"""
+        extractor = ArchiveExtractor(seven_zip="/opt/7zip/7z")
+        assert ArchiveExtractor().seven_zip == "7z"
+        
+        with patch("subprocess.Popen") as mock_popen:
+            mock_popen.return_value.communicate.return_value = ("", "")
+            mock_popen.return_value.returncode = 0
+            mock_popen.return_value.poll.return_value = 0
+            assert extractor.try_extract_with_7z(Path("a.zip"), Path("out")) == (True, "")
+        
+        assert mock_popen.call_args.args[0][0] == "/opt/7zip/7z"
+
+
+class TestProcessArchives:
+    """测试批量解压"""
+    
+    def test_extracts_in_parallel_and_finishes_on_main_thread(self, tmp_path_factory):
+        """测试并行解压，重命名在主线程完成；解压目录相同的压缩包在并行解压后逐个处理"""
+        extractor = ArchiveExtractor()
+        extractor.passwords = [""]
+        main_thread = threading.get_ident()
+        worker_threads = set()
+        rename_threads = set()
+        rename = extractor.rename_extracted_files
+        
+        def fake_extract(archive_path, extract_dir, password=""):
+            worker_threads.add(threading.get_ident())
+            (extract_dir / f"{archive_path.suffix[1:]}.txt").write_text("x")
+            return True, ""
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_path = Path(tmp_dir)
+            archives = [tmp_path / name for name in ("a.zip", "b.7z", "c.rar", "a.rar")]
+            for archive in archives:
+                archive.touch()
+            extractor._hits_file = tmp_path_factory.mktemp("hits") / "passwords.hits.json"
+            
+            with patch.object(extractor, "list_archive", return_value=([], "")), \
+                 patch.object(extractor, "try_extract_with_7z", side_effect=fake_extract), \
+                 patch.object(extractor, "rename_extracted_files",
+                              side_effect=lambda *args: rename_threads.add(threading.get_ident()) or rename(*args)), \
+                 patch("rich.prompt.Confirm.ask", return_value=True), \
+                 patch("passt.core.extract.ThreadPoolExecutor", wraps=ThreadPoolExecutor) as mock_pool:
+                extractor.process_archives(archives, use_sdel=True, dissolve_folder=False)
+            
+            mock_pool.assert_called_once()
+            assert worker_threads - {main_thread}
+            assert rename_threads == {main_thread}
+            assert sorted(path.name for path in tmp_path.iterdir()) == ["a", "b", "c"]
+            assert (tmp_path / "b" / "b@7z.txt").exists()
+            # a.rar 在 a.zip 处理完成后才询问是否覆盖同名目录
+            assert [path.name for path in (tmp_path / "a").iterdir()] == ["a@rar.txt"]
+            assert len(extractor.extracted_archives) == 4
+    
+    def test_each_batch_asks_again_about_locked_files(self):
+        """测试每次批量处理开始时清除上一批对关闭占用进程的选择"""
+        extractor = ArchiveExtractor()
+        extractor.safe_deleter._batch_force_terminate = True
+        extractor.process_archives([])
+        assert extractor.safe_deleter._batch_force_terminate is None
+
+
+class TestPasswordRanking:
+    """测试按历史成功次数排列密码"""
+    
+    @pytest.fixture
+    def extractor(self, tmp_path):
+        extractor = ArchiveExtractor()
+        extractor.passwords = ["first", "second", ""]
+        extractor._hits_file = tmp_path / "passwords.hits.json"
+        extractor._password_hits.clear()
+        return extractor
+    
+    def test_successful_password_tried_first(self, extractor, tmp_path):
+        """测试成功过的密码在下一个压缩包中优先尝试，统计可保存并重新加载"""
+        tried = []
+        
+        def fake_test(archive_path, password="", entry=None):
+            tried.append(password)
+            return password == "second", "Wrong password"
+        
+        with patch.object(extractor, "list_archive", return_value=(ENCRYPTED_ENTRIES, "")), \
+             patch.object(extractor, "try_test_password", side_effect=fake_test), \
+             patch.object(extractor, "try_extract_with_7z", return_value=(True, "")) as mock_extract:
+            assert extractor._extract_to_dir(tmp_path / "a.zip", tmp_path, use_sdel=False)
+            assert extractor._extract_to_dir(tmp_path / "b.zip", tmp_path, use_sdel=False)
+        assert tried == ["first", "second", "second"]
+        # 只有校验通过的密码才真正解压
+        assert [call.args[2] for call in mock_extract.call_args_list] == ["second", "second"]
+        
+        extractor.save_password_hits()
+        assert extractor._load_password_hits() == {"second": 2}
+    
+    def test_unencrypted_archive_not_counted(self, extractor, tmp_path):
+        """测试未加密的压缩包不计入任何密码的成功次数"""
+        with patch.object(extractor, "list_archive", return_value=([], "")), \
+             patch.object(extractor, "try_extract_with_7z", return_value=(True, "")):
+            assert extractor._extract_to_dir(tmp_path / "a.zip", tmp_path, use_sdel=False)
+        
+        assert not extractor._password_hits
+        assert [pwd for _, pwd in extractor._ordered_passwords()] == ["first", "second", ""]
+        extractor.save_password_hits()
+        assert not extractor._hits_file.exists()
+    
+    def test_stops_when_not_an_archive(self, extractor, tmp_path):
+        """测试 7z 无法识别文件时不尝试任何密码"""
+        with patch.object(extractor, "list_archive",
+                          return_value=(None, "ERROR: a.zip\nCannot open the file as archive")) as mock_list, \
+             patch.object(extractor, "try_test_password") as mock_test, \
+             patch.object(extractor, "try_extract_with_7z") as mock_extract:
+            assert not extractor._extract_to_dir(tmp_path / "a.zip", tmp_path / "a", use_sdel=False)
+        mock_list.assert_called_once()
+        mock_test.assert_not_called()
+        mock_extract.assert_not_called()
+    
+    def test_password_probe_uses_test_mode(self, extractor):
+        """测试密码校验使用 7z t，不写出文件，空密码也显式传入 -p"""
+        with patch("subprocess.run") as mock_run:
+            mock_run.return_value.returncode = 0
+            mock_run.return_value.stdout = ""
+            mock_run.return_value.stderr = ""
+            assert extractor.try_test_password(Path("a.zip"), "") == (True, "")
+        
+        cmd = mock_run.call_args.args[0]
+        assert cmd[1] == "t"
+        assert "-p" in cmd
+    
+    @pytest.mark.parametrize("entry, expected_tail", [
+        ("-dash.txt", ["--", "a.zip", "-dash.txt"]),
+        ("star*.txt", ["--", "a.zip"]),
+        ("what?.txt", ["--", "a.zip"]),
+    ])
+    def test_password_probe_entry_not_parsed_as_switch(self, extractor, entry, expected_tail):
+        """测试文件名放在 -- 之后不会被当作开关；含通配符的文件名改为校验整个压缩包"""
+        with patch("subprocess.run") as mock_run:
+            mock_run.return_value.returncode = 0
+            mock_run.return_value.stdout = ""
+            mock_run.return_value.stderr = ""
+            assert extractor.try_test_password(Path("a.zip"), "pw", entry) == (True, "")
+        
+        cmd = mock_run.call_args.args[0]
+        assert cmd[-len(expected_tail):] == expected_tail
+        assert cmd.index("-ppw") < cmd.index("--")
+    
+    def test_unencrypted_archive_decompressed_once(self, extractor, tmp_path):
+        """测试未加密的压缩包只调用一次 7z 解压，不校验密码"""
+        listing = Mock(returncode=0, stdout=SLT_HEADER + "Path = a.txt\nSize = 10\nEncrypted = -\n", stderr="")
+        with patch("subprocess.run", return_value=listing) as mock_run, \
+             patch("subprocess.Popen") as mock_popen:
+            mock_popen.return_value.communicate.return_value = ("", "")
+            mock_popen.return_value.returncode = 0
+            assert extractor._extract_to_dir(tmp_path / "a.zip", tmp_path, use_sdel=False)
+        
+        assert [call.args[0][1] for call in mock_run.call_args_list] == ["l"]
+        mock_popen.assert_called_once()
+        cmd = mock_popen.call_args.args[0]
+        assert cmd[1] == "x"
+        assert not any(arg.startswith("-p") for arg in cmd)
+    
+    def test_encrypted_archive_probes_smallest_entry(self, extractor, tmp_path):
+        """测试加密压缩包只解密最小的文件来校验密码"""
+        with patch.object(extractor, "list_archive", return_value=(ENCRYPTED_ENTRIES, "")), \
+             patch.object(extractor, "try_test_password", return_value=(True, "")) as mock_test, \
+             patch.object(extractor, "try_extract_with_7z", return_value=(True, "")):
+            assert extractor._extract_to_dir(tmp_path / "a.zip", tmp_path, use_sdel=False)
+        
+        mock_test.assert_called_once_with(tmp_path / "a.zip", "first", "small.txt")
+    
+    def test_encrypted_file_names_listed_with_password(self, extractor, tmp_path):
+        """测试文件名也被加密时用密码列出文件，再校验其中最小的文件"""
+        def fake_list(archive_path, password=""):
+            if password == "second":
+                return ENCRYPTED_ENTRIES, ""
+            return None, "Can not open encrypted archive. Wrong password?"
+        
+        with patch.object(extractor, "list_archive", side_effect=fake_list), \
+             patch.object(extractor, "try_test_password", return_value=(True, "")) as mock_test, \
+             patch.object(extractor, "try_extract_with_7z", return_value=(True, "")) as mock_extract:
+            assert extractor._extract_to_dir(tmp_path / "a.7z", tmp_path, use_sdel=False)
+        
+        mock_test.assert_called_once_with(tmp_path / "a.7z", "second", "small.txt")
+        assert mock_extract.call_args.args[2] == "second"
+
+
+class TestInprocBackend:
+    """测试 py7zr 本进程解压后端"""
+    
+    @pytest.fixture
+    def extractor(self, tmp_path):
+        extractor = ArchiveExtractor()
+        extractor.passwords = ["wrong", "right"]
+        extractor._hits_file = tmp_path / "passwords.hits.json"
+        extractor._password_hits.clear()
+        return extractor
+    
+    def test_inproc_backend_skips_7z(self, extractor, tmp_path):
+        """测试 .7z 由 py7zr 在内存中读取最小的加密文件校验密码，只用可用密码解压一次，不启动 7z 子进程"""
+        opened = []
+        archives = []
+        extract_dir = tmp_path / "a"
+        extract_dir.mkdir()
+        
+        def read(password, targets):
+            if password != "right":
+                raise RuntimeError("CRC error")
+            return {targets[0]: b"x"}
+        
+        def open_archive(path, mode="r", password=None):
+            opened.append(password)
+            archive = MagicMock()
+            archive.__enter__.return_value = archive
+            archive.needs_password.return_value = True
+            archive.read.side_effect = lambda targets: read(password, targets)
+            archive.extractall.side_effect = lambda path: (path / "right.bin").write_text("x")
+            archives.append(archive)
+            return archive
+        
+        extractor.__dict__["_py7zr"] = Mock(SevenZipFile=Mock(side_effect=open_archive))
+        with patch.object(extractor, "list_archive", return_value=(ENCRYPTED_ENTRIES, "")), \
+             patch.object(extractor, "try_test_password") as mock_test:
+            assert extractor._extract_to_dir(tmp_path / "a.7z", extract_dir, use_sdel=False)
+        
+        assert opened == [None, "wrong", "right", "right"]
+        mock_test.assert_not_called()
+        assert extractor._password_hits == {"right": 1}
+        # 只校验最小的加密文件，只有通过校验的密码才写出文件
+        assert all(call.kwargs == {"targets": ["small.txt"]}
+                   for archive in archives for call in archive.read.call_args_list)
+        assert sum(archive.extractall.call_count for archive in archives) == 1
+        assert [path.name for path in extract_dir.iterdir()] == ["right.bin"]
+    
+    def test_inproc_falls_back_to_testzip(self, extractor, tmp_path):
+        """测试 py7zr 没有 read 方法或文件名未知时用 testzip 在内存中校验密码"""
+        def open_archive(path, mode="r", password=None):
+            archive = MagicMock(spec=["__enter__", "__exit__", "needs_password", "testzip", "extractall"])
+            archive.__enter__.return_value = archive
+            archive.needs_password.return_value = True
+            archive.testzip.return_value = None if password == "right" else "bad.txt"
+            return archive
+        
+        extractor.__dict__["_py7zr"] = Mock(SevenZipFile=Mock(side_effect=open_archive))
+        assert extractor.try_extract_inproc(tmp_path / "a.7z", tmp_path / "a", ["wrong", "right"], "small.txt") == "right"
+    
+    def test_unencrypted_7z_not_opened_with_passwords(self, extractor, tmp_path):
+        """测试不需要密码的 .7z 不在本进程内尝试密码"""
+        archive = MagicMock()
+        archive.__enter__.return_value = archive
+        archive.needs_password.return_value = False
+        extractor.__dict__["_py7zr"] = Mock(SevenZipFile=Mock(return_value=archive))
+        
+        assert extractor.try_extract_inproc(tmp_path / "a.7z", tmp_path / "a", ["wrong", "right"]) is None
+        extractor._py7zr.SevenZipFile.assert_called_once_with(tmp_path / "a.7z", mode="r")
+        archive.extractall.assert_not_called()
+    
+    def test_other_formats_use_7z(self, extractor, tmp_path):
+        """测试未安装 py7zr 或非 .7z 格式时使用 7z 命令"""
+        extractor.__dict__["_py7zr"] = None
+        assert extractor.try_extract_inproc(tmp_path / "a.7z", tmp_path / "a", ["right"]) is None
+        
+        extractor.__dict__["_py7zr"] = Mock()
+        assert extractor.try_extract_inproc(tmp_path / "a.rar", tmp_path / "a", ["right"]) is None
+        extractor._py7zr.SevenZipFile.assert_not_called()
+
+
+class TestTimeout:
+    """测试 7z 超时时间"""
+    
+    def test_timeout_grows_with_archive_size(self, tmp_path, monkeypatch):
+        """测试超时时间不小于基础值，大压缩包按处理速度放宽；可通过环境变量配置"""
+        monkeypatch.setenv("PASST_7Z_TIMEOUT", "60")
+        monkeypatch.setenv("PASST_7Z_BPS", "1000")
+        extractor = ArchiveExtractor()
+        
+        small = tmp_path / "small.zip"
+        small.write_bytes(b"x" * 100)
+        large = tmp_path / "large.zip"
+        large.write_bytes(b"x" * 100_000)
+        
+        assert extractor._timeout_for(small) == 60
+        assert extractor._timeout_for(large) == 130
+        assert extractor._timeout_for(tmp_path / "missing.zip") == 60
+
+
+class TestDissolveFolder:
+    """测试解散文件夹"""
+    
+    def test_moves_entries_without_overwriting(self, tmp_path):
+        """测试内容移到父目录，与已有文件或文件夹重名时加序号"""
+        extract_dir = tmp_path / "a"
+        (extract_dir / "sub").mkdir(parents=True)
+        (extract_dir / "sub" / "inner.txt").write_text("inner")
+        (extract_dir / "x.txt").write_text("new")
+        (extract_dir / "y.txt").write_text("y")
+        (tmp_path / "x.txt").write_text("old")
+        (tmp_path / "sub").mkdir()
+        
+        with patch("shutil.move") as mock_move:
+            assert ArchiveExtractor().dissolve_folder(extract_dir)
+        
+        mock_move.assert_not_called()
+        assert not extract_dir.exists()
+        assert (tmp_path / "x.txt").read_text() == "old"
+        assert (tmp_path / "x_1.txt").read_text() == "new"
+        assert (tmp_path / "y.txt").read_text() == "y"
+        assert (tmp_path / "sub_1" / "inner.txt").read_text() == "inner"
+
+
+class TestRenameExtractedFiles:
+    """测试为解压出的文件添加前缀"""
+    
+    def test_adds_prefix_without_overwriting(self, tmp_path):
+        """测试添加前缀，已存在同名条目时加序号且不覆盖"""
+        (tmp_path / "a.txt").write_text("a")
+        (tmp_path / "p@a.txt").write_text("existing")
+        (tmp_path / "dir").mkdir()
+        
+        with patch("os.path.exists") as mock_exists:
+            assert ArchiveExtractor().rename_extracted_files(tmp_path, "p") == 3
+        
+        mock_exists.assert_not_called()
+        names = sorted(path.name for path in tmp_path.iterdir())
+        assert len(names) == 3 and all(name.startswith("p@") for name in names)
+        assert "p@dir" in names
+        assert sorted(path.read_text() for path in tmp_path.iterdir() if path.is_file()) == ["a", "existing"]
+
+
+class TestLoadPasswords:
+    """测试加载密码配置"""
+    
+    def test_loaded_once_per_process(self, tmp_path):
+        """测试多个解压器共用解析结果，配置文件修改后重新读取"""
+        config = tmp_path / "passwords.json"
+        config.write_text(json.dumps({"passwords": ["secret", ""]}), encoding="utf-8")
+        
+        with patch("builtins.open", wraps=open) as mock_open:
+            first = ArchiveExtractor(passwords_config_path=str(config))
+            second = ArchiveExtractor(passwords_config_path=str(config))
+        assert first.passwords == second.passwords == ["secret", ""]
+        assert [call.args[0] for call in mock_open.call_args_list].count(str(config)) == 1
+        
+        # 每个解压器拿到独立的列表
+        first.passwords.append("extra")
+        assert second.passwords == ["secret", ""]
+        
+        config.write_text(json.dumps({"passwords": ["changed"]}), encoding="utf-8")
+        os.utime(config, ns=(0, 0))
+        assert ArchiveExtractor(passwords_config_path=str(config)).passwords == ["changed"]
@@ -4,9 +4,10 @@
 """
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
-from typing import List, Optional
+from typing import Iterator, List, Optional
 import typer
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
@@ -15,7 +16,6 @@ from rich.panel import Panel
 from loguru import logger
 
 from restoret.core.extract_date import extract_date_from_filename
-from restoret.core.restore_timestamp import restore_file_timestamp
 from restoret.interactive import run_interactive
 
 console = Console()
@@ -106,16 +106,41 @@ def get_paths_from_clipboard() -> List[Path]:
         console.print(f"[red]从剪贴板读取失败[/red]: {e}")
         return []
 
-def collect_files(path: Path) -> List[Path]:
-    """收集指定路径下的所有文件"""
-    files = []
+def _iter_files(root: str, recursive: bool = True) -> Iterator[Path]:
+    """用 os.scandir 遍历目录，产出其中的文件
+    
+    使用 DirEntry 缓存的类型信息，不再逐个 stat；不跟随符号链接，不会陷入链接循环
+    """
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            it = os.scandir(current)
+        except OSError as e:
+            logger.debug(f"无法读取文件夹: {current} ({e})")
+            continue
+        with it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if is_dir:
+                    if recursive:
+                        stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield Path(entry.path)
+
+def iter_files(path: Path, recursive: bool = True) -> Iterator[Path]:
+    """逐个产出指定路径下的文件，传入文件时只产出它本身"""
     if path.is_file():
-        files.append(path)
+        yield path
     elif path.is_dir():
-        for item in path.rglob('*'):
-            if item.is_file():
-                files.append(item)
-    return files
+        yield from _iter_files(str(path), recursive)
+
+def collect_files(path: Path, recursive: bool = True) -> List[Path]:
+    """收集指定路径下的所有文件"""
+    return list(iter_files(path, recursive))
 
 @app.command()
 def restore(
@@ -162,19 +187,7 @@ def restore(
         console.print("[red]错误: 未提供任何有效的路径[/red]")
         raise typer.Exit(code=1)
     
-    # 收集所有文件
-    all_files = []
-    for path in path_list:
-        files = collect_files(path)
-        all_files.extend(files)
-    
-    if not all_files:
-        console.print("[yellow]未找到任何文件[/yellow]")
-        return
-    
-    console.print(f"[cyan]找到 {len(all_files)} 个文件[/cyan]")
-    
-    # 分析文件并提取日期
+    # 边遍历边分析文件名中的日期，不必先收集完整的文件列表
     processable_files = []
     skipped_files = []
     
@@ -183,25 +196,33 @@ def restore(
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
-        BarColumn(),
-        TaskProgressColumn(),
+        TextColumn("{task.completed} 个文件"),
         console=console
     ) as progress:
         
-        task = progress.add_task("分析文件...", total=len(all_files))
+        # 文件总数未知，只显示已分析的数量
+        task = progress.add_task("分析文件...", total=None)
         
-        for file_path in all_files:
-            progress.update(task, description=f"分析: {file_path.name}")
-            
-            extracted_date = extract_date_from_filename(file_path.name)
-            if extracted_date:
-                processable_files.append((file_path, extracted_date))
-                logger.info(f"从 '{file_path.name}' 提取到日期: {extracted_date}")
-            else:
-                skipped_files.append(file_path)
-                logger.debug(f"未能从 '{file_path.name}' 提取日期")
-            
-            progress.advance(task)
+        for path in path_list:
+            for file_path in iter_files(path, recursive):
+                progress.update(task, description=f"分析: {file_path.name}")
+                
+                extracted_date = extract_date_from_filename(file_path.name)
+                if extracted_date:
+                    processable_files.append((file_path, extracted_date))
+                    logger.info(f"从 '{file_path.name}' 提取到日期: {extracted_date}")
+                else:
+                    skipped_files.append(file_path)
+                    logger.debug(f"未能从 '{file_path.name}' 提取日期")
+                
+                progress.advance(task)
+    
+    total_files = len(processable_files) + len(skipped_files)
+    if not total_files:
+        console.print("[yellow]未找到任何文件[/yellow]")
+        return
+    
+    console.print(f"[cyan]找到 {total_files} 个文件[/cyan]")
     
     # 显示统计信息
     console.print(f"\n[green]可处理文件: {len(processable_files)}[/green]")
@@ -247,6 +268,9 @@ def restore(
     success_count = 0
     error_count = 0
     
+    # 网络共享上每次 utime 都要往返一次，多线程并发提交以掩盖延迟
+    max_workers = int(os.getenv('RESTORET_WORKERS', '32'))
+    
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
@@ -257,19 +281,28 @@ def restore(
         
         task = progress.add_task("恢复时间戳...", total=len(processable_files))
         
-        for file_path, extracted_date in processable_files:
-            progress.update(task, description=f"处理: {file_path.name}")
-            
-            try:
-                restore_file_timestamp(file_path, extracted_date)
-                success_count += 1
-                logger.info(f"已恢复 {file_path} 的时间戳为 {extracted_date}")
-            except Exception as e:
-                error_count += 1
-                logger.error(f"恢复 {file_path} 时间戳失败: {e}")
-                console.print(f"[red]错误[/red]: {file_path.name} - {e}")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for file_path, extracted_date in processable_files:
+                # 提前换算为纳秒时间戳，与 restore_file_timestamp 一样按本地时间解释日期
+                ts_ns = round(extracted_date.timestamp() * 1_000_000) * 1000
+                future = executor.submit(os.utime, file_path, ns=(ts_ns, ts_ns))
+                futures[future] = (file_path, extracted_date)
             
-            progress.advance(task)
+            for future in as_completed(futures):
+                file_path, extracted_date = futures[future]
+                progress.update(task, description=f"处理: {file_path.name}")
+                
+                try:
+                    future.result()
+                    success_count += 1
+                    logger.info(f"已恢复 {file_path} 的时间戳为 {extracted_date}")
+                except Exception as e:
+                    error_count += 1
+                    logger.error(f"恢复 {file_path} 时间戳失败: {e}")
+                    console.print(f"[red]错误[/red]: {file_path.name} - {e}")
+                
+                progress.advance(task)
     
     # 显示结果
     console.print(Panel.fit(
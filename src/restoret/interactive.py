@@ -1,8 +1,9 @@
 """
 时间戳恢复工具的交互式界面模块
 """
+import stat
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from rich.console import Console
 from rich.prompt import Prompt, Confirm
 from rich.table import Table
@@ -14,14 +15,22 @@ from loguru import logger
 from .core.extract_date import extract_date_from_filename
 from .core.restore_timestamp import restore_file_timestamp
 
+def _probe_path(path: Path) -> Optional[bool]:
+    """一次 stat 同时判断路径是否存在及是否为文件夹；不存在时返回 None"""
+    try:
+        return stat.S_ISDIR(path.stat().st_mode)
+    except (OSError, ValueError):
+        return None
+
+
 class InteractiveUI:
     """交互式用户界面类"""
     
     def __init__(self, console: Console = None):
         self.console = console or Console()
     
-    def get_paths_from_clipboard(self) -> List[Path]:
-        """从剪贴板获取路径列表"""
+    def get_paths_from_clipboard(self) -> List[Tuple[Path, bool]]:
+        """从剪贴板获取路径列表，每项为 (路径, 是否为文件夹)"""
         try:
             import pyperclip
             clipboard_content = pyperclip.paste()
@@ -30,8 +39,9 @@ class InteractiveUI:
                 for line in clipboard_content.splitlines():
                     if line := line.strip().strip('"').strip("'"):
                         path = Path(line)
-                        if path.exists():
-                            paths.append(path)
+                        is_dir = _probe_path(path)
+                        if is_dir is not None:
+                            paths.append((path, is_dir))
                             self.console.print(f"[green]✓ 已添加路径:[/green] {path}")
                         else:
                             self.console.print(f"[yellow]警告：路径不存在[/yellow] - {line}")
@@ -69,8 +79,9 @@ class InteractiveUI:
                 path_table.add_column("路径", style="green")
                 path_table.add_column("类型", style="yellow")
                 
-                for i, path in enumerate(paths, 1):
-                    path_type = "📁 文件夹" if path.is_dir() else "📄 文件"
+                # 复用读取时的 stat 结果，不再逐条访问文件系统
+                for i, (path, is_dir) in enumerate(paths, 1):
+                    path_type = "📁 文件夹" if is_dir else "📄 文件"
                     path_table.add_row(str(i), str(path), path_type)
                 
                 self.console.print(path_table)
@@ -88,9 +99,10 @@ class InteractiveUI:
                         break
                     
                     path = Path(line.strip().strip('"').strip("'"))
-                    if path.exists():
-                        paths.append(path)
-                        path_type = "📁 文件夹" if path.is_dir() else "📄 文件"
+                    is_dir = _probe_path(path)
+                    if is_dir is not None:
+                        paths.append((path, is_dir))
+                        path_type = "📁 文件夹" if is_dir else "📄 文件"
                         self.console.print(f"[green]✓ 已添加路径:[/green] {path_type} {path}")
                     else:
                         self.console.print(f"[red]✗ 路径不存在:[/red] {line}")
@@ -98,7 +110,7 @@ class InteractiveUI:
                     self.console.print("\n[yellow]操作已取消[/yellow]")
                     return []
         
-        return paths
+        return [path for path, _ in paths]
     
     def collect_files(self, paths: List[Path]) -> List[Path]:
         """收集所有文件"""
@@ -253,6 +265,36 @@ class InteractiveUI:
         
         return success_count, error_count
     
+    def _run_once(self) -> bool:
+        """执行一轮 选择路径 → 预览 → 恢复，中途取消时返回 False"""
+        # 1. 获取要处理的路径
+        paths = self.get_paths_interactively()
+        if not paths:
+            self.console.print("[yellow]未选择任何路径，操作取消[/yellow]")
+            return False
+        
+        # 2. 收集所有文件
+        all_files = self.collect_files(paths)
+        if not all_files:
+            self.console.print("[yellow]未找到任何文件[/yellow]")
+            return False
+        
+        # 3. 分析文件并提取日期
+        processable_files, skipped_files = self.analyze_files(all_files)
+        
+        # 4. 显示预览
+        if not self.show_preview(processable_files, skipped_files):
+            return False
+        
+        # 5. 询问是否执行
+        if not Confirm.ask("\n[bold]确认恢复这些文件的时间戳吗？[/bold]", default=False):
+            self.console.print("[yellow]操作已取消[/yellow]")
+            return False
+        
+        # 6. 执行恢复操作
+        self.execute_restore(processable_files)
+        return True
+    
     def run_interactive(self):
         """运行完整的交互式界面"""
         # 显示欢迎信息
@@ -265,38 +307,15 @@ class InteractiveUI:
         ))
         
         try:
-            # 1. 获取要处理的路径
-            paths = self.get_paths_interactively()
-            if not paths:
-                self.console.print("[yellow]未选择任何路径，操作取消[/yellow]")
-                return
-            
-            # 2. 收集所有文件
-            all_files = self.collect_files(paths)
-            if not all_files:
-                self.console.print("[yellow]未找到任何文件[/yellow]")
-                return
-            
-            # 3. 分析文件并提取日期
-            processable_files, skipped_files = self.analyze_files(all_files)
-            
-            # 4. 显示预览
-            if not self.show_preview(processable_files, skipped_files):
-                return
-            
-            # 5. 询问是否执行
-            if not Confirm.ask("\n[bold]确认恢复这些文件的时间戳吗？[/bold]", default=False):
-                self.console.print("[yellow]操作已取消[/yellow]")
-                return
-            
-            # 6. 执行恢复操作
-            success_count, error_count = self.execute_restore(processable_files)
-            
-            # 7. 询问是否继续
-            if Confirm.ask("\n是否继续处理其他文件？", default=False):
-                self.run_interactive()
-            else:
-                self.console.print("\n[bold green]感谢使用文件时间戳恢复工具！[/bold green]")
+            # 循环而非递归处理多轮，避免连续使用时调用栈不断增长
+            while True:
+                if not self._run_once():
+                    return
+                
+                # 7. 询问是否继续
+                if not Confirm.ask("\n是否继续处理其他文件？", default=False):
+                    self.console.print("\n[bold green]感谢使用文件时间戳恢复工具！[/bold green]")
+                    return
         
         except KeyboardInterrupt:
             self.console.print("\n[yellow]操作已取消[/yellow]")